@@ -1,18 +1,63 @@
 import json
-from openai import OpenAI
+import logging
+import threading
+import time
+from openai import AsyncOpenAI, OpenAI
 from pydantic import BaseModel
 from typing import List, Literal
 from langchain_core.documents import Document
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_core.language_models import FakeListChatModel
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
-from langchain_qdrant import QdrantVectorStore
+from langchain_qdrant import QdrantVectorStore, RetrievalMode
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams
+from qdrant_client.http.models import (BinaryQuantization, BinaryQuantizationConfig, Distance, FieldCondition, Filter,
+                                       MatchValue, Modifier, PayloadSchemaType, PointStruct, QuantizationSearchParams, Range,
+                                       ScalarQuantization, ScalarQuantizationConfig, ScalarType, SearchParams,
+                                       SparseVectorParams, VectorParams)
 
+from bm25 import BM25SparseEmbeddings
 from config import settings
-
-client = OpenAI(api_key = settings.OPENAI_API_KEY)
+from llm_cache import LLMCache, make_key
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+from ingest_batcher import IngestBatcher
+from local_models import AsyncCannedOpenAI, CannedOpenAI, HashingEmbeddings
+from preprocess import prepare_evaluation_inputs
+
+logger = logging.getLogger(__name__)
+
+def chat_client():
+    if settings.CHAT_BACKEND == "canned":
+        return CannedOpenAI()
+    return OpenAI(api_key = settings.OPENAI_API_KEY)
+
+def async_chat_client(**kwargs):
+    if settings.CHAT_BACKEND == "canned":
+        return AsyncCannedOpenAI()
+    return AsyncOpenAI(api_key=settings.OPENAI_API_KEY, **kwargs)
+
+client = chat_client()
+
+# Bump when the matching prompt text changes: the version is part of the cache
+# key, and entries cached for older versions are purged when the cache opens
+RESUME_EVAL_PROMPT_VERSION = "1"
+REVIEW_PROMPT_VERSION = "1"
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache():
+    global _llm_cache
+    with _llm_cache_lock:
+        # Canned answers must never be served in place of real ones
+        if _llm_cache is None and settings.LLM_CACHE_ENABLED and settings.CHAT_BACKEND != "canned":
+            _llm_cache = LLMCache(settings.LLM_CACHE_PATH,
+                                  max_memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+                                  ttl_seconds=settings.LLM_CACHE_TTL_SECONDS)
+            _llm_cache.invalidate("evaluate_resume", keep_prompt_version=RESUME_EVAL_PROMPT_VERSION)
+            _llm_cache.invalidate("review_application", keep_prompt_version=REVIEW_PROMPT_VERSION)
+        return _llm_cache
 
 resume_eval_prompt = """
 You are an expert hiring screener. Given the candidate resume text and a job description, evaluate candidate's fit.
@@ -46,17 +91,37 @@ def build_system_and_user_messages(resume_text: str, job_desc: str):
         {"role": "user", "content": prompt}
     ]
 
+def log_usage(namespace, model, usage, seconds):
+    if usage is None:
+        logger.info("%s %s: %.2fs, no usage reported", namespace, model, seconds)
+        return
+    logger.info("%s %s: %.2fs, %s prompt tokens, %s completion tokens",
+                namespace, model, seconds, usage.prompt_tokens, usage.completion_tokens)
+
 def evaluate_resume_with_ai(resume_text: str, 
                             job_desc: str, 
                             model="gpt-4o-mini", temperature=0):
+    resume_text, job_desc = prepare_evaluation_inputs(resume_text, job_desc)
+    cache = get_llm_cache()
+    key = make_key("evaluate_resume", model, temperature, RESUME_EVAL_PROMPT_VERSION, resume_text, job_desc)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
     messages = build_system_and_user_messages(resume_text, job_desc)
+    started = time.perf_counter()
     resp = client.chat.completions.create(
         model=model,
         messages=messages,
         temperature=temperature,
         max_tokens=1000
     )
-    return json.loads(resp.choices[0].message.content.strip())
+    log_usage("evaluate_resume", model, resp.usage, time.perf_counter() - started)
+    result = json.loads(resp.choices[0].message.content.strip())
+    if cache is not None:
+        cache.set(key, "evaluate_resume", RESUME_EVAL_PROMPT_VERSION, result,
+                  resp.usage.total_tokens if resp.usage else 0)
+    return result
 
 class ReviewedApplication(BaseModel):
     revised_description: str
@@ -197,57 +262,336 @@ Create the final polished job description by integrating the improvements.
 Return only the final text.
 """
 
-def review_application(job_description: str) -> ReviewedApplication:
-    llm = ChatOpenAI(model="gpt-5.1", temperature=0, api_key=settings.OPENAI_API_KEY)
-
-    analysis_parser = PydanticOutputParser(pydantic_object=JDAnalysis)
-    analysis_prompt = ChatPromptTemplate.from_messages([
-        ("system", ANALYSIS_SYSTEM_PROMPT),
-        ("human", ANALYSIS_USER_PROMPT),
-    ]).partial(format_instructions=analysis_parser.get_format_instructions())
-    analysis_chain = analysis_prompt | llm | analysis_parser
-    analysis = analysis_chain.invoke({"job_description": job_description})
-
-    rewrite_parser = PydanticOutputParser(pydantic_object=JDRewriteOutput)
-    rewrite_prompt = ChatPromptTemplate.from_messages([
-        ("system", REWRITE_SYSTEM_PROMPT),
-        ("human", REWRITE_USER_PROMPT),
-    ]).partial(format_instructions=rewrite_parser.get_format_instructions())
-    rewrite_chain = rewrite_prompt | llm | rewrite_parser
-    rewrite = rewrite_chain.invoke({"job_description": job_description, "analysis_json": analysis.json()})
-
-    finalise_prompt = ChatPromptTemplate.from_messages([
-        ("system", FINALISE_SYSTEM_PROMPT),
-        ("human", FINALISE_USER_PROMPT),
-    ])
-    finalise_chain = finalise_prompt | llm
-    final_output = finalise_chain.invoke({
+def total_tokens(message):
+    usage = getattr(message, "usage_metadata", None)
+    return usage["total_tokens"] if usage else 0
+
+REVIEW_MODEL = "gpt-5.1"
+REVIEW_TEMPERATURE = 0
+
+# What each step answers with when CHAT_BACKEND is "canned"
+CANNED_ANALYSIS = JDAnalysis(unclear_sections=[], jargon_terms=[], biased_language=[], missing_information=[],
+                             overall_summary="Canned review: no issues found.").model_dump_json()
+CANNED_REWRITE = JDRewriteOutput(rewritten_sections=[]).model_dump_json()
+CANNED_FINAL_DESCRIPTION = "Canned job description."
+
+class ReviewChains:
+    # The prompts, parsers (and their format instructions) and the model
+    # client are the same for every review, so they are built once per process
+    def __init__(self):
+        canned = settings.CHAT_BACKEND == "canned"
+        self.llm = None if canned else ChatOpenAI(model=REVIEW_MODEL, temperature=REVIEW_TEMPERATURE,
+                                                  api_key=settings.OPENAI_API_KEY, stream_usage=True)
+        def llm(canned_response):
+            return FakeListChatModel(responses=[canned_response]) if canned else self.llm
+
+        self.analysis_parser = PydanticOutputParser(pydantic_object=JDAnalysis)
+        analysis_prompt = ChatPromptTemplate.from_messages([
+            ("system", ANALYSIS_SYSTEM_PROMPT),
+            ("human", ANALYSIS_USER_PROMPT),
+        ]).partial(format_instructions=self.analysis_parser.get_format_instructions())
+        self.analysis_chain = analysis_prompt | llm(CANNED_ANALYSIS)
+
+        self.rewrite_parser = PydanticOutputParser(pydantic_object=JDRewriteOutput)
+        rewrite_prompt = ChatPromptTemplate.from_messages([
+            ("system", REWRITE_SYSTEM_PROMPT),
+            ("human", REWRITE_USER_PROMPT),
+        ]).partial(format_instructions=self.rewrite_parser.get_format_instructions())
+        self.rewrite_chain = rewrite_prompt | llm(CANNED_REWRITE)
+
+        finalise_prompt = ChatPromptTemplate.from_messages([
+            ("system", FINALISE_SYSTEM_PROMPT),
+            ("human", FINALISE_USER_PROMPT),
+        ])
+        self.finalise_chain = finalise_prompt | llm(CANNED_FINAL_DESCRIPTION)
+
+_review_chains = None
+
+def get_review_chains():
+    global _review_chains
+    if _review_chains is None:
+        _review_chains = ReviewChains()
+    return _review_chains
+
+async def astream_review_application(job_description: str):
+    # Yields ("summary", str) as soon as the analysis is done, then the final
+    # rewrite as ("token", str) chunks, and finally ("done", ReviewedApplication)
+    cache = get_llm_cache()
+    key = make_key("review_application", REVIEW_MODEL, REVIEW_TEMPERATURE, REVIEW_PROMPT_VERSION, job_description)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            reviewed = ReviewedApplication(**cached)
+            yield "summary", reviewed.overall_summary
+            yield "token", reviewed.revised_description
+            yield "done", reviewed
+            return
+
+    chains = get_review_chains()
+    tokens = 0
+
+    analysis_message = await chains.analysis_chain.ainvoke({"job_description": job_description})
+    analysis = chains.analysis_parser.invoke(analysis_message)
+    tokens += total_tokens(analysis_message)
+    yield "summary", analysis.overall_summary
+
+    rewrite_message = await chains.rewrite_chain.ainvoke({"job_description": job_description, "analysis_json": analysis.json()})
+    rewrite = chains.rewrite_parser.invoke(rewrite_message)
+    tokens += total_tokens(rewrite_message)
+
+    final_output = None
+    async for chunk in chains.finalise_chain.astream({
         "job_description": job_description, 
-        "rewritten_sections_json": rewrite.json()})
-    revised_description = final_output.text
+        "rewritten_sections_json": rewrite.json()}):
+        final_output = chunk if final_output is None else final_output + chunk
+        if chunk.text:
+            yield "token", chunk.text
+    tokens += total_tokens(final_output)
+    revised_description = final_output.text if final_output is not None else ""
     overall_summary = analysis.overall_summary
-    return ReviewedApplication(revised_description=revised_description, overall_summary=overall_summary)
+    reviewed = ReviewedApplication(revised_description=revised_description, overall_summary=overall_summary)
+    if cache is not None:
+        cache.set(key, "review_application", REVIEW_PROMPT_VERSION, reviewed.model_dump(), tokens)
+    yield "done", reviewed
+
+async def areview_application(job_description: str) -> ReviewedApplication:
+    async for event, data in astream_review_application(job_description):
+        if event == "done":
+            return data
+
+EMBEDDING_MODEL = "text-embedding-3-large"
+EMBEDDING_DIMENSIONS = 3072
+
+# One embeddings client and one Qdrant client per process: both keep
+# connection pools, and the embedded store holds a file lock while open
+_embeddings = None
+_vector_store = None
+_ingest_batcher = None
+_vector_store_lock = threading.Lock()
+
+def openai_embeddings(dimensions=EMBEDDING_DIMENSIONS):
+    # text-embedding-3 vectors are trained so that a prefix, renormalised, is
+    # still a good embedding; the API shortens them when asked for fewer
+    # dimensions
+    return OpenAIEmbeddings(model=EMBEDDING_MODEL, api_key=settings.OPENAI_API_KEY,
+                            dimensions=None if dimensions == EMBEDDING_DIMENSIONS else dimensions)
+
+def make_embeddings(dimensions):
+    if settings.EMBEDDING_BACKEND == "hashing":
+        # Computed locally and cheaply, so not worth caching
+        return HashingEmbeddings(dimensions)
+    embeddings = openai_embeddings(dimensions)
+    if settings.EMBEDDING_CACHE_ENABLED:
+        cache = EmbeddingCache(settings.EMBEDDING_CACHE_PATH,
+                               max_memory_entries=settings.EMBEDDING_CACHE_MEMORY_ENTRIES,
+                               dtype=settings.EMBEDDING_CACHE_DTYPE)
+        embeddings = CachedEmbeddings(embeddings, cache, EMBEDDING_MODEL, dimensions)
+    return embeddings
+
+def get_embeddings():
+    global _embeddings
+    with _vector_store_lock:
+        if _embeddings is None:
+            _embeddings = make_embeddings(settings.RESUME_VECTOR_DIMENSIONS)
+        return _embeddings
+
+def get_embedding_cache_stats():
+    embeddings = _embeddings
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings.cache.get_stats()
+    return {"enabled": settings.EMBEDDING_CACHE_ENABLED, "loaded": embeddings is not None}
+
+def qdrant_client():
+    if settings.QDRANT_MODE == "server":
+        return QdrantClient(url=str(settings.QDRANT_URL), api_key=settings.QDRANT_API_KEY,
+                            prefer_grpc=settings.QDRANT_PREFER_GRPC, grpc_port=settings.QDRANT_GRPC_PORT,
+                            pool_size=settings.QDRANT_POOL_SIZE, timeout=settings.QDRANT_TIMEOUT_SECONDS)
+    return QdrantClient(path=settings.QDRANT_PATH)
+
+def quantization_config(quantization):
+    if quantization == "scalar":
+        return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True))
+    if quantization == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
+# Resume metadata fields searches filter on
+RESUME_PAYLOAD_INDEXES = {
+    "metadata.job_post_id": PayloadSchemaType.INTEGER,
+    "metadata.job_board_id": PayloadSchemaType.INTEGER,
+    "metadata.overall_score": PayloadSchemaType.INTEGER,
+}
 
-def get_vector_store():
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-large", api_key=settings.OPENAI_API_KEY)
-    vector_store = QdrantVectorStore.from_existing_collection(embedding=embeddings, collection_name="resumes", path="qdrant_store")
-    return vector_store
+def create_resume_payload_indexes(client, collection_name):
+    # Creating an index that already exists is a no-op
+    for field_name, field_schema in RESUME_PAYLOAD_INDEXES.items():
+        client.create_payload_index(collection_name, field_name=field_name, field_schema=field_schema)
+
+# Name of the BM25 sparse vector next to the (unnamed) dense one
+RESUME_SPARSE_VECTOR = "bm25"
+
+def create_resume_collection(client, collection_name, dimensions, quantization):
+    # With quantization only the compact vectors have to stay in RAM; the
+    # originals are read from disk to rescore the top candidates. Qdrant
+    # applies the IDF part of BM25 to the sparse vector at query time
+    on_disk = quantization != "none" and settings.RESUME_VECTORS_ON_DISK
+    client.create_collection(collection_name=collection_name,
+                             vectors_config=VectorParams(size=dimensions, distance=Distance.COSINE, on_disk=on_disk),
+                             sparse_vectors_config={RESUME_SPARSE_VECTOR: SparseVectorParams(modifier=Modifier.IDF)},
+                             quantization_config=quantization_config(quantization))
+    create_resume_payload_indexes(client, collection_name)
+
+def ensure_resume_collection(client):
+    if not client.collection_exists(settings.RESUME_COLLECTION):
+        create_resume_collection(client, settings.RESUME_COLLECTION,
+                                 settings.RESUME_VECTOR_DIMENSIONS, settings.RESUME_VECTOR_QUANTIZATION)
+    else:
+        create_resume_payload_indexes(client, settings.RESUME_COLLECTION)
+
+JOB_POST_PAYLOAD_INDEXES = {
+    "job_board_id": PayloadSchemaType.INTEGER,
+    "is_open": PayloadSchemaType.BOOL,
+}
+
+def ensure_job_post_collection(client):
+    # One point per job post, id = job post id, embedded like the resumes so
+    # the two can be compared
+    if not client.collection_exists(settings.JOB_POST_COLLECTION):
+        client.create_collection(collection_name=settings.JOB_POST_COLLECTION,
+                                 vectors_config=VectorParams(size=settings.RESUME_VECTOR_DIMENSIONS,
+                                                             distance=Distance.COSINE))
+    for field_name, field_schema in JOB_POST_PAYLOAD_INDEXES.items():
+        client.create_payload_index(settings.JOB_POST_COLLECTION, field_name=field_name, field_schema=field_schema)
+
+def resume_search_params(quantization=None):
+    if (quantization or settings.RESUME_VECTOR_QUANTIZATION) == "none":
+        return None
+    return SearchParams(quantization=QuantizationSearchParams(rescore=True,
+                                                              oversampling=settings.RESUME_SEARCH_OVERSAMPLING))
+
+def resume_vector_store(client, embeddings, retrieval_mode=None, collection_name=None):
+    retrieval_mode = retrieval_mode or settings.RESUME_RETRIEVAL_MODE
+    collection_name = collection_name or settings.RESUME_COLLECTION
+    sparse_vectors = client.get_collection(collection_name).config.params.sparse_vectors or {}
+    if retrieval_mode == "hybrid" and RESUME_SPARSE_VECTOR not in sparse_vectors:
+        logger.warning("%s has no %s sparse vector, searching it dense only; rebuild it with rebuild_collection.py",
+                       collection_name, RESUME_SPARSE_VECTOR)
+        retrieval_mode = "dense"
+    if retrieval_mode == "dense":
+        return QdrantVectorStore(client=client, collection_name=collection_name, embedding=embeddings)
+    return QdrantVectorStore(client=client, collection_name=collection_name, embedding=embeddings,
+                             retrieval_mode=RetrievalMode.HYBRID, sparse_embedding=BM25SparseEmbeddings(),
+                             sparse_vector_name=RESUME_SPARSE_VECTOR)
 
-def inmemory_vector_store():
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-large", api_key=settings.OPENAI_API_KEY)
+def get_vector_store():
+    global _vector_store
+    embeddings = get_embeddings()
+    with _vector_store_lock:
+        if _vector_store is None:
+            client = qdrant_client()
+            ensure_resume_collection(client)
+            ensure_job_post_collection(client)
+            _vector_store = resume_vector_store(client, embeddings)
+        return _vector_store
+
+def get_ingest_batcher(vector_store):
+    global _ingest_batcher
+    with _vector_store_lock:
+        if _ingest_batcher is None or _ingest_batcher.vector_store is not vector_store:
+            if _ingest_batcher is not None:
+                _ingest_batcher.close()
+            _ingest_batcher = IngestBatcher(vector_store, max_batch_size=settings.INGEST_BATCH_SIZE,
+                                            max_wait_seconds=settings.INGEST_BATCH_WAIT_SECONDS)
+        return _ingest_batcher
+
+def close_vector_store():
+    # Whatever is still waiting in the batcher is written before the client closes
+    global _vector_store, _ingest_batcher
+    with _vector_store_lock:
+        vector_store, _vector_store = _vector_store, None
+        ingest_batcher, _ingest_batcher = _ingest_batcher, None
+    if ingest_batcher is not None:
+        ingest_batcher.close()
+    if vector_store is not None:
+        vector_store.client.close()
+
+def inmemory_vector_store(retrieval_mode=None):
     client = QdrantClient(":memory:")
-    client.create_collection(collection_name="resumes", vectors_config=VectorParams(size=3072, distance=Distance.COSINE))
-    vector_store = QdrantVectorStore(client=client, collection_name="resumes", embedding=embeddings)
+    ensure_resume_collection(client)
+    ensure_job_post_collection(client)
+    vector_store = resume_vector_store(client, get_embeddings(), retrieval_mode)
     try:
         yield vector_store
     finally:
         client.close()
 
-def ingest_resume(resume_text, resume_url, resume_id, vector_store):
-    doc = Document(page_content=resume_text, metadata={"url": resume_url})
+def ingest_resume(resume_text, resume_url, resume_id, vector_store, metadata=None):
+    doc = Document(page_content=resume_text, metadata={"url": resume_url, **(metadata or {})})
     vector_store.add_documents(documents=[doc], ids=[resume_id])
 
+def ingest_resume_batched(resume_text, resume_url, resume_id, vector_store, metadata=None):
+    # Same as ingest_resume, but shares the embeddings request and the upsert
+    # with whatever else this process is ingesting at the moment
+    get_ingest_batcher(vector_store).submit(resume_text, {"url": resume_url, **(metadata or {})}, resume_id).result()
+
+def update_resume_metadata(vector_store, resume_id, metadata):
+    # Merges into the stored metadata. Raises LookupError when the resume
+    # has not been ingested yet, so a queued update is retried later
+    if not vector_store.client.retrieve(vector_store.collection_name, ids=[resume_id], with_payload=False):
+        raise LookupError(f"resume {resume_id} is not in {vector_store.collection_name}")
+    vector_store.client.set_payload(vector_store.collection_name, payload=metadata, points=[resume_id],
+                                    key=vector_store.metadata_payload_key)
+
+def recommend_candidates(vector_store, query, k, offset=0, job_post_id=None, job_board_id=None, min_score=None):
+    # Returns (Document, similarity) pairs, best first, filtered on the
+    # indexed metadata fields
+    conditions = []
+    if job_post_id is not None:
+        conditions.append(FieldCondition(key="metadata.job_post_id", match=MatchValue(value=job_post_id)))
+    if job_board_id is not None:
+        conditions.append(FieldCondition(key="metadata.job_board_id", match=MatchValue(value=job_board_id)))
+    if min_score is not None:
+        conditions.append(FieldCondition(key="metadata.overall_score", range=Range(gte=min_score)))
+    filter = Filter(must=conditions) if conditions else None
+    if vector_store.retrieval_mode == RetrievalMode.HYBRID:
+        # Each side is only searched `k` deep before fusing, so later pages
+        # are cut from a deeper search. Scores are RRF scores here
+        results = vector_store.similarity_search_with_score(query, k=offset + k, filter=filter,
+                                                            search_params=resume_search_params())
+        return results[offset:]
+    return vector_store.similarity_search_with_score(query, k=k, offset=offset, filter=filter,
+                                                     search_params=resume_search_params())
+
 def get_recommendation(job_description, vector_store):
-    retriever = vector_store.as_retriever(search_kwargs={"k": 1})
-    results = retriever.invoke(job_description)
-    return results[0]
+    return recommend_candidates(vector_store, job_description, k=1)[0][0]
+
+def index_job_post(vector_store, job_post_id, job_board_id, description, is_open):
+    # Returns the description's vector. Re-indexing an unchanged description
+    # (e.g. when the post is closed) is an embedding cache hit
+    vector = vector_store.embeddings.embed_documents([description])[0]
+    vector_store.client.upsert(settings.JOB_POST_COLLECTION, points=[
+        PointStruct(id=job_post_id, vector=vector, payload={"job_board_id": job_board_id, "is_open": is_open})])
+    return vector
+
+def match_job_posts(vector_store, resume_text, job_board_id, limit):
+    # (job post id, similarity) for the open posts of the board the resume is
+    # closest to, in one search
+    vector = vector_store.embeddings.embed_query(resume_text)
+    conditions = [FieldCondition(key="job_board_id", match=MatchValue(value=job_board_id)),
+                  FieldCondition(key="is_open", match=MatchValue(value=True))]
+    points = vector_store.client.query_points(settings.JOB_POST_COLLECTION, query=vector,
+                                              query_filter=Filter(must=conditions), limit=limit,
+                                              score_threshold=settings.SHORTLIST_MIN_SIMILARITY).points
+    return [(point.id, point.score) for point in points]
+
+def match_resumes(vector_store, job_post_vector, job_board_id, limit):
+    # (job application id, similarity) for the resumes of the board closest
+    # to a job post's vector; dense only, so similarities compare with
+    # match_job_posts'
+    condition = FieldCondition(key="metadata.job_board_id", match=MatchValue(value=job_board_id))
+    points = vector_store.client.query_points(vector_store.collection_name, query=job_post_vector,
+                                              using=vector_store.vector_name or None,
+                                              query_filter=Filter(must=[condition]), limit=limit,
+                                              score_threshold=settings.SHORTLIST_MIN_SIMILARITY,
+                                              search_params=resume_search_params()).points
+    return [(point.id, point.score) for point in points]
@@ -0,0 +1,70 @@
+"""
+Concurrent-request throughput of a handler using the blocking Session (before)
+versus the AsyncSession (after).
+
+Each request runs `SELECT pg_sleep(delay)` to stand in for a slow query. With
+the blocking session every in-flight request on the worker waits behind it;
+with the async session they overlap up to the pool size.
+
+Usage:
+  python -m bench.db_concurrency --requests 200 --concurrency 50 --delay 0.05
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+import db
+
+def build_app():
+    app = FastAPI()
+
+    @app.get("/sync/{delay}")
+    async def sync_handler(delay: float, session: Session = Depends(db.get_db)):
+        session.execute(text("SELECT pg_sleep(:delay)"), {"delay": delay})
+        return {}
+
+    @app.get("/async/{delay}")
+    async def async_handler(delay: float, session: AsyncSession = Depends(db.get_async_db)):
+        await session.execute(text("SELECT pg_sleep(:delay)"), {"delay": delay})
+        return {}
+
+    return app
+
+async def run(app, path, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one():
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return time.perf_counter() - started
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    app = build_app()
+    for label, path in (("sync Session (before)", "sync"), ("AsyncSession (after)", "async")):
+        # warm the pool so both runs start from established connections
+        await run(app, f"/{path}/0", db.settings.DB_POOL_SIZE, db.settings.DB_POOL_SIZE)
+        elapsed = await run(app, f"/{path}/{args.delay}", args.requests, args.concurrency)
+        print(f"{label:24} {args.requests / elapsed:8.1f} req/s  ({elapsed:.2f}s for {args.requests} requests)")
+    print(db.get_pool_stats())
+    await db.dispose_async_engine()
+    db.dispose_engine()
+
+if __name__ == "__main__":
+    asyncio.run(main())
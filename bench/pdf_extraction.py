@@ -0,0 +1,41 @@
+"""
+Pages/sec of serial (in-process) versus pooled PDF extraction over
+test/resumes/*.pdf.
+
+Usage:
+  python -m bench.pdf_extraction --repeat 20
+"""
+import argparse
+import glob
+import time
+
+from config import settings
+import converter
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20, help="times each resume is extracted")
+    args = parser.parse_args()
+
+    documents = []
+    for filename in sorted(glob.glob("test/resumes/*.pdf")):
+        with open(filename, "rb") as f:
+            documents.append(f.read())
+    documents = documents * args.repeat
+
+    started = time.perf_counter()
+    pages = sum(len(converter.extract_pages_from_pdf_bytes(d)) for d in documents)
+    elapsed = time.perf_counter() - started
+    print(f"serial            {pages / elapsed:8.1f} pages/s  ({len(documents)} documents, {pages} pages, {elapsed:.2f}s)")
+
+    pool = converter.get_pool()
+    # start the workers (and import pypdf in them) before timing
+    pool.map(converter.extract_pages_from_pdf_bytes, documents[:settings.PDF_POOL_PROCESSES])
+    started = time.perf_counter()
+    pages = sum(len(p) for p in pool.map(converter.extract_pages_from_pdf_bytes, documents))
+    elapsed = time.perf_counter() - started
+    print(f"pool ({settings.PDF_POOL_PROCESSES} procs)    {pages / elapsed:8.1f} pages/s  ({len(documents)} documents, {pages} pages, {elapsed:.2f}s)")
+    converter.shutdown_pool()
+
+if __name__ == "__main__":
+    main()
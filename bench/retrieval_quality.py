@@ -0,0 +1,103 @@
+"""
+Recall@k and search latency of dense-only and hybrid (dense + BM25, fused
+with RRF) resume retrieval, over the test/resumes corpus.
+
+The corpus is every resume split into sections, so a query has to find the
+right section among ones from all resumes; a hit at rank r counts for every
+k >= r when any of the top k sections comes from the expected resume. The
+queries are the descriptive ones of test_retrieval_quality plus exact
+keyword ones (products, employers, frameworks), which is where dense search
+tends to fall short. Embeddings go through the embedding cache and are
+computed before timing, so latency is the Qdrant search alone.
+
+Usage:
+  python -m bench.retrieval_quality --k 1,3,5
+  python -m bench.retrieval_quality --repeat 50 --whole-resumes
+"""
+import argparse
+import glob
+import os
+import statistics
+import time
+
+from ai import get_embeddings, inmemory_vector_store
+from converter import extract_pages_from_pdf_bytes
+from preprocess import clean_pages
+
+QUERIES = [
+    ("I am looking for an expert in AI", "ProfileAndrewNg.pdf"),
+    ("I am looking for an expert in Linux", "ProfileLinusTorvalds.pdf"),
+    ("I am looking for a generalist who can work in python and typescript", "ProfileKoudaiAono.pdf"),
+    ("I am looking for a data journalist", "ProfileSimonWillison.pdf"),
+    ("Coursera", "ProfileAndrewNg.pdf"),
+    ("LandingAI", "ProfileAndrewNg.pdf"),
+    ("Transmeta", "ProfileLinusTorvalds.pdf"),
+    ("kernel maintainer", "ProfileLinusTorvalds.pdf"),
+    ("Vue.js", "ProfileEvanYou.pdf"),
+    ("Vite", "ProfileEvanYou.pdf"),
+    ("Meteor", "ProfileEvanYou.pdf"),
+    ("Kotlin and Ktor", "ProfileKoudaiAono.pdf"),
+    ("FastAPI and AWS CDK", "ProfileKoudaiAono.pdf"),
+    ("wxPython", "ProfileKoudaiAono.pdf"),
+    ("Datasette", "ProfileSimonWillison.pdf"),
+    ("Django", "ProfileSimonWillison.pdf"),
+    ("Eventbrite", "ProfileSimonWillison.pdf"),
+]
+
+def load_corpus(whole_resumes, min_chars):
+    texts, sources = [], []
+    for filename in sorted(glob.glob("test/resumes/*.pdf")):
+        with open(filename, "rb") as f:
+            text = clean_pages(extract_pages_from_pdf_bytes(f.read()))
+        parts = [text] if whole_resumes else [s for s in text.split("\n\n") if len(s) >= min_chars]
+        texts.extend(parts)
+        sources.extend([os.path.basename(filename)] * len(parts))
+    return texts, sources
+
+def run_mode(mode, texts, sources, queries, ks, repeat):
+    generator = inmemory_vector_store(mode)
+    vector_store = next(generator)
+    try:
+        vector_store.add_texts(texts, metadatas=[{"source": s} for s in sources], ids=list(range(len(texts))))
+        depth = max(ks)
+        hits = {k: 0 for k in ks}
+        latencies = []
+        for query, expected in queries:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                results = vector_store.similarity_search(query, k=depth)
+                latencies.append(time.perf_counter() - started)
+            found = [doc.metadata["source"] for doc in results]
+            for k in ks:
+                hits[k] += expected in found[:k]
+        return {k: hits[k] / len(queries) for k in ks}, latencies
+    finally:
+        generator.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", default="1,3,5", help="comma separated cut-offs for recall@k")
+    parser.add_argument("--repeat", type=int, default=20, help="searches per query, for latency")
+    parser.add_argument("--whole-resumes", action="store_true", help="index whole resumes instead of sections")
+    parser.add_argument("--min-chars", type=int, default=40, help="shorter sections are not indexed")
+    args = parser.parse_args()
+
+    ks = [int(k) for k in args.k.split(",")]
+    texts, sources = load_corpus(args.whole_resumes, args.min_chars)
+    queries = [(q, e) for q, e in QUERIES if e in sources]
+    # Fill the embedding cache first so neither mode pays for API calls
+    embeddings = get_embeddings()
+    embeddings.embed_documents(texts)
+    for query, _ in queries:
+        embeddings.embed_query(query)
+
+    print(f"{len(texts)} {'resumes' if args.whole_resumes else 'sections'}, {len(queries)} queries")
+    print(f"{'mode':>8} " + " ".join(f"{f'recall@{k}':>9}" for k in ks) + f" {'p50 ms':>8} {'p99 ms':>8}")
+    for mode in ["dense", "hybrid"]:
+        recall, latencies = run_mode(mode, texts, sources, queries, ks, args.repeat)
+        cuts = statistics.quantiles(latencies, n=100)
+        print(f"{mode:>8} " + " ".join(f"{recall[k]:>9.2f}" for k in ks) +
+              f" {cuts[49] * 1000:>8.2f} {cuts[98] * 1000:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Ingest throughput, search latency and memory of the resume vector store
+configurations, over synthetic corpora from a thousand to a million resumes.
+
+Runs offline: embeddings come from the local hashing backend
+(EMBEDDING_BACKEND=hashing), so the numbers are the vector store's and the
+batching's, not OpenAI's, and say nothing about result quality (see
+bench/retrieval_quality.py for that). Resumes and job descriptions are
+generated from a fixed seed, so runs are comparable.
+
+A configuration is dimensions:quantization:retrieval mode. Each corpus is
+written through the same IngestBatcher the worker uses, then searched with
+recommend_candidates, unfiltered and filtered on a job board. Memory is the
+growth of this process' RSS while ingesting, which only means something
+for the embedded store, next to the raw size of the vectors.
+
+The embedded store searches by brute force in Python and keeps everything in
+RAM; use --url with a Qdrant server for the larger corpora.
+
+Usage:
+  python -m bench.retrieval_scale --sizes 1000,10000 --configs 3072:none:dense,1024:scalar:hybrid
+  python -m bench.retrieval_scale --url http://localhost:6333 --sizes 100000,1000000 --queries 500
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from qdrant_client import QdrantClient
+
+import ai
+from bench.vector_layouts import vector_bytes
+from config import settings
+from ingest_batcher import IngestBatcher
+
+FIRST_NAMES = ["Ada", "Alan", "Grace", "Linus", "Margaret", "Guido", "Barbara", "Ken", "Radia", "Dennis",
+               "Frances", "Edsger", "Katherine", "Tim", "Shafi", "Donald", "Hedy", "John", "Sophie", "Yukihiro"]
+LAST_NAMES = ["Lovelace", "Turing", "Hopper", "Torvalds", "Hamilton", "van Rossum", "Liskov", "Thompson",
+              "Perlman", "Ritchie", "Allen", "Dijkstra", "Johnson", "Berners-Lee", "Goldwasser", "Knuth",
+              "Lamarr", "McCarthy", "Wilson", "Matsumoto"]
+ROLES = ["backend engineer", "frontend engineer", "data scientist", "machine learning engineer", "site reliability engineer",
+         "product designer", "data engineer", "security engineer", "mobile developer", "engineering manager",
+         "QA engineer", "technical writer", "database administrator", "platform engineer", "solutions architect"]
+SKILLS = ["python", "fastapi", "django", "flask", "typescript", "react", "vue.js", "angular", "node.js", "go", "rust",
+          "java", "kotlin", "swift", "c++", "c#", "sql", "postgres", "mysql", "redis", "kafka", "spark", "airflow",
+          "pandas", "pytorch", "tensorflow", "scikit-learn", "llms", "aws", "gcp", "azure", "kubernetes", "docker",
+          "terraform", "linux", "graphql", "grpc", "figma", "accessibility", "elasticsearch", "qdrant", "dbt",
+          "snowflake", "ci/cd", "observability", "prometheus", "security", "oauth", "ios", "android"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Cyberdyne",
+             "Soylent", "Tyrell", "Aperture", "Black Mesa", "Wonka", "Vandelay", "Pied Piper", "Massive Dynamic"]
+CITIES = ["Berlin", "Chennai", "Lisbon", "Toronto", "Nairobi", "Singapore", "Austin", "Warsaw", "Tokyo", "Bogota"]
+DEGREES = ["BSc Computer Science", "MSc Data Science", "BEng Software Engineering", "BA Design", "PhD Statistics",
+           "self-taught", "MSc Electrical Engineering", "bootcamp graduate"]
+
+def synthetic_resume(rng):
+    skills = rng.sample(SKILLS, rng.randint(6, 12))
+    jobs = [f"{rng.choice(ROLES).capitalize()} at {rng.choice(COMPANIES)}, {rng.randint(1, 6)} years: "
+            f"built services with {', '.join(rng.sample(skills, 3))}." for _ in range(rng.randint(1, 4))]
+    return (f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}\n{rng.choice(ROLES).capitalize()}, {rng.choice(CITIES)}\n\n"
+            f"Skills: {', '.join(skills)}\n\nExperience\n" + "\n".join(jobs) +
+            f"\n\nEducation\n{rng.choice(DEGREES)}")
+
+def synthetic_job_description(rng):
+    return (f"We are hiring a {rng.choice(ROLES)} in {rng.choice(CITIES)}. "
+            f"You know {', '.join(rng.sample(SKILLS, 4))} and have shipped production systems.")
+
+def synthetic_metadata(rng, job_boards):
+    job_board_id = rng.randrange(job_boards)
+    return {"job_post_id": job_board_id * 10 + rng.randrange(10), "job_board_id": job_board_id,
+            "overall_score": rng.randint(0, 100)}
+
+def rss_bytes():
+    # Linux only; None elsewhere
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * 4096
+    except OSError:
+        return None
+
+def run(client, size, dimensions, quantization, mode, queries, job_boards, seed):
+    name = f"bench_scale_{uuid.uuid4().hex[:8]}"
+    settings.RESUME_VECTOR_QUANTIZATION = quantization
+    ai.create_resume_collection(client, name, dimensions, quantization)
+    vector_store = ai.resume_vector_store(client, ai.make_embeddings(dimensions), mode, collection_name=name)
+    try:
+        rng = random.Random(seed)
+        rss_before = rss_bytes()
+        batcher = IngestBatcher(vector_store, max_batch_size=settings.INGEST_BATCH_SIZE,
+                                max_wait_seconds=settings.INGEST_BATCH_WAIT_SECONDS)
+        started = time.perf_counter()
+        # Submitted in windows so a million pending documents are never held at once
+        for window in range(0, size, 10_000):
+            futures = [batcher.submit(synthetic_resume(rng), synthetic_metadata(rng, job_boards), i)
+                       for i in range(window, min(window + 10_000, size))]
+            for future in futures:
+                future.result()
+        ingest_seconds = time.perf_counter() - started
+        batcher.close()
+        rss_after = rss_bytes()
+
+        rng = random.Random(seed + 1)
+        latencies = {"all": [], "board": []}
+        for _ in range(queries):
+            query = synthetic_job_description(rng)
+            for scope, filters in [("all", {}), ("board", {"job_board_id": rng.randrange(job_boards)})]:
+                started = time.perf_counter()
+                ai.recommend_candidates(vector_store, query, k=10, **filters)
+                latencies[scope].append(time.perf_counter() - started)
+        return {"ingest_per_second": size / ingest_seconds,
+                "rss_growth": rss_after - rss_before if rss_before is not None else None,
+                "latencies": latencies}
+    finally:
+        client.delete_collection(name)
+
+def percentiles(latencies):
+    if len(latencies) < 2:
+        return latencies[0], latencies[0]
+    cuts = statistics.quantiles(latencies, n=100)
+    return cuts[49], cuts[98]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000", help="comma separated corpus sizes")
+    parser.add_argument("--configs", default="3072:none:dense,3072:none:hybrid,1024:scalar:dense,1024:scalar:hybrid,256:binary:dense",
+                        help="comma separated dimensions:quantization:mode")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--job-boards", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="Qdrant server to benchmark against (default: embedded, in memory)")
+    args = parser.parse_args()
+
+    settings.EMBEDDING_BACKEND = "hashing"
+    client = QdrantClient(url=args.url, prefer_grpc=settings.QDRANT_PREFER_GRPC) if args.url else QdrantClient(":memory:")
+    configs = [(int(d), q, m) for d, q, m in (config.split(":") for config in args.configs.split(","))]
+    print(f"{'embedded' if not args.url else 'server ' + args.url}, {args.queries} queries, k=10, "
+          f"ingest batches of {settings.INGEST_BATCH_SIZE}")
+    print(f"{'resumes':>8} {'config':>20} {'ingest/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'board p50':>10} "
+          f"{'board p99':>10} {'RSS MB':>8} {'vectors MB':>10}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        for dimensions, quantization, mode in configs:
+            result = run(client, size, dimensions, quantization, mode, args.queries, args.job_boards, args.seed)
+            p50, p99 = percentiles(result["latencies"]["all"])
+            board_p50, board_p99 = percentiles(result["latencies"]["board"])
+            ram, disk = vector_bytes(dimensions, quantization)
+            rss = f"{result['rss_growth'] / 2**20:.0f}" if result["rss_growth"] is not None and not args.url else "-"
+            print(f"{size:>8} {f'{dimensions}:{quantization}:{mode}':>20} {result['ingest_per_second']:>9.0f} "
+                  f"{p50 * 1000:>8.2f} {p99 * 1000:>8.2f} {board_p50 * 1000:>10.2f} {board_p99 * 1000:>10.2f} "
+                  f"{rss:>8} {(ram + disk) * size / 2**20:>10.0f}")
+    client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Memory per vector, search latency and top-k agreement of resume collection
+layouts (shortened dimensions, scalar/binary quantization) compared with the
+current full-size float32 layout.
+
+The corpus is test/resumes/*.pdf split into sections, embedded once at 3072
+dimensions (through the embedding cache, so reruns are free); every other
+layout is derived from those vectors the way rebuild_collection.py does it.
+Each section is also used as a query.
+
+Embedded Qdrant (the default) always searches exactly and ignores
+quantization, so only --url gives meaningful latency for quantized layouts.
+
+Usage:
+  python -m bench.vector_layouts --k 5 --layouts 3072:none,1024:scalar,256:binary
+  python -m bench.vector_layouts --url http://localhost:6333
+"""
+import argparse
+import glob
+import statistics
+import time
+import uuid
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PointStruct
+
+from ai import EMBEDDING_DIMENSIONS, EMBEDDING_MODEL, create_resume_collection, openai_embeddings, resume_search_params
+from config import settings
+from converter import extract_pages_from_pdf_bytes
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+from preprocess import clean_pages
+from rebuild_collection import shorten
+
+BASELINE = (EMBEDDING_DIMENSIONS, "none")
+
+def load_sections(min_chars):
+    sections = []
+    for filename in sorted(glob.glob("test/resumes/*.pdf")):
+        with open(filename, "rb") as f:
+            text = clean_pages(extract_pages_from_pdf_bytes(f.read()))
+        sections.extend(s for s in text.split("\n\n") if len(s) >= min_chars)
+    return sections
+
+def vector_bytes(dimensions, quantization):
+    # (bytes kept in RAM, bytes on disk) per vector, before index overhead
+    full = dimensions * 4
+    if quantization == "scalar":
+        return dimensions, full
+    if quantization == "binary":
+        return dimensions // 8, full
+    return full, 0
+
+def run_layout(client, vectors, dimensions, quantization, k):
+    name = f"bench_{dimensions}_{quantization}_{uuid.uuid4().hex[:8]}"
+    create_resume_collection(client, name, dimensions, quantization)
+    try:
+        shortened = [shorten(v, dimensions) for v in vectors]
+        for i in range(0, len(shortened), 256):
+            client.upsert(name, points=[PointStruct(id=j, vector=v) for j, v in enumerate(shortened[i:i + 256], start=i)])
+        search_params = resume_search_params(quantization)
+        latencies, results = [], []
+        for query in shortened:
+            started = time.perf_counter()
+            points = client.query_points(name, query=query, limit=k, search_params=search_params).points
+            latencies.append(time.perf_counter() - started)
+            results.append([p.id for p in points])
+        return latencies, results
+    finally:
+        client.delete_collection(name)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--layouts", default="3072:none,1024:none,1024:scalar,256:scalar,3072:binary,1024:binary",
+                        help="comma separated dimensions:quantization pairs")
+    parser.add_argument("--url", help="Qdrant server to benchmark against (default: embedded, in memory)")
+    parser.add_argument("--min-chars", type=int, default=40, help="shorter sections are not used")
+    args = parser.parse_args()
+
+    sections = load_sections(args.min_chars)
+    cache = EmbeddingCache(settings.EMBEDDING_CACHE_PATH)
+    embeddings = CachedEmbeddings(openai_embeddings(EMBEDDING_DIMENSIONS), cache, EMBEDDING_MODEL, EMBEDDING_DIMENSIONS)
+    vectors = embeddings.embed_documents(sections)
+    client = QdrantClient(url=args.url) if args.url else QdrantClient(":memory:")
+
+    layouts = [(int(d), q) for d, q in (layout.split(":") for layout in args.layouts.split(","))]
+    _, baseline = run_layout(client, vectors, *BASELINE, args.k)
+    print(f"{len(sections)} sections, k={args.k}, {'server ' + args.url if args.url else 'embedded'}")
+    print(f"{'layout':>14} {'RAM B/vec':>10} {'disk B/vec':>10} {'p50 ms':>8} {'p99 ms':>8} {'top-k agreement':>16}")
+    for dimensions, quantization in layouts:
+        latencies, results = run_layout(client, vectors, dimensions, quantization, args.k)
+        ram, disk = vector_bytes(dimensions, quantization)
+        cuts = statistics.quantiles(latencies, n=100)
+        agreement = statistics.mean(len(set(r) & set(b)) / len(b) for r, b in zip(results, baseline))
+        print(f"{dimensions:>6}:{quantization:<7} {ram:>10} {disk:>10} {cuts[49] * 1000:>8.2f} {cuts[98] * 1000:>8.2f} {agreement:>16.3f}")
+    client.close()
+    cache.close()
+
+if __name__ == "__main__":
+    main()
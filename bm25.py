@@ -0,0 +1,44 @@
+import hashlib
+import re
+from collections import Counter
+from langchain_qdrant import SparseEmbeddings, SparseVector
+
+# Keeps the punctuation that is part of skill names: c++, c#, node.js, vue.js
+TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have i in is it its of on or our that the their this to was we were will with
+you your who which can all also am been but do does not so such than then there these they those us
+""".split())
+
+def tokenize(text):
+    return [token for token in TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+def token_index(token):
+    # Stable across processes and releases, unlike hash(); Qdrant sparse
+    # indices are unsigned 32-bit
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "big")
+
+# BM25 term weights computed locally; Qdrant applies the IDF part at query time
+class BM25SparseEmbeddings(SparseEmbeddings):
+    def __init__(self, k1=1.2, b=0.75, avg_doc_length=256):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = avg_doc_length
+
+    def _vector(self, weights):
+        merged = Counter()
+        for token, weight in weights.items():
+            merged[token_index(token)] += weight
+        indices = sorted(merged)
+        return SparseVector(indices=indices, values=[float(merged[i]) for i in indices])
+
+    def embed_document(self, text):
+        counts = Counter(tokenize(text))
+        length_norm = 1 - self.b + self.b * sum(counts.values()) / self.avg_doc_length
+        return self._vector({token: tf * (self.k1 + 1) / (tf + self.k1 * length_norm) for token, tf in counts.items()})
+
+    def embed_documents(self, texts):
+        return [self.embed_document(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector({token: 1.0 for token in set(tokenize(text))})
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import AnyUrl
+from typing import Literal
 
 class Settings(BaseSettings):
     DATABASE_URL: AnyUrl
@@ -14,8 +15,127 @@ class Settings(BaseSettings):
     QDRANT_URL: AnyUrl
     IS_CI: bool = False
 
+    # Connection pool, one per process (i.e. per uvicorn worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False
+
+    # Background job queue (see job_queue.py and worker.py)
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_DEFAULT_CONCURRENCY: int = 4
+    JOB_CONCURRENCY_LIMITS: dict[str, int] = {"send_email": 8, "extract_resume": 2, "evaluate_resume": 4, "ingest_resume": 16,
+                                             "rescore_job_post": 1}
+    # Job types a worker claims several of at a time and runs side by side
+    JOB_BATCH_SIZES: dict[str, int] = {"ingest_resume": 8}
+    JOB_RETRY_BASE_SECONDS: float = 10
+    JOB_RETRY_MAX_SECONDS: float = 600
+    JOB_LEASE_SECONDS: int = 600
+    JOB_POLL_INTERVAL_SECONDS: float = 1
+
+    # PDF text extraction (see converter.py)
+    PDF_EXTRACTION_MODE: Literal["pool", "serial"] = "pool"
+    PDF_POOL_PROCESSES: int = 2
+    PDF_POOL_MAX_TASKS_PER_CHILD: int = 100
+    PDF_EXTRACTION_TIMEOUT_SECONDS: float = 20
+    PDF_MAX_BYTES: int = 10 * 1024 * 1024
+    PDF_MAX_PAGES: int = 20
+    PDF_MAX_CHARS: int = 60_000
+
+    # Uploads are hashed, sniffed and stored in UPLOAD_CHUNK_BYTES chunks
+    # (see file_storage.inspect_upload) and refused past their size cap;
+    # whole requests are cut off at UPLOAD_MAX_REQUEST_BYTES while they are
+    # received (see request_limits.py), which leaves room for the other
+    # form fields
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    UPLOAD_MAX_RESUME_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_MAX_LOGO_BYTES: int = 2 * 1024 * 1024
+    UPLOAD_MAX_REQUEST_BYTES: int = 11 * 1024 * 1024
+
+    # File storage (see file_storage.py). "auto" is Supabase in production
+    # and the local uploads/ directory otherwise. "s3" is any S3-compatible
+    # store (e.g. MinIO) at S3_ENDPOINT_URL; objects are served from
+    # S3_PUBLIC_URL when set (a CDN or public bucket domain)
+    STORAGE_BACKEND: Literal["auto", "local", "supabase", "s3"] = "auto"
+    STORAGE_MAX_CONNECTIONS: int = 20
+    STORAGE_TIMEOUT_SECONDS: float = 30
+    S3_ENDPOINT_URL: str = ""
+    S3_REGION: str = "us-east-1"
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_PUBLIC_URL: str = ""
+
+    # LLM response cache (see llm_cache.py)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "llm_cache.sqlite3"
+    LLM_CACHE_MEMORY_ENTRIES: int = 1024
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # Model backends. "hashing" embeddings and "canned" chat answers are
+    # computed locally and deterministically (see local_models.py), for
+    # benchmarks and offline runs; their quality means nothing
+    EMBEDDING_BACKEND: Literal["openai", "hashing"] = "openai"
+    CHAT_BACKEND: Literal["openai", "canned"] = "openai"
+    # Embedding cache (see embedding_cache.py)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "embedding_cache.sqlite3"
+    EMBEDDING_CACHE_MEMORY_ENTRIES: int = 2048
+    EMBEDDING_CACHE_DTYPE: Literal["float32", "float16"] = "float32"
+
+    # Concurrent resume evaluation (see evaluation_engine.py); keep the rate
+    # limits at or below the organisation's OpenAI limits for the model
+    EVAL_MAX_CONCURRENCY: int = 8
+    EVAL_MAX_RETRIES: int = 6
+    OPENAI_REQUESTS_PER_MINUTE: int = 500
+    OPENAI_TOKENS_PER_MINUTE: int = 200_000
+    RESCORE_BATCH_SIZE: int = 50
+    # A rescore_job_post job stops after the batch that runs past this and
+    # queues its own continuation, so it stays well inside JOB_LEASE_SECONDS
+    RESCORE_JOB_SECONDS: float = 240
+
+    # Resume evaluation prompts (see preprocess.py): inputs are compressed to
+    # these many tokens before they are put into the prompt
+    TOKENIZER_ENCODING: str = "o200k_base"
+    RESUME_TOKEN_BUDGET: int = 2500
+    JOB_DESCRIPTION_TOKEN_BUDGET: int = 1500
+
+    # Resume vector store. "server" connects to QDRANT_URL. "local" keeps an
+    # embedded store in QDRANT_PATH, which only one process can open: only
+    # for development, with a single worker process (worker.py --processes 1)
+    QDRANT_MODE: Literal["local", "server"] = "server"
+    QDRANT_PATH: str = "qdrant_store"
+    QDRANT_PREFER_GRPC: bool = True
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_POOL_SIZE: int = 20
+    QDRANT_TIMEOUT_SECONDS: int = 10
+    # Layout of the resume collection. Embeddings are shortened to
+    # RESUME_VECTOR_DIMENSIONS (at most 3072); with quantization the compact
+    # vectors are searched and the best candidates rescored with the
+    # originals. Change these together with RESUME_COLLECTION, after
+    # rebuilding the collection with rebuild_collection.py
+    RESUME_COLLECTION: str = "resumes"
+    RESUME_VECTOR_DIMENSIONS: int = 3072
+    RESUME_VECTOR_QUANTIZATION: Literal["none", "scalar", "binary"] = "none"
+    RESUME_VECTORS_ON_DISK: bool = True
+    RESUME_SEARCH_OVERSAMPLING: float = 3.0
+    # "hybrid" also matches exact keywords through a BM25 sparse vector (see
+    # bm25.py) and fuses both rankings; collections created before it was
+    # added are searched dense only until they are rebuilt
+    RESUME_RETRIEVAL_MODE: Literal["dense", "hybrid"] = "hybrid"
+    # Resumes are embedded and written in batches (see ingest_batcher.py)
+    INGEST_BATCH_SIZE: int = 32
+    INGEST_BATCH_WAIT_SECONDS: float = 0.05
+    # Candidate shortlists (see shortlists.py): job descriptions are embedded
+    # into JOB_POST_COLLECTION, and each open post keeps its SHORTLIST_SIZE
+    # closest resumes from its job board, at least SHORTLIST_MIN_SIMILARITY
+    JOB_POST_COLLECTION: str = "job_posts"
+    SHORTLIST_SIZE: int = 50
+    SHORTLIST_MIN_SIMILARITY: float = 0.3
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
 
-settings = Settings() 
\ No newline at end of file
+settings = Settings()
@@ -1,11 +1,153 @@
+import multiprocessing
+import threading
 from io import BytesIO
 from pypdf import PdfReader
+from config import settings
+
+class PdfExtractionError(Exception):
+    pass
+
+def iter_pdf_pages(pdf_bytes: bytes, max_pages=None, max_chars=None):
+    # Yields page texts as they are extracted and stops early once max_pages
+    # pages or max_chars characters have been produced
+    if len(pdf_bytes) > settings.PDF_MAX_BYTES:
+        raise PdfExtractionError(f"PDF is {len(pdf_bytes)} bytes, the limit is {settings.PDF_MAX_BYTES}")
+    try:
+        reader = PdfReader(BytesIO(pdf_bytes))
+        chars = 0
+        for i, p in enumerate(reader.pages):
+            if max_pages is not None and i >= max_pages:
+                return
+            text = p.extract_text() or ""
+            yield text
+            chars += len(text)
+            if max_chars is not None and chars >= max_chars:
+                return
+    except Exception as e:
+        # Malformed files also surface as ValueError, KeyError, struct.error...
+        # from deep inside pypdf, not only as PyPdfError
+        raise PdfExtractionError(f"Could not read PDF: {e}") from e
+
+def extract_pages_from_pdf_bytes(pdf_bytes: bytes, max_pages=None, max_chars=None) -> list[str]:
+    return list(iter_pdf_pages(pdf_bytes, max_pages, max_chars))
 
 def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
-    reader = PdfReader(BytesIO(pdf_bytes))
-    pages = []
-    for p in reader.pages:
-        text = p.extract_text() or ""
-        pages.append(text)
-    return "\n\n".join(pages).strip()
+    return "\n\n".join(extract_pages_from_pdf_bytes(pdf_bytes)).strip()
+
+# pypdf is pure Python and holds the GIL, so the pool uses processes. It is
+# created on first use. A worker stuck inside pypdf cannot be interrupted, so
+# when a document times out its pool is retired: new extractions go to a new
+# pool at once, and the old one is terminated once the extractions already
+# waiting on it are done, so they are not failed along with the stuck one.
+_pool = None
+_pool_lock = threading.Lock()
+_pool_users = {}
+_retired_pools = set()
+
+def _current_pool():
+    # Called with _pool_lock held
+    global _pool
+    if _pool is None:
+        context = multiprocessing.get_context("spawn")
+        _pool = context.Pool(processes=settings.PDF_POOL_PROCESSES,
+                             maxtasksperchild=settings.PDF_POOL_MAX_TASKS_PER_CHILD)
+    return _pool
+
+def get_pool():
+    with _pool_lock:
+        return _current_pool()
+
+def _checkout_pool():
+    # Counted in the same step, so the pool can't be terminated in between
+    with _pool_lock:
+        pool = _current_pool()
+        _pool_users[pool] = _pool_users.get(pool, 0) + 1
+        return pool
+
+def _checkin_pool(pool, timed_out=False):
+    global _pool
+    with _pool_lock:
+        _pool_users[pool] -= 1
+        if timed_out:
+            _retired_pools.add(pool)
+            if _pool is pool:
+                _pool = None
+        drained = pool in _retired_pools and _pool_users[pool] == 0
+        if drained:
+            _retired_pools.discard(pool)
+            del _pool_users[pool]
+    if drained:
+        pool.terminate()
+        pool.join()
+
+def shutdown_pool(terminate=False):
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+        retired = list(_retired_pools)
+        _retired_pools.clear()
+        _pool_users.clear()
+    for stuck in retired:
+        stuck.terminate()
+        stuck.join()
+    if pool is not None:
+        if terminate:
+            pool.terminate()
+        else:
+            pool.close()
+        pool.join()
+
+def extract_pages_in_pool(pdf_bytes: bytes, max_pages=None, max_chars=None, timeout=None) -> list[str]:
+    if len(pdf_bytes) > settings.PDF_MAX_BYTES:
+        raise PdfExtractionError(f"PDF is {len(pdf_bytes)} bytes, the limit is {settings.PDF_MAX_BYTES}")
+    timeout = timeout or settings.PDF_EXTRACTION_TIMEOUT_SECONDS
+    pool = _checkout_pool()
+    timed_out = False
+    try:
+        return pool.apply_async(extract_pages_from_pdf_bytes, (pdf_bytes, max_pages, max_chars)).get(timeout)
+    except multiprocessing.TimeoutError:
+        timed_out = True
+        raise PdfExtractionError(f"PDF extraction took longer than {timeout}s")
+    finally:
+        _checkin_pool(pool, timed_out)
+
+def extract_many_in_pool(pdf_documents: list[bytes], max_pages=None, max_chars=None, timeout=None) -> list:
+    # Extracts the documents side by side. Returns, in order, the pages of
+    # each document or the PdfExtractionError it failed with. When one times
+    # out its pool is retired, and the documents after it are started again
+    # in a new one.
+    timeout = timeout or settings.PDF_EXTRACTION_TIMEOUT_SECONDS
+    results = [None] * len(pdf_documents)
+    pending = []
+    for i, pdf_bytes in enumerate(pdf_documents):
+        if len(pdf_bytes) > settings.PDF_MAX_BYTES:
+            results[i] = PdfExtractionError(f"PDF is {len(pdf_bytes)} bytes, the limit is {settings.PDF_MAX_BYTES}")
+        else:
+            pending.append(i)
+    while pending:
+        pool = _checkout_pool()
+        timed_out = False
+        try:
+            submitted = [(i, pool.apply_async(extract_pages_from_pdf_bytes, (pdf_documents[i], max_pages, max_chars)))
+                         for i in pending]
+            pending = []
+            for n, (i, result) in enumerate(submitted):
+                try:
+                    results[i] = result.get(timeout)
+                except multiprocessing.TimeoutError:
+                    results[i] = PdfExtractionError(f"PDF extraction took longer than {timeout}s")
+                    timed_out = True
+                    pending = [j for j, _ in submitted[n + 1:]]
+                    break
+                except Exception as e:
+                    results[i] = e if isinstance(e, PdfExtractionError) else PdfExtractionError(f"Could not read PDF: {e}")
+        finally:
+            _checkin_pool(pool, timed_out)
+    return results
 
+def extract_resume_pages(pdf_bytes: bytes) -> list[str]:
+    # What the resume pipeline uses: the configured limits, in the pool
+    # unless PDF_EXTRACTION_MODE is "serial"
+    if settings.PDF_EXTRACTION_MODE == "serial":
+        return extract_pages_from_pdf_bytes(pdf_bytes, settings.PDF_MAX_PAGES, settings.PDF_MAX_CHARS)
+    return extract_pages_in_pool(pdf_bytes, settings.PDF_MAX_PAGES, settings.PDF_MAX_CHARS)
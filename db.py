@@ -1,14 +1,182 @@
-from sqlalchemy import create_engine
-from config import settings
+import threading
+import time
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlalchemy.orm import sessionmaker
 from config import settings
 
+# Records checkout counts and how long callers wait for a connection
+class PoolMetricsMixin:
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.stats_lock = threading.Lock()
+    self.checkouts = 0
+    self.checkins = 0
+    self.connects = 0
+    self.overflow_connects = 0
+    self.timeouts = 0
+    self.wait_seconds_total = 0.0
+    self.wait_seconds_max = 0.0
+
+  def _do_get(self):
+    started = time.perf_counter()
+    try:
+      return super()._do_get()
+    except exc.TimeoutError:
+      with self.stats_lock:
+        self.timeouts += 1
+      raise
+    finally:
+      waited = time.perf_counter() - started
+      with self.stats_lock:
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+  def recreate(self):
+    # QueuePool.recreate builds a fresh pool through __init__, so the counters
+    # survive only if we carry them over explicitly.
+    new_pool = super().recreate()
+    for name in ("checkouts", "checkins", "connects", "overflow_connects",
+                 "timeouts", "wait_seconds_total", "wait_seconds_max"):
+      setattr(new_pool, name, getattr(self, name))
+    return new_pool
+
+class MeteredQueuePool(PoolMetricsMixin, QueuePool):
+  pass
+
+class MeteredAsyncAdaptedQueuePool(PoolMetricsMixin, AsyncAdaptedQueuePool):
+  pass
+
+_engine = None
+_session_factory = None
+_async_engine = None
+_async_session_factory = None
+_engine_lock = threading.Lock()
+
+def async_database_url(url):
+  # Same database, reached through psycopg 3's asyncio driver
+  return make_url(str(url)).set(drivername="postgresql+psycopg")
+
+def _pool_options():
+  return dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    echo=settings.DB_ECHO)
+
+def _attach_pool_listeners(engine):
+  @event.listens_for(engine, "connect")
+  def on_connect(dbapi_connection, connection_record):
+    pool = engine.pool
+    with pool.stats_lock:
+      pool.connects += 1
+      if pool.overflow() > 0:
+        pool.overflow_connects += 1
+
+  @event.listens_for(engine, "checkout")
+  def on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool = engine.pool
+    with pool.stats_lock:
+      pool.checkouts += 1
+
+  @event.listens_for(engine, "checkin")
+  def on_checkin(dbapi_connection, connection_record):
+    pool = engine.pool
+    with pool.stats_lock:
+      pool.checkins += 1
+
+def get_engine():
+  global _engine, _session_factory
+  if _engine is None:
+    with _engine_lock:
+      if _engine is None:
+        engine = create_engine(
+          str(settings.DATABASE_URL),
+          poolclass=MeteredQueuePool,
+          **_pool_options())
+        _attach_pool_listeners(engine)
+        _session_factory = sessionmaker(bind=engine)
+        _engine = engine
+  return _engine
+
+def get_session_factory():
+  get_engine()
+  return _session_factory
+
+def get_async_engine():
+  global _async_engine, _async_session_factory
+  if _async_engine is None:
+    with _engine_lock:
+      if _async_engine is None:
+        engine = create_async_engine(
+          async_database_url(settings.DATABASE_URL),
+          poolclass=MeteredAsyncAdaptedQueuePool,
+          **_pool_options())
+        _attach_pool_listeners(engine.sync_engine)
+        # expire_on_commit=False: handlers return ORM objects after commit and
+        # an expired attribute cannot be lazily reloaded outside the event loop
+        _async_session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        _async_engine = engine
+  return _async_engine
+
+def get_async_session_factory():
+  get_async_engine()
+  return _async_session_factory
+
+def dispose_engine():
+  global _engine, _session_factory
+  with _engine_lock:
+    if _engine is not None:
+      _engine.dispose()
+    _engine = None
+    _session_factory = None
+
+async def dispose_async_engine():
+  global _async_engine, _async_session_factory
+  engine = _async_engine
+  _async_engine = None
+  _async_session_factory = None
+  if engine is not None:
+    await engine.dispose()
+
+def _engine_pool_stats(engine):
+  if engine is None:
+    return {"initialized": False}
+  pool = engine.pool
+  with pool.stats_lock:
+    return {
+      "initialized": True,
+      "pool_size": pool.size(),
+      "max_overflow": settings.DB_MAX_OVERFLOW,
+      "checked_out": pool.checkedout(),
+      "checked_in": pool.checkedin(),
+      "overflow": max(pool.overflow(), 0),
+      "checkouts": pool.checkouts,
+      "checkins": pool.checkins,
+      "connects": pool.connects,
+      "overflow_connects": pool.overflow_connects,
+      "timeouts": pool.timeouts,
+      "wait_seconds_total": round(pool.wait_seconds_total, 6),
+      "wait_seconds_max": round(pool.wait_seconds_max, 6),
+    }
+
+def get_pool_stats():
+  return {
+    "sync": _engine_pool_stats(_engine),
+    "async": _engine_pool_stats(None if _async_engine is None else _async_engine.sync_engine),
+  }
+
 def get_db():
-  engine = create_engine(str(settings.DATABASE_URL), echo=not settings.PRODUCTION)
-  db = sessionmaker(bind=engine)()
+  db = get_session_factory()()
   try:
       yield db
   finally:
       db.close()
 
-
+async def get_async_db():
+  async with get_async_session_factory()() as db:
+    yield db
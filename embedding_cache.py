@@ -0,0 +1,111 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+def text_sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+# Embedding vectors by (model, dimensions, sha256 of the text), as float blobs in SQLite.
+# Embeddings of a text never change for a model, so entries do not expire
+class EmbeddingCache:
+    def __init__(self, path, max_memory_entries=2048, dtype="float32"):
+        self.dtype = np.dtype(dtype)
+        self.max_memory_entries = max_memory_entries
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                model TEXT NOT NULL,
+                dimensions INTEGER NOT NULL,
+                text_sha256 TEXT NOT NULL,
+                dtype TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, dimensions, text_sha256)
+            )""")
+        self.connection.commit()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _remember(self, key, vector):
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def get_many(self, model, dimensions, hashes):
+        # Returns {sha256: vector} for the hashes that are cached
+        found = {}
+        with self.lock:
+            for sha in hashes:
+                vector = self.memory.get((model, dimensions, sha))
+                if vector is not None:
+                    self.memory.move_to_end((model, dimensions, sha))
+                    self.stats["memory_hits"] += 1
+                    found[sha] = vector
+            missing = [sha for sha in hashes if sha not in found]
+            # SQLite allows 999 bound parameters per statement
+            for i in range(0, len(missing), 900):
+                chunk = missing[i:i + 900]
+                rows = self.connection.execute(
+                    f"SELECT text_sha256, dtype, vector FROM embedding_cache "
+                    f"WHERE model = ? AND dimensions = ? AND text_sha256 IN ({','.join('?' * len(chunk))})",
+                    (model, dimensions, *chunk)).fetchall()
+                for sha, dtype, blob in rows:
+                    vector = np.frombuffer(blob, dtype=dtype)
+                    self._remember((model, dimensions, sha), vector)
+                    self.stats["disk_hits"] += 1
+                    found[sha] = vector
+            self.stats["misses"] += len(set(hashes) - set(found))
+        return found
+
+    def set_many(self, model, dimensions, vectors):
+        # vectors: {sha256: list of floats}
+        rows = []
+        with self.lock:
+            for sha, vector in vectors.items():
+                vector = np.asarray(vector, dtype=self.dtype)
+                self._remember((model, dimensions, sha), vector)
+                rows.append((model, dimensions, sha, self.dtype.name, vector.tobytes()))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (model, dimensions, text_sha256, dtype, vector) "
+                "VALUES (?, ?, ?, ?, ?)", rows)
+            self.connection.commit()
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats, memory_entries=len(self.memory))
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+# Only texts not seen before are sent to the wrapped embeddings
+class CachedEmbeddings(Embeddings):
+    def __init__(self, embeddings, cache, model, dimensions):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model
+        self.dimensions = dimensions
+
+    def embed_documents(self, texts):
+        hashes = [text_sha256(text) for text in texts]
+        found = self.cache.get_many(self.model, self.dimensions, list(dict.fromkeys(hashes)))
+        # Each distinct missing text is embedded once, in a single request
+        missing = {sha: text for sha, text in zip(hashes, texts) if sha not in found}
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            new = dict(zip(missing, vectors))
+            self.cache.set_many(self.model, self.dimensions, new)
+            found.update(new)
+        return [found[sha] if isinstance(found[sha], list) else found[sha].tolist() for sha in hashes]
+
+    def embed_query(self, text):
+        # OpenAI embeds queries and documents the same way, so they share entries
+        return self.embed_documents([text])[0]
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+import random
+import time
+import openai
+from ai import (RESUME_EVAL_PROMPT_VERSION, async_chat_client, build_system_and_user_messages, get_llm_cache,
+                log_usage)
+from config import settings
+from llm_cache import make_key
+from preprocess import count_tokens, prepare_evaluation_inputs
+
+logger = logging.getLogger(__name__)
+
+MAX_COMPLETION_TOKENS = 1000
+
+# Token buckets for requests and tokens per minute, full at the start and
+# refilled continuously like the OpenAI limits
+class RateLimiter:
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.capacity = {"requests": float(requests_per_minute), "tokens": float(tokens_per_minute)}
+        self.available = dict(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        for name, capacity in self.capacity.items():
+            self.available[name] = min(capacity, self.available[name] + elapsed * capacity / 60)
+
+    async def acquire(self, tokens):
+        tokens = min(tokens, self.capacity["tokens"])
+        async with self.lock:
+            while True:
+                self._refill()
+                missing_requests = 1 - self.available["requests"]
+                missing_tokens = tokens - self.available["tokens"]
+                if missing_requests <= 0 and missing_tokens <= 0:
+                    self.available["requests"] -= 1
+                    self.available["tokens"] -= tokens
+                    return
+                wait = max(missing_requests * 60 / self.capacity["requests"],
+                           missing_tokens * 60 / self.capacity["tokens"])
+                await asyncio.sleep(wait)
+
+    def adjust_tokens(self, delta):
+        # Settles the difference between the estimate and the reported usage
+        self.available["tokens"] = min(self.capacity["tokens"], self.available["tokens"] - delta)
+
+def is_retryable(error):
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+def retry_after_seconds(error):
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+# Scores resumes concurrently: at most max_concurrency requests in flight,
+# paced by the RPM/TPM budget, 429/5xx/connection errors retried with backoff
+class EvaluationEngine:
+    def __init__(self, client=None, model="gpt-4o-mini", temperature=0,
+                 max_concurrency=None, requests_per_minute=None, tokens_per_minute=None,
+                 max_retries=None, backoff_base_seconds=0.5, backoff_max_seconds=30):
+        # Retries are ours to schedule, so the SDK must not retry on its own
+        self.client = client or async_chat_client(max_retries=0)
+        self.model = model
+        self.temperature = temperature
+        self.semaphore = asyncio.Semaphore(max_concurrency or settings.EVAL_MAX_CONCURRENCY)
+        self.limiter = RateLimiter(requests_per_minute or settings.OPENAI_REQUESTS_PER_MINUTE,
+                                   tokens_per_minute or settings.OPENAI_TOKENS_PER_MINUTE)
+        self.max_retries = settings.EVAL_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.stats = {"queued": 0, "in_flight": 0, "completed": 0, "failed": 0,
+                      "retries": 0, "rate_limited": 0, "cache_hits": 0,
+                      "prompt_tokens": 0, "completion_tokens": 0}
+
+    def estimate_tokens(self, messages):
+        # The prompt as counted by the tokenizer, plus the completion budget
+        return sum(count_tokens(m["content"]) for m in messages) + MAX_COMPLETION_TOKENS
+
+    def backoff(self, attempt, error):
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return retry_after
+        ceiling = min(self.backoff_base_seconds * 2 ** attempt, self.backoff_max_seconds)
+        return random.uniform(0, ceiling)
+
+    async def evaluate(self, resume_text, job_desc):
+        resume_text, job_desc = prepare_evaluation_inputs(resume_text, job_desc)
+        cache = get_llm_cache()
+        key = make_key("evaluate_resume", self.model, self.temperature, RESUME_EVAL_PROMPT_VERSION, resume_text, job_desc)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                self.stats["completed"] += 1
+                return cached
+
+        messages = build_system_and_user_messages(resume_text, job_desc)
+        estimated_tokens = self.estimate_tokens(messages)
+        self.stats["queued"] += 1
+        try:
+            async with self.semaphore:
+                self.stats["queued"] -= 1
+                self.stats["in_flight"] += 1
+                try:
+                    resp = await self._create_with_retries(messages, estimated_tokens)
+                finally:
+                    self.stats["in_flight"] -= 1
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+
+        result = json.loads(resp.choices[0].message.content.strip())
+        if cache is not None:
+            cache.set(key, "evaluate_resume", RESUME_EVAL_PROMPT_VERSION, result,
+                      resp.usage.total_tokens if resp.usage else 0)
+        self.stats["completed"] += 1
+        return result
+
+    async def _create_with_retries(self, messages, estimated_tokens):
+        attempt = 0
+        while True:
+            await self.limiter.acquire(estimated_tokens)
+            started = time.perf_counter()
+            try:
+                resp = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=MAX_COMPLETION_TOKENS
+                )
+            except Exception as error:
+                if not is_retryable(error) or attempt >= self.max_retries:
+                    raise
+                if isinstance(error, openai.RateLimitError):
+                    self.stats["rate_limited"] += 1
+                delay = self.backoff(attempt, error)
+                logger.warning("OpenAI call failed (%s), retry %s in %.2fs", error.__class__.__name__, attempt + 1, delay)
+                self.stats["retries"] += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            log_usage("evaluate_resume", self.model, resp.usage, time.perf_counter() - started)
+            if resp.usage:
+                self.limiter.adjust_tokens(resp.usage.total_tokens - estimated_tokens)
+                self.stats["prompt_tokens"] += resp.usage.prompt_tokens
+                self.stats["completion_tokens"] += resp.usage.completion_tokens
+            return resp
+
+    async def evaluate_many(self, items):
+        # items: (resume_text, job_desc) pairs. Returns results in the same
+        # order, with the exception in place of any evaluation that failed.
+        return await asyncio.gather(*(self.evaluate(resume_text, job_desc) for resume_text, job_desc in items),
+                                    return_exceptions=True)
+
+    def get_stats(self):
+        return dict(self.stats, queue_depth=self.stats["queued"])
@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+from sqlalchemy import select
+from models import JobApplication, JobApplicationAIEvaluation
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = ["job_application_id", "first_name", "last_name", "email", "resume_url",
+                  "overall_score", "evaluation"]
+
+def export_query(job_post_id):
+    # Plain columns rather than ORM entities: nothing lands in the session's
+    # identity map, so memory does not grow with the number of applicants
+    return select(JobApplication.id.label("job_application_id"),
+                  JobApplication.first_name,
+                  JobApplication.last_name,
+                  JobApplication.email,
+                  JobApplication.resume_url,
+                  JobApplicationAIEvaluation.overall_score,
+                  JobApplicationAIEvaluation.evaluation) \
+        .outerjoin(JobApplicationAIEvaluation, JobApplicationAIEvaluation.job_application_id == JobApplication.id) \
+        .filter(JobApplication.job_post_id == job_post_id) \
+        .order_by(JobApplication.id, JobApplicationAIEvaluation.id) \
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+def to_ndjson(rows):
+    return "".join(json.dumps(dict(row._mapping)) + "\n" for row in rows)
+
+def to_csv(rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        values = dict(row._mapping)
+        if values["evaluation"] is not None:
+            values["evaluation"] = json.dumps(values["evaluation"])
+        writer.writerow([values[column] for column in EXPORT_COLUMNS])
+    return buffer.getvalue()
+
+async def stream_job_post_export(session_factory, job_post_id, format):
+    # The session lives inside the generator because the response body is
+    # produced after the handler (and its request-scoped session) has returned
+    async with session_factory() as session:
+        result = await session.stream(export_query(job_post_id))
+        if format == "csv":
+            yield to_csv([], header=True)
+        async for rows in result.partitions():
+            yield to_csv(rows) if format == "csv" else to_ndjson(rows)
@@ -1,19 +1,284 @@
+import abc
+import asyncio
+import datetime
+import hashlib
+import hmac
 import os
-from supabase import create_client, Client
+import shutil
+import threading
+import time
+from urllib.parse import parse_qsl, quote, urlsplit
+import httpx
 from config import settings
+from metrics import Histogram
 
 UPLOAD_DIR = "uploads"
-supabase: Client = create_client(str(settings.SUPABASE_URL), settings.SUPABASE_KEY)
-
-def upload_file(bucket_name, path, contents, content_type):
-  if settings.PRODUCTION:
-    response = supabase.storage.from_(bucket_name) \
-                .upload(path, contents, {"content-type": content_type, "upsert": "true"})
-    return f"{str(settings.SUPABASE_URL)}/storage/v1/object/public/{response.full_path}"
-  else:
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+
+# Uploads take contents as bytes, or as a binary file positioned at the
+# start, which is streamed rather than read into memory
+
+def _content_length(contents):
+  if isinstance(contents, bytes):
+    return len(contents)
+  position = contents.tell()
+  end = contents.seek(0, os.SEEK_END)
+  contents.seek(position)
+  return end - position
+
+async def _iter_chunks(contents):
+  # File reads are offloaded so a slow disk doesn't stall the event loop
+  while chunk := await asyncio.to_thread(contents.read, settings.UPLOAD_CHUNK_BYTES):
+    yield chunk
+
+def _body(contents):
+  return contents if isinstance(contents, bytes) else _iter_chunks(contents)
+
+def _limits():
+  return httpx.Limits(max_connections=settings.STORAGE_MAX_CONNECTIONS,
+                      max_keepalive_connections=settings.STORAGE_MAX_CONNECTIONS)
+
+# Uploads from async code; downloads stay blocking, over a pooled client,
+# since only the worker and reindex.py's threads make them
+class StorageBackend(abc.ABC):
+  name = None
+
+  def __init__(self, transport=None):
+    self.http = httpx.Client(limits=_limits(), timeout=settings.STORAGE_TIMEOUT_SECONDS,
+                             follow_redirects=True, transport=transport)
+    self.stats = {"backend": self.name, "uploads": 0, "errors": 0, "bytes": 0}
+    self.latencies = Histogram([0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30])
+
+  async def upload(self, bucket_name, path, contents, content_type):
+    # Returns the URL the file is served from
+    size = _content_length(contents)
+    started = time.perf_counter()
+    try:
+      url = await self._upload(bucket_name, path, contents, content_type, size)
+    except BaseException:
+      self.stats["errors"] += 1
+      raise
+    self.latencies.observe(time.perf_counter() - started)
+    self.stats["uploads"] += 1
+    self.stats["bytes"] += size
+    return url
+
+  @abc.abstractmethod
+  async def _upload(self, bucket_name, path, contents, content_type, size):
+    pass
+
+  def download(self, file_url):
+    if file_url.startswith("http://") or file_url.startswith("https://"):
+      response = self.http.get(file_url)
+      response.raise_for_status()
+      return response.content
+    with open(file_url.lstrip("/"), 'rb') as f:
+      return f.read()
+
+  async def close(self):
+    self.http.close()
+
+  def get_stats(self):
+    return dict(self.stats, latency_seconds=self.latencies.snapshot())
+
+class LocalStorage(StorageBackend):
+  # Under UPLOAD_DIR, which main.py serves as /uploads in development
+  name = "local"
+
+  def _write(self, bucket_name, path, contents):
     dir_path = os.path.join(UPLOAD_DIR, bucket_name)
     os.makedirs(dir_path, exist_ok=True)
     file_path = os.path.join(dir_path, path)
     with open(file_path, 'wb') as f:
-      f.write(contents)
+      if isinstance(contents, bytes):
+        f.write(contents)
+      else:
+        shutil.copyfileobj(contents, f, settings.UPLOAD_CHUNK_BYTES)
     return f"/{dir_path}/{path}"
+
+  async def _upload(self, bucket_name, path, contents, content_type, size):
+    return await asyncio.to_thread(self._write, bucket_name, path, contents)
+
+class SupabaseStorage(StorageBackend):
+  # Supabase Storage's REST API, into public buckets
+  name = "supabase"
+
+  def __init__(self, url, key, transport=None):
+    super().__init__(transport)
+    self.url = url.rstrip("/")
+    self.client = httpx.AsyncClient(base_url=f"{self.url}/storage/v1",
+                                    headers={"Authorization": f"Bearer {key}", "apikey": key},
+                                    limits=_limits(), timeout=settings.STORAGE_TIMEOUT_SECONDS, transport=transport)
+
+  async def _upload(self, bucket_name, path, contents, content_type, size):
+    response = await self.client.post(f"/object/{bucket_name}/{quote(path)}", content=_body(contents),
+                                      headers={"Content-Type": content_type, "Content-Length": str(size),
+                                               "x-upsert": "true"})
+    response.raise_for_status()
+    return f"{self.url}/storage/v1/object/public/{bucket_name}/{quote(path)}"
+
+  async def close(self):
+    await self.client.aclose()
+    await super().close()
+
+def _hmac(key, message):
+  return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+def sigv4_headers(method, url, headers, region, access_key_id, secret_access_key,
+                  payload_hash=UNSIGNED_PAYLOAD, service="s3", now=None):
+  # AWS Signature Version 4, in the Authorization header. The URL's path
+  # must already be percent-encoded; the headers given are signed along
+  # with host and the x-amz-* ones, and all are returned
+  parts = urlsplit(url)
+  now = now or datetime.datetime.now(datetime.timezone.utc)
+  amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+  headers = {name.lower(): str(value).strip() for name, value in headers.items()}
+  headers.update({"host": parts.netloc, "x-amz-content-sha256": payload_hash, "x-amz-date": amz_date})
+  signed_headers = ";".join(sorted(headers))
+  query = "&".join(sorted(f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}"
+                          for k, v in parse_qsl(parts.query, keep_blank_values=True)))
+  canonical_request = "\n".join([method, parts.path or "/", query,
+                                 "".join(f"{name}:{headers[name]}\n" for name in sorted(headers)),
+                                 signed_headers, payload_hash])
+  scope = f"{amz_date[:8]}/{region}/{service}/aws4_request"
+  string_to_sign = "\n".join(["AWS4-HMAC-SHA256", amz_date, scope,
+                              hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()])
+  key = ("AWS4" + secret_access_key).encode("utf-8")
+  for part in (amz_date[:8], region, service, "aws4_request"):
+    key = _hmac(key, part)
+  signature = hmac.new(key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+  headers["authorization"] = (f"AWS4-HMAC-SHA256 Credential={access_key_id}/{scope}, "
+                              f"SignedHeaders={signed_headers}, Signature={signature}")
+  return headers
+
+class S3Storage(StorageBackend):
+  # Any S3-compatible store (AWS, MinIO, R2...), addressed path-style:
+  # {endpoint}/{bucket}/{key}. Uploads are signed with an unsigned payload,
+  # so the body is streamed without hashing it first. Objects are served
+  # from public_url when the bucket sits behind a CDN or public domain
+  name = "s3"
+
+  def __init__(self, endpoint_url, region, access_key_id, secret_access_key, public_url="", transport=None):
+    super().__init__(transport)
+    self.endpoint_url = endpoint_url.rstrip("/")
+    self.public_url = (public_url or endpoint_url).rstrip("/")
+    self.region = region
+    self.access_key_id = access_key_id
+    self.secret_access_key = secret_access_key
+    self.client = httpx.AsyncClient(limits=_limits(), timeout=settings.STORAGE_TIMEOUT_SECONDS, transport=transport)
+
+  def _sign(self, method, url, headers):
+    return sigv4_headers(method, url, headers, self.region, self.access_key_id, self.secret_access_key)
+
+  async def _upload(self, bucket_name, path, contents, content_type, size):
+    key = quote(path)
+    url = f"{self.endpoint_url}/{bucket_name}/{key}"
+    headers = self._sign("PUT", url, {"Content-Type": content_type})
+    response = await self.client.put(url, content=_body(contents), headers=dict(headers, **{"content-length": str(size)}))
+    response.raise_for_status()
+    return f"{self.public_url}/{bucket_name}/{key}"
+
+  def download(self, file_url):
+    # Objects are fetched signed, so private buckets work too
+    if self.public_url != self.endpoint_url and file_url.startswith(self.public_url + "/"):
+      file_url = self.endpoint_url + file_url[len(self.public_url):]
+    if not file_url.startswith(self.endpoint_url + "/"):
+      return super().download(file_url)
+    response = self.http.get(file_url, headers=self._sign("GET", file_url, {}))
+    response.raise_for_status()
+    return response.content
+
+  async def close(self):
+    await self.client.aclose()
+    await super().close()
+
+def make_storage(backend=None):
+  # "auto" is Supabase in production and the local directory otherwise
+  backend = backend or settings.STORAGE_BACKEND
+  if backend == "auto":
+    backend = "supabase" if settings.PRODUCTION else "local"
+  if backend == "supabase":
+    return SupabaseStorage(str(settings.SUPABASE_URL), settings.SUPABASE_KEY)
+  if backend == "s3":
+    return S3Storage(settings.S3_ENDPOINT_URL, settings.S3_REGION, settings.S3_ACCESS_KEY_ID,
+                     settings.S3_SECRET_ACCESS_KEY, settings.S3_PUBLIC_URL)
+  return LocalStorage()
+
+_storage = None
+_storage_lock = threading.Lock()
+
+def get_storage():
+  global _storage
+  with _storage_lock:
+    if _storage is None:
+      _storage = make_storage()
+    return _storage
+
+async def close_storage():
+  global _storage
+  with _storage_lock:
+    storage, _storage = _storage, None
+  if storage is not None:
+    await storage.close()
+
+def get_storage_stats():
+  storage = _storage
+  return storage.get_stats() if storage is not None else {"backend": None}
+
+async def upload_file(bucket_name, path, contents, content_type):
+  return await get_storage().upload(bucket_name, path, contents, content_type)
+
+def download_file(file_url):
+  return get_storage().download(file_url)
+
+class UploadTooLarge(Exception):
+  pass
+
+FILE_SIGNATURES = [
+  (b"%PDF-", "application/pdf"),
+  (b"\x89PNG\r\n\x1a\n", "image/png"),
+  (b"\xff\xd8\xff", "image/jpeg"),
+  (b"GIF87a", "image/gif"),
+  (b"GIF89a", "image/gif"),
+]
+
+def sniff_content_type(head):
+  # From the first bytes of the file; None when not recognised
+  for signature, content_type in FILE_SIGNATURES:
+    if head.startswith(signature):
+      return content_type
+  if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+    return "image/webp"
+  return None
+
+class InspectedUpload:
+  def __init__(self, file, size, sha256, content_type):
+    self.file = file
+    self.size = size
+    self.sha256 = sha256
+    self.content_type = content_type
+
+def _inspect_file(file, max_bytes, chunk_size, filename):
+  file.seek(0)
+  digest = hashlib.sha256()
+  size = 0
+  head = b""
+  while chunk := file.read(chunk_size):
+    size += len(chunk)
+    if size > max_bytes:
+      raise UploadTooLarge(f"{filename} is larger than {max_bytes} bytes")
+    if len(head) < 16:
+      head += chunk[:16 - len(head)]
+    digest.update(chunk)
+  file.seek(0)
+  return InspectedUpload(file, size, digest.hexdigest(), sniff_content_type(head))
+
+async def inspect_upload(upload_file, max_bytes, chunk_size=None):
+  # Starlette has already spooled the part into upload_file.file (to disk
+  # past 1MB), so it is hashed and sniffed in place, a chunk at a time and
+  # off the event loop, then rewound for upload_file. Raises UploadTooLarge
+  # past max_bytes; RequestSizeLimitMiddleware caps how much is received
+  if upload_file.size is not None and upload_file.size > max_bytes:
+    raise UploadTooLarge(f"{upload_file.filename} is larger than {max_bytes} bytes")
+  return await asyncio.to_thread(_inspect_file, upload_file.file, max_bytes,
+                                 chunk_size or settings.UPLOAD_CHUNK_BYTES, upload_file.filename)
@@ -1,14 +1,16 @@
 import { Link } from "react-router";
 import { Button } from "~/components/ui/button";
 
-export async function clientLoader({params}) {
-  const res = await fetch(`/api/job-boards/${params.jobBoardId}/job-posts`);
-  const jobPosts = await res.json();
-  return {jobBoardId: params.jobBoardId, jobPosts}
+export async function clientLoader({params, request}) {
+  const cursor = new URL(request.url).searchParams.get("cursor");
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  const res = await fetch(`/api/job-boards/${params.jobBoardId}/job-posts${query}`);
+  const page = await res.json();
+  return {jobBoardId: params.jobBoardId, jobPosts: page.items, nextCursor: page.next_cursor}
 }
 
 export default function JobPosts({loaderData}) {
-  const {jobBoardId, jobPosts} = loaderData;
+  const {jobBoardId, jobPosts, nextCursor} = loaderData;
   return (
     <div>
       <div className="float-right">
@@ -30,7 +32,13 @@ export default function JobPosts({loaderData}) {
             </div>
         )}
       </div>
+      {nextCursor &&
+        <div className="mt-8">
+          <Button variant="outline">
+            <Link to={`/job-boards/${jobBoardId}/job-posts?cursor=${encodeURIComponent(nextCursor)}`}>Next Page</Link>
+          </Button>
+        </div>
+      }
     </div>
   )
 }
-
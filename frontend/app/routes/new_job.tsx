@@ -35,11 +35,54 @@ export default function NewJobBoardForm({
   actionData,
   ...props
 }) {
+  const formRef = useRef(null)
   const textboxRef = useRef(null)
   const [reviewed, setReviewed] = useState("false")
+  const [reviewing, setReviewing] = useState(false)
   const [summary, setSummary] = useState("")
   const [revisedDescription, setRevisedDescription] = useState("")
 
+  const handleEvent = (event, data) => {
+    if (event === "summary") {
+      setSummary(data.overall_summary)
+      setReviewed("true")
+    } else if (event === "token") {
+      setRevisedDescription(previous => previous + data.text)
+    } else if (event === "done") {
+      setRevisedDescription(data.revised_description)
+    } else if (event === "error") {
+      setSummary(data.detail)
+    }
+  }
+
+  // Reads the review as server-sent events, so the summary shows up as soon
+  // as the analysis is done and the rewrite appears while it is generated
+  const review_job_description = async () => {
+    if (!formRef.current.reportValidity()) return
+    setReviewing(true)
+    setRevisedDescription("")
+    const response = await fetch('/api/review-job-description/stream', {
+      method: 'POST',
+      body: new FormData(formRef.current)
+    })
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+    let buffer = ""
+    while (true) {
+      const { value, done } = await reader.read()
+      if (done) break
+      buffer += value
+      const messages = buffer.split("\n\n")
+      buffer = messages.pop()
+      for (const message of messages) {
+        const lines = message.split("\n")
+        const event = lines.find(line => line.startsWith("event: "))?.slice(7)
+        const data = lines.find(line => line.startsWith("data: "))?.slice(6)
+        if (event && data) handleEvent(event, JSON.parse(data))
+      }
+    }
+    setReviewing(false)
+  }
+
   const fix_job_description = () => {
       textboxRef.current.value = revisedDescription
   }
@@ -51,7 +94,7 @@ export default function NewJobBoardForm({
   }
   return (
     <div className="w-full max-w-md">
-      <Form method="post" encType="multipart/form-data">
+      <Form method="post" encType="multipart/form-data" ref={formRef}>
         <input type="hidden" name="reviewed" value={reviewed} />
         <input type="hidden" name="job_board_id" value={loaderData.jobBoardId} />
         <FieldGroup>
@@ -81,13 +124,14 @@ export default function NewJobBoardForm({
           {reviewed === "true" ? (
             <div>
             <p>{summary}</p>
-            <Button type="button" onClick={fix_job_description}>Fix</Button>
+            <p className="whitespace-pre-wrap text-sm text-muted-foreground">{revisedDescription}</p>
+            <Button type="button" onClick={fix_job_description} disabled={reviewing}>Fix</Button>
             </div>
           ) : <div></div>}
           
           <div className="float-right">
             <Field orientation="horizontal">
-              {reviewed === "false" ? <Button type="submit">Review</Button>: <Button type="submit">Submit</Button>}
+              {reviewed === "false" ? <Button type="button" onClick={review_job_description} disabled={reviewing}>Review</Button>: <Button type="submit" disabled={reviewing}>Submit</Button>}
               <Button variant="outline" type="button">
                 <Link to={`/job-boards/${loaderData.jobBoardId}/job-posts`}>Cancel</Link>
               </Button>
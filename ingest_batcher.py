@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Writes documents to the vector store in batches of max_batch_size, or max_wait_seconds after the first arrived
+class IngestBatcher:
+    def __init__(self, vector_store, max_batch_size=32, max_wait_seconds=0.05):
+        self.vector_store = vector_store
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.pending = []
+        self.condition = threading.Condition()
+        self.closed = False
+        self.writing = False
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self.latencies = Histogram([0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30])
+        self.stats = {"documents": 0, "batches": 0, "failed_batches": 0}
+        self.thread = threading.Thread(target=self._run, name="ingest-batcher", daemon=True)
+        self.thread.start()
+
+    def submit(self, text, metadata, document_id):
+        future = Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("ingest batcher is closed")
+            self.pending.append((text, metadata, document_id, future, time.monotonic()))
+            self.condition.notify_all()
+        return future
+
+    def _next_batch(self):
+        with self.condition:
+            while not self.pending and not self.closed:
+                self.condition.wait()
+            if self.pending:
+                deadline = self.pending[0][4] + self.max_wait_seconds
+                while len(self.pending) < self.max_batch_size and not self.closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+            batch = self.pending[:self.max_batch_size]
+            del self.pending[:self.max_batch_size]
+            self.writing = bool(batch)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self._write(batch)
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+
+    def _write(self, batch):
+        texts, metadatas, ids, futures, submitted_at = zip(*batch)
+        try:
+            # add_texts embeds its whole batch_size in one request and upserts
+            # it in one call; wait=False returns once Qdrant has accepted it
+            self.vector_store.add_texts(list(texts), metadatas=list(metadatas), ids=list(ids),
+                                        batch_size=len(batch), wait=False)
+        except Exception as e:
+            logger.exception("writing a batch of %s documents failed", len(batch))
+            self.stats["failed_batches"] += 1
+            for future in futures:
+                future.set_exception(e)
+            return
+        now = time.monotonic()
+        self.batch_sizes.observe(len(batch))
+        for future, started in zip(futures, submitted_at):
+            self.latencies.observe(now - started)
+            future.set_result(None)
+        self.stats["documents"] += len(batch)
+        self.stats["batches"] += 1
+
+    def flush(self):
+        # Waits until everything submitted so far is written
+        with self.condition:
+            self.condition.notify_all()
+            while self.pending or self.writing:
+                self.condition.wait(0.1)
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+
+    def get_stats(self):
+        with self.condition:
+            queued = len(self.pending)
+        return dict(self.stats, queued=queued,
+                    batch_size=self.batch_sizes.snapshot(), latency_seconds=self.latencies.snapshot())
@@ -0,0 +1,110 @@
+import random
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, or_, select, text
+from config import settings
+from models import Job
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+
+def enqueue(db, job_type, payload, max_attempts=None, delay_seconds=0):
+    # Only adds the row; it is committed together with whatever the caller is
+    # writing, so a job never refers to data that was rolled back.
+    # Works with both Session and AsyncSession.
+    job = Job(job_type=job_type,
+              payload=payload,
+              status=QUEUED,
+              attempts=0,
+              max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS)
+    if delay_seconds:
+        job.run_at = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+    db.add(job)
+    return job
+
+def concurrency_limit(job_type):
+    return settings.JOB_CONCURRENCY_LIMITS.get(job_type, settings.JOB_DEFAULT_CONCURRENCY)
+
+def batch_size(job_type):
+    return settings.JOB_BATCH_SIZES.get(job_type, 1)
+
+def retry_delay(attempts):
+    # Exponential backoff, jittered so retries of a failed burst spread out
+    ceiling = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+    return random.uniform(ceiling / 2, ceiling)
+
+def claim(db, job_type):
+    jobs = claim_batch(db, job_type, 1)
+    return jobs[0] if jobs else None
+
+def claim_batch(db, job_type, max_jobs):
+    # Claims of one job type are serialised with a transaction-level advisory
+    # lock so the running count checked against the concurrency limit cannot
+    # change underneath us; the rows themselves are picked with SKIP LOCKED. Jobs
+    # left 'running' by a worker whose lease ran out (crash, kill -9) are
+    # picked up again.
+    locked = db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext(:job_type))"),
+                        {"job_type": job_type}).scalar()
+    if not locked:
+        db.rollback()
+        return []
+
+    now = func.now()
+    running = db.execute(select(func.count(Job.id)).filter(
+        Job.job_type == job_type, Job.status == RUNNING, Job.locked_until > now)).scalar()
+    wanted = min(max_jobs, concurrency_limit(job_type) - running)
+    if wanted <= 0:
+        db.rollback()
+        return []
+
+    claimed = []
+    while len(claimed) < wanted:
+        jobs = db.execute(select(Job).filter(
+            Job.job_type == job_type,
+            or_(
+                (Job.status == QUEUED) & (Job.run_at <= now),
+                (Job.status == RUNNING) & (Job.locked_until <= now),
+            )).order_by(Job.run_at, Job.id).limit(wanted - len(claimed)).with_for_update(skip_locked=True)).scalars().all()
+        if not jobs:
+            break
+        for job in jobs:
+            if job.status == RUNNING and job.attempts >= job.max_attempts:
+                job.status = DEAD
+                job.last_error = "lease expired on the final attempt"
+                job.locked_until = None
+                job.finished_at = now
+                continue
+            job.status = RUNNING
+            job.attempts += 1
+            job.locked_until = now + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+            claimed.append(job)
+    db.commit()
+    for job in claimed:
+        db.refresh(job)
+    return claimed
+
+def complete(db, job):
+    job.status = DONE
+    job.locked_until = None
+    job.finished_at = func.now()
+    db.commit()
+
+def fail(db, job, error):
+    job.last_error = error[-4000:]
+    job.locked_until = None
+    if job.attempts >= job.max_attempts:
+        job.status = DEAD
+        job.finished_at = func.now()
+    else:
+        job.status = QUEUED
+        job.run_at = func.now() + timedelta(seconds=retry_delay(job.attempts))
+    db.commit()
+
+def queue_stats(db):
+    rows = db.execute(select(Job.job_type, Job.status, func.count(Job.id))
+                      .group_by(Job.job_type, Job.status)).all()
+    stats = {}
+    for job_type, status, count in rows:
+        stats.setdefault(job_type, {})[status] = count
+    return stats
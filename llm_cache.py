@@ -0,0 +1,98 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+def make_key(namespace, model, temperature, prompt_version, *inputs):
+    digest = hashlib.sha256()
+    for part in (namespace, model, repr(temperature), prompt_version, *inputs):
+        data = part.encode("utf-8")
+        # length prefix keeps ("ab", "c") and ("a", "bc") apart
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+# Two tier cache of LLM responses, an in-process LRU in front of SQLite.
+# Entries expire after ttl_seconds; the prompt version is part of the key
+class LLMCache:
+    def __init__(self, path, max_memory_entries=1024, ttl_seconds=7 * 24 * 3600):
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                tokens INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            )""")
+        self.connection.commit()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "tokens_saved": 0}
+
+    def _remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None and entry[2] > now:
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self.stats["tokens_saved"] += entry[1]
+                return json.loads(entry[0])
+            self.memory.pop(key, None)
+            row = self.connection.execute(
+                "SELECT value, tokens, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?",
+                (key, now)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self._remember(key, row)
+            self.stats["disk_hits"] += 1
+            self.stats["tokens_saved"] += row[1]
+            return json.loads(row[0])
+
+    def set(self, key, namespace, prompt_version, value, tokens=0):
+        entry = (json.dumps(value), tokens or 0, time.time() + self.ttl_seconds)
+        with self.lock:
+            self._remember(key, entry)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, namespace, prompt_version, value, tokens, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, namespace, prompt_version, *entry))
+            self.connection.commit()
+
+    def invalidate(self, namespace, keep_prompt_version=None):
+        # Drops a namespace, or only its entries for other prompt versions.
+        # The memory tier is cleared outright: it is cheap to refill.
+        with self.lock:
+            if keep_prompt_version is None:
+                self.connection.execute("DELETE FROM llm_cache WHERE namespace = ?", (namespace,))
+            else:
+                self.connection.execute("DELETE FROM llm_cache WHERE namespace = ? AND prompt_version != ?",
+                                        (namespace, keep_prompt_version))
+            self.connection.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            self.connection.commit()
+            self.memory.clear()
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
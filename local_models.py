@@ -0,0 +1,72 @@
+import json
+import math
+import zlib
+from collections import Counter
+from functools import lru_cache
+from types import SimpleNamespace
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from bm25 import tokenize
+
+# Deterministic stand-ins for the OpenAI models, selected with
+# EMBEDDING_BACKEND=hashing and CHAT_BACKEND=canned. They need no network and
+# cost nothing, which is what benchmarks and offline tests need; their
+# answers are not meant to be any good.
+
+@lru_cache(maxsize=1 << 18)
+def _feature(token, dimensions):
+    # crc32 is stable across processes, unlike hash()
+    h = zlib.crc32(token.encode("utf-8"))
+    return h % dimensions, 1.0 if h & 0x80000000 else -1.0
+
+# Signed feature hashing of words and word pairs: keyword-level similarity, no meaning
+class HashingEmbeddings(Embeddings):
+    def __init__(self, dimensions):
+        self.dimensions = dimensions
+
+    def embed_query(self, text):
+        tokens = tokenize(text)
+        counts = Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token, count in counts.items():
+            index, sign = _feature(token, self.dimensions)
+            vector[index] += sign * (1 + math.log(count))
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+def canned_evaluation(messages):
+    # Same shape as the resume evaluation prompt asks for, with a score that
+    # only depends on the prompt
+    score = zlib.crc32(messages[-1]["content"].encode("utf-8")) % 101
+    return {
+        "overall_score": score,
+        "strengths": ["Canned strength"] * 3,
+        "gaps": ["Canned gap"] * 3,
+        "match_by_section": {"required_skills": "canned", "experience_years": "canned", "education": "canned"},
+        "rewrite_snippet": "Canned resume introduction.",
+        "actionable_recommendations": ["Canned recommendation"] * 3,
+    }
+
+def canned_completion(messages):
+    content = json.dumps(canned_evaluation(messages))
+    prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+    completion_tokens = len(content) // 4
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                              total_tokens=prompt_tokens + completion_tokens))
+
+# Answers client.chat.completions.create like OpenAI, without calling it
+class CannedOpenAI:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, **kwargs):
+        return canned_completion(messages)
+
+class AsyncCannedOpenAI(CannedOpenAI):
+    async def _create(self, model, messages, **kwargs):
+        return canned_completion(messages)
@@ -1,139 +1,349 @@
+import json
+import logging
 import os
-from typing import Annotated, Optional
-from fastapi import BackgroundTasks, Depends, Request, Response, status, FastAPI, File, Form, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from contextlib import asynccontextmanager
+from typing import Annotated, Literal, Optional
+from fastapi import Depends, Query, Request, Response, status, FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, EmailStr, Field
 from typing import List
-from sqlalchemy import text
-from ai import evaluate_resume_with_ai, review_application, ingest_resume, get_vector_store
+from sqlalchemy import select, text
+from ai import (areview_application, astream_review_application, close_vector_store, get_embedding_cache_stats,
+                get_llm_cache, get_review_chains, get_vector_store, recommend_candidates)
 from auth import AdminAuthzMiddleware, AdminSessionMiddleware, authenticate_admin, delete_admin_session
-from converter import extract_text_from_pdf_bytes
-from db import get_db
-from emailer import send_email
+from db import dispose_async_engine, get_async_db, get_async_session_factory, get_pool_stats
+from exporter import stream_job_post_export
 import file_storage
-from models import JobApplication, JobApplicationAIEvaluation, JobBoard, JobPost
+from job_queue import enqueue
+from models import JobApplication, JobApplicationAIEvaluation, JobBoard, JobPost, RescoreRun
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_offset_cursor, encode_offset_cursor, keyset_page
+from request_limits import RequestSizeLimitMiddleware
+from rescore import new_rescore_run
+from shortlists import shortlist_query
 from config import settings
 
-app = FastAPI()
+logger = logging.getLogger("api")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+   get_review_chains()
+   # The embedded store can only be open in one process, and that is the
+   # worker's; a Qdrant server is shared, so connect up front
+   if settings.QDRANT_MODE == "server":
+      get_vector_store()
+   yield
+   close_vector_store()
+   await file_storage.close_storage()
+   await dispose_async_engine()
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(AdminAuthzMiddleware)
 app.add_middleware(AdminSessionMiddleware)
+app.add_middleware(RequestSizeLimitMiddleware)
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 @app.get("/api/health")
-async def health(db: Session = Depends(get_db)):
+async def health(db: AsyncSession = Depends(get_async_db)):
   try:
-    db.execute(text("SELECT 1"))
+    await db.execute(text("SELECT 1"))
     return {"database": "ok"}
   except Exception as e:
     print(e)
     return {"database": "down"}
 
+@app.get("/api/health/db-pool")
+async def health_db_pool():
+  return get_pool_stats()
+
+@app.get("/api/health/llm-cache")
+async def health_llm_cache():
+  cache = get_llm_cache()
+  return cache.get_stats() if cache is not None else {"enabled": False}
+
+@app.get("/api/health/embedding-cache")
+async def health_embedding_cache():
+  return get_embedding_cache_stats()
+
+@app.get("/api/health/storage")
+async def health_storage():
+  return file_storage.get_storage_stats()
 
 @app.get("/api/me")
 async def me(req: Request):
    return {"is_admin": req.state.is_admin}
 
 @app.get("/api/job-boards")
-async def api_job_boards(db: Session = Depends(get_db)):
-   jobBoards = db.query(JobBoard).all()
+async def api_job_boards(db: AsyncSession = Depends(get_async_db)):
+   jobBoards = (await db.scalars(select(JobBoard))).all()
    return jobBoards
 
 @app.get("/api/job-application-ai-evaluations")
-async def api_job_boards(db: Session = Depends(get_db)):
-   results = db.query(JobApplicationAIEvaluation).all()
-   return results
+async def api_job_boards(
+   limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+   cursor: Optional[str] = None,
+   job_post_id: Optional[int] = None,
+   is_open: Optional[bool] = None,
+   min_score: Optional[int] = Query(None, ge=0, le=100),
+   db: AsyncSession = Depends(get_async_db)):
+   query = select(JobApplicationAIEvaluation)
+   if job_post_id is not None or is_open is not None:
+      query = query.join(JobApplication, JobApplication.id == JobApplicationAIEvaluation.job_application_id)
+   if job_post_id is not None:
+      query = query.filter(JobApplication.job_post_id == job_post_id)
+   if is_open is not None:
+      query = query.join(JobPost, JobPost.id == JobApplication.job_post_id).filter(JobPost.is_open == is_open)
+   if min_score is not None:
+      query = query.filter(JobApplicationAIEvaluation.overall_score >= min_score)
+   return await keyset_page(db, query, JobApplicationAIEvaluation.id, limit, cursor)
     
+async def inspect_upload(upload_file, max_bytes):
+   try:
+      return await file_storage.inspect_upload(upload_file, max_bytes)
+   except file_storage.UploadTooLarge as e:
+      raise HTTPException(status_code=413, detail=str(e))
+
+async def upload_logo(logo):
+   inspected = await inspect_upload(logo, settings.UPLOAD_MAX_LOGO_BYTES)
+   return await file_storage.upload_file("company-logos", logo.filename, inspected.file,
+                                         inspected.content_type or logo.content_type)
+
 class JobBoardForm(BaseModel):
    slug : str = Field(..., min_length=2, max_length=20)
    logo: UploadFile = File(...)
 
 @app.post("/api/job-boards")
-async def api_create_new_job_board(job_board_form: Annotated[JobBoardForm, Form()], db: Session = Depends(get_db)):
-   logo_contents = await job_board_form.logo.read()
-   file_url = file_storage.upload_file("company-logos", job_board_form.logo.filename, logo_contents, job_board_form.logo.content_type)
+async def api_create_new_job_board(job_board_form: Annotated[JobBoardForm, Form()], db: AsyncSession = Depends(get_async_db)):
+   file_url = await upload_logo(job_board_form.logo)
    new_job_board = JobBoard(slug=job_board_form.slug, logo_url=file_url)
    db.add(new_job_board)
-   db.commit()
-   db.refresh(new_job_board)
+   await db.commit()
+   await db.refresh(new_job_board)
    return new_job_board
 
 if not settings.PRODUCTION:
    app.mount("/uploads", StaticFiles(directory="uploads"))
 
 @app.get("/api/job-boards/{job_board_id}/job-posts")
-async def api_company_job_board_posts(job_board_id, db: Session = Depends(get_db)):
-   jobPosts = db.query(JobPost).filter(JobPost.job_board_id.__eq__(job_board_id)).all()
-   return jobPosts
+async def api_company_job_board_posts(
+   job_board_id: int,
+   limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+   cursor: Optional[str] = None,
+   is_open: Optional[bool] = None,
+   db: AsyncSession = Depends(get_async_db)):
+   query = select(JobPost).filter(JobPost.job_board_id.__eq__(job_board_id))
+   if is_open is not None:
+      query = query.filter(JobPost.is_open == is_open)
+   return await keyset_page(db, query, JobPost.id, limit, cursor)
 
-@app.get("/api/job-boards/{job_board_id}")
-async def api_get_company_job_board(job_board_id, db: Session = Depends(get_db)):
-   jobBoard = db.get(JobBoard, job_board_id)
+@app.get("/api/job-boards/{job_board_id:int}")
+async def api_get_company_job_board(job_board_id: int, db: AsyncSession = Depends(get_async_db)):
+   jobBoard = await db.get(JobBoard, job_board_id)
    if not jobBoard:
       raise HTTPException(status_code=404)
    return jobBoard
 
-@app.delete("/api/job-boards/{job_board_id}")
-async def api_get_company_job_board(job_board_id, db: Session = Depends(get_db)):
-   jobBoard = db.get(JobBoard, job_board_id)
+@app.delete("/api/job-boards/{job_board_id:int}")
+async def api_get_company_job_board(job_board_id: int, db: AsyncSession = Depends(get_async_db)):
+   jobBoard = await db.get(JobBoard, job_board_id)
    if not jobBoard:
       raise HTTPException(status_code=404)
-   db.delete(jobBoard)
-   db.commit()
+   await db.delete(jobBoard)
+   await db.commit()
    return jobBoard
   
 class JobBoardEditForm(BaseModel):
    slug : str = Field(..., min_length=2, max_length=20)
    logo: Optional[UploadFile] = None
 
-@app.put("/api/job-boards/{job_board_id}")
-async def api_get_company_job_board(job_board_id, job_board_edit_form: Annotated[JobBoardEditForm, Form()], db: Session = Depends(get_db)):
-   jobBoard = db.get(JobBoard, job_board_id)
+@app.put("/api/job-boards/{job_board_id:int}")
+async def api_get_company_job_board(job_board_id: int, job_board_edit_form: Annotated[JobBoardEditForm, Form()], db: AsyncSession = Depends(get_async_db)):
+   jobBoard = await db.get(JobBoard, job_board_id)
    if not jobBoard:
       raise HTTPException(status_code=404)
    jobBoard.slug = job_board_edit_form.slug
    if job_board_edit_form.logo is not None and job_board_edit_form.logo.filename != '':
-      logo_contents = await job_board_edit_form.logo.read()
-      file_url = file_storage.upload_file("company-logos", job_board_edit_form.logo.filename, logo_contents, job_board_edit_form.logo.content_type)
-      jobBoard.logo_url = file_url
+      jobBoard.logo_url = await upload_logo(job_board_edit_form.logo)
    db.add(jobBoard)
-   db.commit()
+   await db.commit()
    return jobBoard
 
 @app.post("/api/job-posts/{job_post_id}/close")
-async def api_close_job_post(job_post_id, db: Session = Depends(get_db)):
-   jobPost = db.get(JobPost, job_post_id)
+async def api_close_job_post(job_post_id: int, db: AsyncSession = Depends(get_async_db)):
+   jobPost = await db.get(JobPost, job_post_id)
    if not jobPost:
       raise HTTPException(status_code=404)
    jobPost.is_open = False
    db.add(jobPost)
-   db.commit()
+   enqueue(db, "index_job_post", {"job_post_id": jobPost.id})
+   await db.commit()
    return jobPost
   
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+@app.get("/api/job-posts/{job_post_id}/applications/export")
+async def api_export_job_post_applications(
+   job_post_id: int,
+   request: Request,
+   format: Literal["ndjson", "csv"] = "ndjson",
+   db: AsyncSession = Depends(get_async_db),
+   session_factory = Depends(get_async_session_factory)):
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   jobPost = await db.get(JobPost, job_post_id)
+   if not jobPost:
+      raise HTTPException(status_code=404)
+   filename = f"job-post-{job_post_id}-applications.{format}"
+   return StreamingResponse(stream_job_post_export(session_factory, job_post_id, format),
+                            media_type=EXPORT_MEDIA_TYPES[format],
+                            headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@app.post("/api/job-posts/{job_post_id}/rescore", status_code=status.HTTP_202_ACCEPTED)
+async def api_rescore_job_post(job_post_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   jobPost = await db.get(JobPost, job_post_id)
+   if not jobPost:
+      raise HTTPException(status_code=404)
+   rescoreRun = new_rescore_run(db, job_post_id)
+   await db.flush()
+   enqueue(db, "rescore_job_post", {"rescore_run_id": rescoreRun.id})
+   await db.commit()
+   await db.refresh(rescoreRun)
+   return rescoreRun
+
+def get_resume_vector_store():
+   # Opening the embedded store here would keep it locked for the life of
+   # the process and lock the worker out of it (see lifespan)
+   if settings.QDRANT_MODE == "local":
+      raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                          detail="Recommendations need a Qdrant server (QDRANT_MODE=server)")
+   return get_vector_store()
+
+@app.get("/api/job-posts/{job_post_id}/recommendations")
+async def api_job_post_recommendations(
+   job_post_id: int,
+   request: Request,
+   limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+   cursor: Optional[str] = None,
+   scope: Literal["post", "board"] = "post",
+   min_score: Optional[int] = Query(None, ge=0, le=100),
+   db: AsyncSession = Depends(get_async_db),
+   vector_store = Depends(get_resume_vector_store)):
+   # Candidates ranked by how close their resume is to the job description:
+   # those who applied to this post, or to any post of its job board
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   jobPost = await db.get(JobPost, job_post_id)
+   if not jobPost:
+      raise HTTPException(status_code=404)
+   offset = decode_offset_cursor(cursor) if cursor is not None else 0
+   scope_filter = {"job_post_id": job_post_id} if scope == "post" else {"job_board_id": jobPost.job_board_id}
+   results = await run_in_threadpool(recommend_candidates, vector_store, jobPost.description, limit + 1, offset,
+                                     min_score=min_score, **scope_filter)
+   page = results[:limit]
+   ids = [doc.metadata["_id"] for doc, score in page]
+   applications = {a.id: a for a in (await db.scalars(select(JobApplication).filter(JobApplication.id.in_(ids)))).all()}
+   items = []
+   for doc, score in page:
+      jobApplication = applications.get(doc.metadata["_id"])
+      if jobApplication is None:
+         continue
+      items.append({"job_application_id": jobApplication.id,
+                    "job_post_id": jobApplication.job_post_id,
+                    "first_name": jobApplication.first_name,
+                    "last_name": jobApplication.last_name,
+                    "email": jobApplication.email,
+                    "resume_url": jobApplication.resume_url,
+                    "similarity": score,
+                    "overall_score": doc.metadata.get("overall_score")})
+   next_cursor = encode_offset_cursor(offset + limit) if len(results) > limit else None
+   return {"items": items, "next_cursor": next_cursor}
+
+@app.get("/api/job-posts/{job_post_id}/shortlist")
+async def api_job_post_shortlist(
+   job_post_id: int,
+   request: Request,
+   limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+   cursor: Optional[str] = None,
+   db: AsyncSession = Depends(get_async_db)):
+   # Precomputed by the index_job_post and shortlist_resume jobs; nothing is
+   # embedded or searched here
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   jobPost = await db.get(JobPost, job_post_id)
+   if not jobPost:
+      raise HTTPException(status_code=404)
+   offset = decode_offset_cursor(cursor) if cursor is not None else 0
+   rows = (await db.execute(shortlist_query(job_post_id).offset(offset).limit(limit + 1))).all()
+   items = [{"job_application_id": jobApplication.id,
+             "job_post_id": jobApplication.job_post_id,
+             "first_name": jobApplication.first_name,
+             "last_name": jobApplication.last_name,
+             "email": jobApplication.email,
+             "resume_url": jobApplication.resume_url,
+             "similarity": shortlisted.similarity}
+            for shortlisted, jobApplication in rows[:limit]]
+   next_cursor = encode_offset_cursor(offset + limit) if len(rows) > limit else None
+   return {"items": items, "next_cursor": next_cursor}
+
+@app.get("/api/rescore-runs/{rescore_run_id}")
+async def api_get_rescore_run(rescore_run_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   rescoreRun = await db.get(RescoreRun, rescore_run_id)
+   if not rescoreRun:
+      raise HTTPException(status_code=404)
+   return rescoreRun
+
 class JobPostForm(BaseModel):
    title : str
    description: str
    job_board_id : int
 
 @app.post("/api/job-posts")
-async def api_create_job_post(job_post_form: Annotated[JobPostForm, Form()], db: Session = Depends(get_db)):
-   jobBoard = db.get(JobBoard, job_post_form.job_board_id)
+async def api_create_job_post(job_post_form: Annotated[JobPostForm, Form()], db: AsyncSession = Depends(get_async_db)):
+   jobBoard = await db.get(JobBoard, job_post_form.job_board_id)
    if not jobBoard:
       raise HTTPException(status_code=400)
    jobPost = JobPost(title=job_post_form.title, 
                      description=job_post_form.description, 
                      job_board_id = job_post_form.job_board_id)
    db.add(jobPost)
-   db.commit()
-   db.refresh(jobPost)
+   await db.flush()
+   enqueue(db, "index_job_post", {"job_post_id": jobPost.id})
+   await db.commit()
+   await db.refresh(jobPost)
+   return jobPost
+
+class JobPostEditForm(BaseModel):
+   title : str
+   description: str
+
+@app.put("/api/job-posts/{job_post_id}")
+async def api_edit_job_post(job_post_id: int, job_post_edit_form: Annotated[JobPostEditForm, Form()], request: Request, db: AsyncSession = Depends(get_async_db)):
+   if not request.state.is_admin:
+      raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+   jobPost = await db.get(JobPost, job_post_id)
+   if not jobPost:
+      raise HTTPException(status_code=404)
+   description_changed = jobPost.description != job_post_edit_form.description
+   jobPost.title = job_post_edit_form.title
+   jobPost.description = job_post_edit_form.description
+   db.add(jobPost)
+   if description_changed:
+      enqueue(db, "index_job_post", {"job_post_id": jobPost.id})
+   await db.commit()
+   await db.refresh(jobPost)
    return jobPost
 
 @app.get("/api/job-boards/{slug}")
-async def api_company_job_board(slug, db: Session = Depends(get_db)):
-   jobPosts = db.query(JobPost) \
+async def api_company_job_board(slug, db: AsyncSession = Depends(get_async_db)):
+   jobPosts = (await db.scalars(select(JobPost) \
       .join(JobPost.job_board) \
-      .filter(JobBoard.slug.__eq__(slug)) \
+      .filter(JobBoard.slug.__eq__(slug)))) \
       .all()
    return jobPosts
   
@@ -145,53 +355,42 @@ class JobApplicationForm(BaseModel):
    job_post_id : int
    resume: UploadFile = File(...)
 
-def evaluate_resume(resume_content, job_post_description, job_application_id, db):
-   resume_raw_text = extract_text_from_pdf_bytes(resume_content)
-   ai_evaluation = evaluate_resume_with_ai(resume_raw_text, job_post_description)
-   evaluation = JobApplicationAIEvaluation(
-      job_application_id = job_application_id,
-      overall_score = ai_evaluation["overall_score"],
-      evaluation = ai_evaluation
-   )
-   db.add(evaluation)
-   db.commit()
-
-def ingest_resume_for_recommendataions(resume_content, resume_url, resume_id, vector_store):
-   resume_raw_text = extract_text_from_pdf_bytes(resume_content)
-   ingest_resume(resume_raw_text, resume_url, resume_id, vector_store)
-
 @app.post("/api/job-applications")
 async def api_create_new_job_application(
    job_application_form: Annotated[JobApplicationForm, Form()], 
-   background_tasks: BackgroundTasks, 
-   db: Session = Depends(get_db),
-   vector_store = Depends(get_vector_store)):
+   db: AsyncSession = Depends(get_async_db)):
 
-   jobPost = db.get(JobPost, job_application_form.job_post_id)
+   jobPost = await db.get(JobPost, job_application_form.job_post_id)
    if not jobPost or not jobPost.is_open:
       raise HTTPException(status_code=400)
-   resume_content = await job_application_form.resume.read()
-   file_url = file_storage.upload_file("resumes", job_application_form.resume.filename, resume_content, job_application_form.resume.content_type)
+   resume = await inspect_upload(job_application_form.resume, settings.UPLOAD_MAX_RESUME_BYTES)
+   # Sniffed from the bytes, not the declared content type
+   if resume.content_type != "application/pdf":
+      raise HTTPException(status_code=415, detail="Resume must be a PDF")
+   resume_sha256 = resume.sha256
+   # Resumes are stored under their content hash, so a candidate applying to
+   # several posts with the same file is uploaded once
+   file_url = await db.scalar(select(JobApplication.resume_url)
+                              .filter(JobApplication.resume_sha256 == resume_sha256).limit(1))
+   if file_url is None:
+      file_url = await file_storage.upload_file("resumes", f"{resume_sha256}.pdf", resume.file, resume.content_type)
    new_job_application = JobApplication(
       first_name=job_application_form.first_name, 
       last_name=job_application_form.last_name, 
       email=job_application_form.email, 
       job_post_id = job_application_form.job_post_id,
-      resume_url=file_url)
+      resume_url=file_url,
+      resume_sha256=resume_sha256)
    db.add(new_job_application)
-   db.commit()
-   db.refresh(new_job_application)
-   background_tasks.add_task(send_email, 
-                           new_job_application.email, 
-                           "Acknowledgement", 
-                           "We have received your job application")
-   
-   background_tasks.add_task(evaluate_resume, resume_content, 
-                              jobPost.description, new_job_application.id, db)
-   
-   background_tasks.add_task(ingest_resume_for_recommendataions, resume_content, 
-                              file_url, new_job_application.id, vector_store)
-   
+   await db.flush()
+   # Processed by worker.py; queued in the same transaction as the application
+   enqueue(db, "send_email", {"to": new_job_application.email,
+                              "subject": "Acknowledgement",
+                              "body": "We have received your job application"})
+   # extract_resume parses the PDF once, then queues evaluation and ingestion
+   enqueue(db, "extract_resume", {"job_application_id": new_job_application.id})
+   await db.commit()
+   await db.refresh(new_job_application)
    return new_job_application
 
 class JobDescriptionForm(BaseModel):
@@ -199,9 +398,30 @@ class JobDescriptionForm(BaseModel):
 
 @app.post("/api/review-job-description")
 async def api_create_job_post(job_post_form: Annotated[JobDescriptionForm, Form()]):
-   reviewed_application = review_application(job_post_form.description)
+   reviewed_application = await areview_application(job_post_form.description)
    return reviewed_application
 
+def server_sent_event(event, data):
+   return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def review_events(description):
+   try:
+      async for event, data in astream_review_application(description):
+         if event == "summary":
+            yield server_sent_event("summary", {"overall_summary": data})
+         elif event == "token":
+            yield server_sent_event("token", {"text": data})
+         else:
+            yield server_sent_event("done", data.model_dump())
+   except Exception:
+      logger.exception("streamed job description review failed")
+      yield server_sent_event("error", {"detail": "Review failed"})
+
+@app.post("/api/review-job-description/stream")
+async def api_review_job_description_stream(job_post_form: Annotated[JobDescriptionForm, Form()]):
+   return StreamingResponse(review_events(job_post_form.description), media_type="text/event-stream",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 if not settings.IS_CI:
    app.mount("/assets", StaticFiles(directory="frontend/build/client/assets"))
 
@@ -0,0 +1,19 @@
+import bisect
+
+# Counts per bucket (not cumulative) with the upper bounds given, plus +Inf
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        buckets = {str(bound): count for bound, count in zip(self.bounds, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {"buckets": buckets, "count": self.count, "sum": self.sum}
@@ -0,0 +1,53 @@
+"""add indexes for api filters
+
+Revision ID: 8b6f3c1d2e47
+Revises: 1f0f2a3b5233
+Create Date: 2025-12-02 10:12:41.215390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b6f3c1d2e47'
+down_revision: Union[str, Sequence[str], None] = '1f0f2a3b5233'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY so existing tables stay writable while the indexes build;
+    # it cannot run inside a transaction, hence the autocommit block.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_job_posts_job_board_id', 'job_posts', ['job_board_id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_job_applications_job_post_id', 'job_applications', ['job_post_id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_job_application_ai_evaluations_job_application_id', 'job_application_ai_evaluations',
+                        ['job_application_id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_job_application_ai_evaluations_overall_score', 'job_application_ai_evaluations',
+                        ['overall_score'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_job_application_ai_evaluations_evaluation', 'job_application_ai_evaluations',
+                        ['evaluation'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'evaluation': 'jsonb_path_ops'},
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_job_application_ai_evaluations_evaluation', table_name='job_application_ai_evaluations',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_job_application_ai_evaluations_overall_score', table_name='job_application_ai_evaluations',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_job_application_ai_evaluations_job_application_id', table_name='job_application_ai_evaluations',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_job_applications_job_post_id', table_name='job_applications',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_job_posts_job_board_id', table_name='job_posts',
+                      postgresql_concurrently=True, if_exists=True)
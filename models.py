@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, ForeignKey
+from sqlalchemy import Boolean, Column, Float, Index, Integer, String, Text, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -14,25 +14,90 @@ class JobPost(Base):
   id = Column(Integer, primary_key=True)
   title = Column(String, nullable=False)
   description = Column(String, nullable=False)
-  job_board_id = Column(Integer, ForeignKey("job_boards.id"),  nullable=False)
+  job_board_id = Column(Integer, ForeignKey("job_boards.id"),  nullable=False, index=True)
   job_board = relationship("JobBoard")
   is_open = Column(Boolean, nullable=False, default=True)
 
 class JobApplication(Base):
   __tablename__ = 'job_applications'
   id = Column(Integer, primary_key=True)
-  job_post_id = Column(Integer, ForeignKey("job_posts.id"),  nullable=False)
+  job_post_id = Column(Integer, ForeignKey("job_posts.id"),  nullable=False, index=True)
   job_post = relationship("JobPost")
   first_name = Column(String, nullable=False)
   last_name = Column(String, nullable=False)
   email = Column(String, nullable=False)
   resume_url = Column(String, nullable=False)
+  # sha256 of the uploaded resume; identical files are stored, extracted and
+  # embedded once however many posts they are sent to
+  resume_sha256 = Column(String(64), nullable=True, index=True)
+  # Filled in once by the extract_resume job; everything downstream reads
+  # these instead of parsing the PDF again
+  resume_text = Column(Text, nullable=True)
+  resume_page_count = Column(Integer, nullable=True)
 
 
 from sqlalchemy.dialects.postgresql import JSONB
 class JobApplicationAIEvaluation(Base):
   __tablename__ = 'job_application_ai_evaluations'
   id = Column(Integer, primary_key=True)
+  job_application_id = Column(Integer, ForeignKey("job_applications.id"), nullable=False, index=True)
+  overall_score = Column(Integer, nullable=False, index=True)
+  evaluation = Column(JSONB, nullable=False)
+  # What was scored, so the same resume against the same description is
+  # never sent to the LLM twice
+  resume_sha256 = Column(String(64), nullable=True)
+  job_description_sha256 = Column(String(64), nullable=True)
+  __table_args__ = (
+    Index("ix_job_application_ai_evaluations_content_hashes", "resume_sha256", "job_description_sha256"),
+    # jsonb_path_ops only supports @> but is much smaller than the default opclass
+    Index("ix_job_application_ai_evaluations_evaluation", "evaluation",
+          postgresql_using="gin", postgresql_ops={"evaluation": "jsonb_path_ops"}),
+  )
+from sqlalchemy import DateTime, func
+class Job(Base):
+  __tablename__ = 'jobs'
+  id = Column(Integer, primary_key=True)
+  job_type = Column(String, nullable=False)
+  payload = Column(JSONB, nullable=False)
+  # queued -> running -> done, or back to queued for a retry, or dead once
+  # max_attempts is used up
+  status = Column(String, nullable=False, default="queued")
+  attempts = Column(Integer, nullable=False, default=0)
+  max_attempts = Column(Integer, nullable=False, default=5)
+  run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+  locked_until = Column(DateTime(timezone=True), nullable=True)
+  last_error = Column(String, nullable=True)
+  created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+  finished_at = Column(DateTime(timezone=True), nullable=True)
+  __table_args__ = (
+    Index("ix_jobs_claim", "job_type", "status", "run_at"),
+  )
+
+class RescoreRun(Base):
+  __tablename__ = 'rescore_runs'
+  id = Column(Integer, primary_key=True)
+  job_post_id = Column(Integer, ForeignKey("job_posts.id"), nullable=False, index=True)
+  status = Column(String, nullable=False, default="running")
+  # Checkpoint: applications are re-scored in id order, and everything up to
+  # this id has been written
+  last_job_application_id = Column(Integer, nullable=False, default=0)
+  processed = Column(Integer, nullable=False, default=0)
+  failed = Column(Integer, nullable=False, default=0)
+  skipped = Column(Integer, nullable=False, default=0)
+  created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+  finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class JobPostShortlist(Base):
+  # The resumes closest to a job post's description, kept up to date as
+  # resumes are ingested and posts are edited (see shortlists.py)
+  __tablename__ = 'job_post_shortlists'
+  id = Column(Integer, primary_key=True)
+  job_post_id = Column(Integer, ForeignKey("job_posts.id"), nullable=False)
   job_application_id = Column(Integer, ForeignKey("job_applications.id"), nullable=False)
-  overall_score = Column(Integer, nullable=False)
-  evaluation = Column(JSONB, nullable=False) 
\ No newline at end of file
+  job_application = relationship("JobApplication")
+  similarity = Column(Float, nullable=False)
+  created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+  __table_args__ = (
+    UniqueConstraint("job_post_id", "job_application_id", name="uq_job_post_shortlists_post_application"),
+    Index("ix_job_post_shortlists_post_similarity", "job_post_id", "similarity"),
+  )
@@ -0,0 +1,44 @@
+import base64
+import json
+from typing import Optional
+from fastapi import HTTPException, status
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def _encode(key: str, value: int) -> str:
+    payload = json.dumps({key: value}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def _decode(key: str, cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value = int(json.loads(base64.urlsafe_b64decode(padded))[key])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if value < 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return value
+
+def encode_cursor(last_id: int) -> str:
+    return _encode("id", last_id)
+
+def decode_cursor(cursor: str) -> int:
+    return _decode("id", cursor)
+
+# Ranked results (e.g. vector search) have no stable key to continue after,
+# so their cursors carry an offset instead
+def encode_offset_cursor(offset: int) -> str:
+    return _encode("offset", offset)
+
+def decode_offset_cursor(cursor: str) -> int:
+    return _decode("offset", cursor)
+
+async def keyset_page(db, query, id_column, limit: int, cursor: Optional[str]):
+    # One extra row tells us whether there is a next page without counting
+    if cursor is not None:
+        query = query.filter(id_column > decode_cursor(cursor))
+    rows = (await db.scalars(query.order_by(id_column).limit(limit + 1))).all()
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1].id) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,120 @@
+import logging
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+import tiktoken
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lines that are nothing but a page number: "3", "- 3 -", "Page 3", "Page 3 of 4"
+PAGE_NUMBER = re.compile(r"^[-–\s]*(page\s*)?\d+(\s*(of|/)\s*\d+)?[-–\s]*$", re.IGNORECASE)
+# How many lines at the top and bottom of a page are looked at for headers and footers
+EDGE_LINES = 3
+TRUNCATED = "[...]"
+# tiktoken downloads the encoding on first use. Without it (offline runs)
+# text is measured in characters instead: English averages about 4 a token,
+# and 3 errs on the side of a smaller prompt
+CHARS_PER_TOKEN = 3
+
+@lru_cache
+def get_encoding():
+    try:
+        return tiktoken.get_encoding(settings.TOKENIZER_ENCODING)
+    except Exception as e:
+        logger.warning("%s encoding unavailable, estimating tokens from characters: %s", settings.TOKENIZER_ENCODING, e)
+        return None
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def _first_tokens(text, max_tokens):
+    encoding = get_encoding()
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+def normalize_whitespace(text: str) -> str:
+    # PDF text comes with non-breaking spaces, runs of spaces used for layout,
+    # trailing blanks and several empty lines between blocks
+    text = text.replace("\u00a0", " ").replace("\u200b", "").replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r"(?<=[a-z])-\n(?=[a-z])", "", text)
+    lines = [re.sub(r"[ \t\f\v]+", " ", line).strip() for line in text.split("\n")]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+def _edge_key(line):
+    # "Jane Doe - Page 2" and "Jane Doe - Page 3" are the same footer
+    return re.sub(r"\d+", "#", line.lower())
+
+def drop_repeated_lines(pages: list[str]) -> list[str]:
+    # A line at the top or bottom of at least half of the pages (and at least
+    # two of them) is a running header or footer. Page numbers are dropped
+    # from the edges of every page.
+    page_lines = [page.split("\n") for page in pages]
+    edges = Counter()
+    for lines in page_lines:
+        text_lines = [line for line in lines if line]
+        edges.update({_edge_key(line) for line in text_lines[:EDGE_LINES] + text_lines[-EDGE_LINES:]})
+    threshold = max(2, (len(pages) + 1) // 2)
+    repeated = {key for key, count in edges.items() if count >= threshold}
+
+    cleaned = []
+    for lines in page_lines:
+        text_positions = [i for i, line in enumerate(lines) if line]
+        edge_positions = set(text_positions[:EDGE_LINES] + text_positions[-EDGE_LINES:])
+        cleaned.append("\n".join(line for i, line in enumerate(lines)
+                                 if i not in edge_positions
+                                 or not (PAGE_NUMBER.match(line) or _edge_key(line) in repeated)))
+    return cleaned
+
+def clean_pages(pages: list[str]) -> str:
+    # Extracted pages to the text kept for an application
+    pages = [normalize_whitespace(page) for page in pages]
+    return normalize_whitespace("\n\n".join(page for page in drop_repeated_lines(pages) if page))
+
+def _truncate(section, max_tokens):
+    # Keeps whole lines from the start of the section while they fit
+    kept, used = [], 0
+    for line in section.split("\n"):
+        tokens = count_tokens(line) + 1
+        if used + tokens > max_tokens:
+            break
+        kept.append(line)
+        used += tokens
+    if not kept:
+        kept = [_first_tokens(section, max_tokens)]
+    return "\n".join(kept + [TRUNCATED])
+
+def fit_to_budget(text: str, budget: int) -> str:
+    # Blocks separated by an empty line are treated as sections. If the text
+    # is over budget, every section is cut to the same cap, the largest one
+    # that fits: short sections (contact, skills, education) survive intact
+    # and the long ones (usually experience) are shortened from the end.
+    text = normalize_whitespace(text)
+    sections = text.split("\n\n")
+    sizes = [count_tokens(section) + 1 for section in sections]
+    if sum(sizes) <= budget:
+        return text
+
+    marker = count_tokens(TRUNCATED) + 1
+    cap = 0
+    for candidate in sorted(set(sizes)):
+        if sum(size if size <= candidate else candidate + marker for size in sizes) > budget:
+            break
+        cap = candidate
+    remaining = budget - sum(size for size in sizes if size <= cap)
+    over_cap = sum(1 for size in sizes if size > cap)
+    cap = max(cap, remaining // over_cap - marker)
+    if cap <= 0:
+        # Too many sections to give each a share; keep the start of the text
+        return _truncate(text, budget - marker)
+    return "\n\n".join(section if size <= cap else _truncate(section, cap)
+                       for section, size in zip(sections, sizes))
+
+def prepare_evaluation_inputs(resume_text: str, job_description: str) -> tuple[str, str]:
+    return (fit_to_budget(resume_text, settings.RESUME_TOKEN_BUDGET),
+            fit_to_budget(job_description, settings.JOB_DESCRIPTION_TOKEN_BUDGET))
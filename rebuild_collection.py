@@ -0,0 +1,78 @@
+import argparse
+import logging
+import numpy as np
+from qdrant_client.http.models import PointStruct, SparseVector
+from ai import RESUME_SPARSE_VECTOR, create_resume_collection, qdrant_client
+from bm25 import BM25SparseEmbeddings
+from config import settings
+
+logger = logging.getLogger("rebuild_collection")
+
+def shorten(vector, dimensions):
+    # Same as asking text-embedding-3 for fewer dimensions: keep the prefix
+    # and scale it back to unit length
+    prefix = np.asarray(vector[:dimensions], dtype=np.float32)
+    norm = np.linalg.norm(prefix)
+    return (prefix / norm if norm else prefix).tolist()
+
+def dense_vector(vector):
+    # Collections with a sparse vector return every vector of a point by name
+    return vector[""] if isinstance(vector, dict) else vector
+
+def rebuild(client, source, target, dimensions, quantization, batch_size=256, replace=False):
+    # Copies every point of `source` into a new collection `target` with the
+    # given layout. The source is left untouched; the service moves over when
+    # RESUME_COLLECTION (and the layout settings) point at the target. The
+    # BM25 sparse vectors are recomputed from the stored text.
+    vectors_config = client.get_collection(source).config.params.vectors
+    source_dimensions = (vectors_config[""] if isinstance(vectors_config, dict) else vectors_config).size
+    if dimensions > source_dimensions:
+        raise SystemExit(f"{source} has {source_dimensions} dimensions; vectors cannot be made longer")
+    if client.collection_exists(target):
+        if not replace:
+            raise SystemExit(f"{target} already exists (use --replace to rebuild it)")
+        client.delete_collection(target)
+    create_resume_collection(client, target, dimensions, quantization)
+    sparse_embeddings = BM25SparseEmbeddings()
+
+    copied = 0
+    offset = None
+    while True:
+        records, offset = client.scroll(source, limit=batch_size, offset=offset, with_payload=True, with_vectors=True)
+        if records:
+            sparse = sparse_embeddings.embed_documents([r.payload.get("page_content", "") for r in records])
+            client.upsert(target, points=[
+                PointStruct(id=r.id, payload=r.payload, vector={
+                    "": shorten(dense_vector(r.vector), dimensions),
+                    RESUME_SPARSE_VECTOR: SparseVector(indices=s.indices, values=s.values),
+                })
+                for r, s in zip(records, sparse)])
+            copied += len(records)
+            logger.info("copied %s points", copied)
+        if offset is None:
+            return copied
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuilds a resume collection with another vector layout")
+    parser.add_argument("--source", default=settings.RESUME_COLLECTION)
+    parser.add_argument("--target", required=True)
+    parser.add_argument("--dimensions", type=int, default=settings.RESUME_VECTOR_DIMENSIONS)
+    parser.add_argument("--quantization", choices=["none", "scalar", "binary"], default=settings.RESUME_VECTOR_QUANTIZATION)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--replace", action="store_true", help="drop the target first if it exists")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    client = qdrant_client()
+    try:
+        copied = rebuild(client, args.source, args.target, args.dimensions, args.quantization,
+                         args.batch_size, args.replace)
+    finally:
+        client.close()
+    print(f"copied {copied} points from {args.source} to {args.target}. To use it, set:")
+    print(f"  RESUME_COLLECTION={args.target}")
+    print(f"  RESUME_VECTOR_DIMENSIONS={args.dimensions}")
+    print(f"  RESUME_VECTOR_QUANTIZATION={args.quantization}")
+
+if __name__ == "__main__":
+    main()
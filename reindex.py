@@ -0,0 +1,209 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from qdrant_client.http.models import (CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation, PointStruct,
+                                       SparseVector)
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+import ai
+import db as database
+import file_storage
+from bm25 import BM25SparseEmbeddings
+from config import settings
+from converter import extract_many_in_pool, shutdown_pool
+from models import JobApplication, JobApplicationAIEvaluation
+from preprocess import clean_pages
+
+logger = logging.getLogger("reindex")
+
+# Rebuilds the resume vector index from the database: every JobApplication is
+# embedded again into a fresh collection, which then replaces the live one by
+# moving the RESUME_COLLECTION alias to it in a single operation.
+#
+# Applications are walked in id order, `batch_size` at a time; after each
+# batch is written the checkpoint file records the last id, so a run that
+# stops is resumed by starting it again. Applications created while the
+# rebuild runs are picked up as long as they exist before it finishes; score
+# updates to already copied resumes are not, so run it when the worker is
+# quiet (in local Qdrant mode the worker has to be stopped anyway, since only
+# one process can open the store).
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def save_checkpoint(path, checkpoint):
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(temporary, path)
+
+def latest_overall_scores(db, job_application_ids):
+    rows = db.execute(select(JobApplicationAIEvaluation.job_application_id, JobApplicationAIEvaluation.overall_score)
+                      .filter(JobApplicationAIEvaluation.job_application_id.in_(job_application_ids))
+                      .distinct(JobApplicationAIEvaluation.job_application_id)
+                      .order_by(JobApplicationAIEvaluation.job_application_id, JobApplicationAIEvaluation.id.desc()))
+    return dict(rows.all())
+
+def resume_texts(db, applications, re_extract, download_threads):
+    # Stored text is used as is unless re_extract; the rest is downloaded on
+    # threads, extracted in the PDF process pool and stored for next time.
+    # Returns {job application id: text or the error it failed with}
+    texts = {a.id: a.resume_text for a in applications if a.resume_text and not re_extract}
+    missing = [a for a in applications if a.id not in texts]
+    if missing:
+        with ThreadPoolExecutor(max_workers=download_threads) as executor:
+            downloads = list(executor.map(lambda a: _download(a.resume_url), missing))
+        documents = [d for d in downloads if isinstance(d, bytes)]
+        extracted = iter(extract_many_in_pool(documents, settings.PDF_MAX_PAGES, settings.PDF_MAX_CHARS))
+        for application, download in zip(missing, downloads):
+            pages = next(extracted) if isinstance(download, bytes) else download
+            if isinstance(pages, Exception):
+                texts[application.id] = pages
+                continue
+            application.resume_text = clean_pages(pages)
+            application.resume_page_count = len(pages)
+            texts[application.id] = application.resume_text
+    return texts
+
+def _download(resume_url):
+    try:
+        return file_storage.download_file(resume_url)
+    except Exception as e:
+        return e
+
+def swap_alias(client, alias, target, drop_collection=False):
+    # Returns the collection the alias pointed at before, if any
+    previous = next((a.collection_name for a in client.get_aliases().aliases if a.alias_name == alias), None)
+    operations = [CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=alias))]
+    if previous is not None:
+        operations.insert(0, DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+    elif client.collection_exists(alias):
+        # A plain collection still has the name: it has to go before the
+        # alias can be created, and searches fail until it is
+        if not drop_collection:
+            raise SystemExit(f"{alias} is a collection, not an alias (use --drop-collection to replace it)")
+        client.delete_collection(alias)
+        previous = alias
+    client.update_collection_aliases(change_aliases_operations=operations)
+    return previous
+
+def reindex(session_factory, client, alias, checkpoint_path, target=None, dimensions=None, quantization=None,
+            batch_size=256, re_extract=False, download_threads=8, drop_collection=False):
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint is not None:
+        if target is not None and target != checkpoint["target"]:
+            raise SystemExit(f"{checkpoint_path} belongs to a rebuild into {checkpoint['target']}; "
+                             f"remove it to start over")
+        logger.info("resuming the rebuild into %s after job application %s",
+                    checkpoint["target"], checkpoint["last_job_application_id"])
+    else:
+        target = target or f"{alias}_{time.strftime('%Y%m%d%H%M%S')}"
+        if client.collection_exists(target):
+            raise SystemExit(f"{target} already exists")
+        checkpoint = {"target": target, "alias": alias,
+                      "dimensions": dimensions or settings.RESUME_VECTOR_DIMENSIONS,
+                      "quantization": quantization or settings.RESUME_VECTOR_QUANTIZATION,
+                      "last_job_application_id": 0, "indexed": 0, "failed": []}
+        ai.create_resume_collection(client, target, checkpoint["dimensions"], checkpoint["quantization"])
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    embeddings = ai.make_embeddings(checkpoint["dimensions"])
+    sparse_embeddings = BM25SparseEmbeddings()
+    started = time.monotonic()
+    indexed_now = 0
+    with session_factory() as db:
+        while True:
+            applications = db.scalars(select(JobApplication)
+                                      .options(selectinload(JobApplication.job_post))
+                                      .filter(JobApplication.id > checkpoint["last_job_application_id"])
+                                      .order_by(JobApplication.id)
+                                      .limit(batch_size)).all()
+            if not applications:
+                break
+            texts = resume_texts(db, applications, re_extract, download_threads)
+            scores = latest_overall_scores(db, [a.id for a in applications])
+            indexable = [a for a in applications if isinstance(texts[a.id], str) and texts[a.id]]
+            for application in applications:
+                if application not in indexable:
+                    logger.warning("job application %s skipped: %s", application.id, texts[application.id] or "no text")
+                    checkpoint["failed"].append(application.id)
+
+            documents = [texts[a.id] for a in indexable]
+            # One embeddings call per batch; the client splits it into
+            # requests of its own chunk size
+            dense = embeddings.embed_documents(documents) if documents else []
+            sparse = sparse_embeddings.embed_documents(documents)
+            points = []
+            for application, text, vector, sparse_vector in zip(indexable, documents, dense, sparse):
+                # Same payload as ingest_resume writes through the vector store
+                metadata = {"url": application.resume_url,
+                            "job_application_id": application.id,
+                            "job_post_id": application.job_post_id,
+                            "job_board_id": application.job_post.job_board_id,
+                            "overall_score": scores.get(application.id)}
+                points.append(PointStruct(id=application.id, payload={"page_content": text, "metadata": metadata},
+                                          vector={"": vector, ai.RESUME_SPARSE_VECTOR: SparseVector(
+                                              indices=sparse_vector.indices, values=sparse_vector.values)}))
+            if points:
+                client.upsert(checkpoint["target"], points=points)
+            db.commit()
+
+            checkpoint["last_job_application_id"] = applications[-1].id
+            checkpoint["indexed"] += len(points)
+            save_checkpoint(checkpoint_path, checkpoint)
+            indexed_now += len(points)
+            minutes = (time.monotonic() - started) / 60
+            logger.info("%s indexed (%s failed), %.0f resumes/min", checkpoint["indexed"], len(checkpoint["failed"]),
+                        indexed_now / minutes if minutes else 0)
+
+    previous = swap_alias(client, alias, checkpoint["target"], drop_collection)
+    os.remove(checkpoint_path)
+    minutes = (time.monotonic() - started) / 60
+    return {"target": checkpoint["target"], "previous": previous, "indexed": checkpoint["indexed"],
+            "dimensions": checkpoint["dimensions"], "quantization": checkpoint["quantization"],
+            "failed": checkpoint["failed"], "resumes_per_minute": indexed_now / minutes if minutes else 0}
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuilds the resume vector index from the database")
+    parser.add_argument("--alias", default=settings.RESUME_COLLECTION, help="what the service searches")
+    parser.add_argument("--target", help="collection to build (default: <alias>_<timestamp>)")
+    parser.add_argument("--dimensions", type=int, help="default: RESUME_VECTOR_DIMENSIONS")
+    parser.add_argument("--quantization", choices=["none", "scalar", "binary"], help="default: RESUME_VECTOR_QUANTIZATION")
+    parser.add_argument("--batch-size", type=int, default=256, help="applications per embeddings call and checkpoint")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="PDF extraction processes")
+    parser.add_argument("--download-threads", type=int, default=8)
+    parser.add_argument("--re-extract", action="store_true", help="extract every PDF again instead of using stored text")
+    parser.add_argument("--checkpoint", default="reindex_checkpoint.json")
+    parser.add_argument("--drop-collection", action="store_true",
+                        help="delete a plain collection named like the alias (the first time aliases are used)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    settings.PDF_POOL_PROCESSES = args.processes
+    client = ai.qdrant_client()
+    try:
+        result = reindex(database.get_session_factory(), client, args.alias, args.checkpoint, args.target,
+                         args.dimensions, args.quantization, args.batch_size, args.re_extract,
+                         args.download_threads, args.drop_collection)
+    finally:
+        shutdown_pool()
+        client.close()
+        database.dispose_engine()
+    print(f"{result['indexed']} resumes indexed into {result['target']} "
+          f"({result['resumes_per_minute']:.0f} resumes/min), {len(result['failed'])} failed: {result['failed']}")
+    print(f"{args.alias} now points at {result['target']}"
+          + (f"; {result['previous']} can be deleted" if result["previous"] not in (None, args.alias) else ""))
+    if (result["dimensions"], result["quantization"]) != (settings.RESUME_VECTOR_DIMENSIONS,
+                                                          settings.RESUME_VECTOR_QUANTIZATION):
+        print("The layout changed; restart the service and worker with:")
+        print(f"  RESUME_VECTOR_DIMENSIONS={result['dimensions']}")
+        print(f"  RESUME_VECTOR_QUANTIZATION={result['quantization']}")
+
+if __name__ == "__main__":
+    main()
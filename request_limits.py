@@ -0,0 +1,29 @@
+from fastapi.responses import JSONResponse
+from starlette.exceptions import HTTPException
+from config import settings
+
+# Refuses request bodies over UPLOAD_MAX_REQUEST_BYTES with a 413, by Content-Length
+# or by counting the body as it is received
+class RequestSizeLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        max_bytes = settings.UPLOAD_MAX_REQUEST_BYTES
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+            response = JSONResponse({"detail": "Request body too large"}, status_code=413)
+            return await response(scope, receive, send)
+
+        received = 0
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,139 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import time
+from sqlalchemy import func, insert, select, text
+import db as database
+from config import settings
+from evaluation_engine import EvaluationEngine
+from job_queue import enqueue
+from models import JobApplication, JobApplicationAIEvaluation, JobPost, RescoreRun
+
+logger = logging.getLogger("rescore")
+
+RUNNING = "running"
+DONE = "done"
+
+class RescoreAlreadyRunning(Exception):
+    pass
+
+def new_rescore_run(db, job_post_id):
+    # Works with both Session and AsyncSession; the caller commits
+    run = RescoreRun(job_post_id=job_post_id, status=RUNNING, last_job_application_id=0,
+                     processed=0, failed=0, skipped=0)
+    db.add(run)
+    return run
+
+async def rescore(session_factory, rescore_run_id, engine=None, batch_size=None, max_seconds=None):
+    # Re-evaluates every application of the run's job post, in id order and
+    # `batch_size` at a time. Each batch's evaluations are inserted in one
+    # statement and committed together with the checkpoint, so an interrupted
+    # run resumes after the last committed batch and never scores twice.
+    # With max_seconds it returns after the first batch that ends past it,
+    # with the run still RUNNING.
+    engine = engine or EvaluationEngine()
+    deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+    batch_size = batch_size or settings.RESCORE_BATCH_SIZE
+    async with session_factory() as lock_db, session_factory() as db:
+        # Held until lock_db closes; keeps two workers (e.g. after a job lease
+        # expired) from working on the same run at once
+        locked = await lock_db.scalar(text("SELECT pg_try_advisory_xact_lock(hashtext('rescore_job_post'), :id)"),
+                                      {"id": rescore_run_id})
+        if not locked:
+            raise RescoreAlreadyRunning(f"rescore run {rescore_run_id} is already in progress")
+
+        run = await db.get(RescoreRun, rescore_run_id)
+        if run.status == DONE:
+            return run
+        job_post = await db.get(JobPost, run.job_post_id)
+        job_description = job_post.description
+        job_description_sha256 = hashlib.sha256(job_description.encode("utf-8")).hexdigest()
+
+        while True:
+            applications = (await db.scalars(select(JobApplication)
+                .filter(JobApplication.job_post_id == run.job_post_id,
+                        JobApplication.id > run.last_job_application_id)
+                .order_by(JobApplication.id)
+                .limit(batch_size))).all()
+            if not applications:
+                break
+
+            # Only stored text is used; applications whose resume was never
+            # extracted are left to the extract_resume job
+            scorable = [a for a in applications if a.resume_text]
+            results = await engine.evaluate_many([(a.resume_text, job_description) for a in scorable])
+            rows = []
+            for job_application, result in zip(scorable, results):
+                if isinstance(result, Exception):
+                    logger.warning("application %s could not be scored: %s", job_application.id, result)
+                    run.failed += 1
+                    continue
+                rows.append({"job_application_id": job_application.id,
+                             "overall_score": result["overall_score"],
+                             "evaluation": result,
+                             "resume_sha256": job_application.resume_sha256,
+                             "job_description_sha256": job_description_sha256})
+            if rows:
+                await db.execute(insert(JobApplicationAIEvaluation), rows)
+                enqueue(db, "update_resume_metadata", {"job_application_ids": [row["job_application_id"] for row in rows]})
+            run.processed += len(rows)
+            run.skipped += len(applications) - len(scorable)
+            run.last_job_application_id = applications[-1].id
+            await db.commit()
+            for job_application in applications:
+                db.expunge(job_application)
+            logger.info("rescore run %s: %s scored, %s failed, %s skipped", run.id, run.processed, run.failed, run.skipped)
+            if deadline is not None and time.monotonic() >= deadline:
+                return run
+
+        run.status = DONE
+        run.finished_at = func.now()
+        await db.commit()
+        await db.refresh(run)
+        return run
+
+async def run_rescore(rescore_run_id, max_seconds=None):
+    try:
+        return await rescore(database.get_async_session_factory(), rescore_run_id, max_seconds=max_seconds)
+    finally:
+        # asyncio.run closes the loop afterwards; pooled connections must not
+        # outlive it
+        await database.dispose_async_engine()
+
+def rescore_job_post_task(db, payload):
+    # A job lease has no heartbeat, so a large post is scored over several
+    # jobs: each continues from the checkpoint and, when out of time, queues
+    # the next one, committed when this job completes
+    run = asyncio.run(run_rescore(payload["rescore_run_id"], settings.RESCORE_JOB_SECONDS))
+    if run.status != DONE:
+        enqueue(db, "rescore_job_post", payload)
+
+async def start_or_resume(job_post_id, restart):
+    session_factory = database.get_async_session_factory()
+    async with session_factory() as db:
+        if await db.get(JobPost, job_post_id) is None:
+            raise SystemExit(f"job post {job_post_id} does not exist")
+        run = None
+        if not restart:
+            run = await db.scalar(select(RescoreRun)
+                                  .filter(RescoreRun.job_post_id == job_post_id, RescoreRun.status == RUNNING)
+                                  .order_by(RescoreRun.id.desc()).limit(1))
+        if run is None:
+            run = new_rescore_run(db, job_post_id)
+            await db.commit()
+        else:
+            logger.info("resuming rescore run %s after application %s", run.id, run.last_job_application_id)
+    return await run_rescore(run.id)
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-evaluates every application of a job post")
+    parser.add_argument("job_post_id", type=int)
+    parser.add_argument("--restart", action="store_true", help="start over instead of resuming an unfinished run")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    run = asyncio.run(start_or_resume(args.job_post_id, args.restart))
+    print(f"rescore run {run.id}: {run.processed} scored, {run.failed} failed, {run.skipped} skipped")
+
+if __name__ == "__main__":
+    main()
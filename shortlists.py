@@ -0,0 +1,59 @@
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from ai import index_job_post, match_job_posts, match_resumes
+from config import settings
+from models import JobApplication, JobPost, JobPostShortlist
+
+# Shortlists are kept from both sides. A new resume is matched against every
+# open post of its job board (shortlist_resume), and a new or edited post
+# against every resume of its board (shortlist_job_post). The resume's point
+# is written before its shortlist_resume job is queued, and a post's point
+# before it searches the resumes, so a resume and a post indexed at the same
+# time always find each other from one side or the other.
+
+def upsert_matches(db, rows):
+    # rows: (job_post_id, job_application_id, similarity)
+    if not rows:
+        return
+    statement = insert(JobPostShortlist).values([
+        {"job_post_id": job_post_id, "job_application_id": job_application_id, "similarity": similarity}
+        for job_post_id, job_application_id, similarity in rows])
+    db.execute(statement.on_conflict_do_update(constraint="uq_job_post_shortlists_post_application",
+                                               set_={"similarity": statement.excluded.similarity}))
+
+def trim_shortlist(db, job_post_id):
+    keep = select(JobPostShortlist.id) \
+        .filter(JobPostShortlist.job_post_id == job_post_id) \
+        .order_by(JobPostShortlist.similarity.desc(), JobPostShortlist.id) \
+        .limit(settings.SHORTLIST_SIZE)
+    db.execute(delete(JobPostShortlist).where(JobPostShortlist.job_post_id == job_post_id,
+                                              JobPostShortlist.id.not_in(keep.scalar_subquery())))
+
+def shortlist_resume(db, job_application, resume_text, vector_store):
+    job_board_id = job_application.job_post.job_board_id
+    open_posts = db.scalar(select(func.count()).select_from(JobPost)
+                           .filter(JobPost.job_board_id == job_board_id, JobPost.is_open == True))
+    if not open_posts:
+        return []
+    matches = match_job_posts(vector_store, resume_text, job_board_id, open_posts)
+    upsert_matches(db, [(job_post_id, job_application.id, similarity) for job_post_id, similarity in matches])
+    for job_post_id, _ in matches:
+        trim_shortlist(db, job_post_id)
+    return matches
+
+def shortlist_job_post(db, job_post, vector_store):
+    # (Re)embeds the description and, for an open post, rebuilds its
+    # shortlist. A closed post keeps the shortlist it had
+    vector = index_job_post(vector_store, job_post.id, job_post.job_board_id, job_post.description, job_post.is_open)
+    if not job_post.is_open:
+        return []
+    matches = match_resumes(vector_store, vector, job_post.job_board_id, settings.SHORTLIST_SIZE)
+    db.execute(delete(JobPostShortlist).where(JobPostShortlist.job_post_id == job_post.id))
+    upsert_matches(db, [(job_post.id, job_application_id, similarity) for job_application_id, similarity in matches])
+    return matches
+
+def shortlist_query(job_post_id):
+    return select(JobPostShortlist, JobApplication) \
+        .join(JobApplication, JobApplication.id == JobPostShortlist.job_application_id) \
+        .filter(JobPostShortlist.job_post_id == job_post_id) \
+        .order_by(JobPostShortlist.similarity.desc(), JobPostShortlist.id)
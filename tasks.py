@@ -0,0 +1,123 @@
+import hashlib
+from sqlalchemy import select
+from ai import evaluate_resume_with_ai, ingest_resume, ingest_resume_batched, get_vector_store, update_resume_metadata
+from converter import extract_resume_pages, extract_text_from_pdf_bytes
+from emailer import send_email
+import file_storage
+from job_queue import enqueue
+from models import JobApplication, JobApplicationAIEvaluation, JobPost
+from preprocess import clean_pages
+from rescore import rescore_job_post_task
+from shortlists import shortlist_job_post, shortlist_resume
+
+def worker_vector_store():
+   return get_vector_store()
+
+def sha256_hex(text):
+   return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def ingest_resume_for_recommendataions(resume_content, resume_url, resume_id, vector_store):
+   resume_raw_text = extract_text_from_pdf_bytes(resume_content)
+   ingest_resume(resume_raw_text, resume_url, resume_id, vector_store)
+
+def first_application_with_same_resume(db, job_application):
+   if job_application.resume_sha256 is None:
+      return job_application
+   return db.scalars(select(JobApplication)
+                     .filter(JobApplication.resume_sha256 == job_application.resume_sha256)
+                     .order_by(JobApplication.id).limit(1)).first()
+
+def ensure_resume_text(db, job_application):
+   # Text is taken from an earlier application with the same file when there
+   # is one; otherwise extracted (and kept) the first time anything needs it
+   if job_application.resume_text is None:
+      first = first_application_with_same_resume(db, job_application)
+      if first.resume_text is not None:
+         job_application.resume_text = first.resume_text
+         job_application.resume_page_count = first.resume_page_count
+      else:
+         resume_content = file_storage.download_file(job_application.resume_url)
+         pages = extract_resume_pages(resume_content)
+         job_application.resume_text = clean_pages(pages)
+         job_application.resume_page_count = len(pages)
+   return job_application.resume_text
+
+def send_email_task(db, payload):
+   send_email(payload["to"], payload["subject"], payload["body"])
+
+def extract_resume_task(db, payload):
+   job_application = db.get(JobApplication, payload["job_application_id"])
+   ensure_resume_text(db, job_application)
+   enqueue(db, "evaluate_resume", {"job_application_id": job_application.id})
+   enqueue(db, "ingest_resume", {"job_application_id": job_application.id})
+
+def evaluate_resume_task(db, payload):
+   job_application = db.get(JobApplication, payload["job_application_id"])
+   resume_raw_text = ensure_resume_text(db, job_application)
+   job_description = job_application.job_post.description
+   resume_sha256 = job_application.resume_sha256 or sha256_hex(resume_raw_text)
+   job_description_sha256 = sha256_hex(job_description)
+   previous = db.scalars(select(JobApplicationAIEvaluation).filter(
+      JobApplicationAIEvaluation.resume_sha256 == resume_sha256,
+      JobApplicationAIEvaluation.job_description_sha256 == job_description_sha256).limit(1)).first()
+   ai_evaluation = previous.evaluation if previous else evaluate_resume_with_ai(resume_raw_text, job_description)
+   evaluation = JobApplicationAIEvaluation(
+      job_application_id = job_application.id,
+      overall_score = ai_evaluation["overall_score"],
+      evaluation = ai_evaluation,
+      resume_sha256 = resume_sha256,
+      job_description_sha256 = job_description_sha256
+   )
+   # committed together with the job's completion, so a retry after a crash
+   # cannot leave a duplicate evaluation behind
+   db.add(evaluation)
+   enqueue(db, "update_resume_metadata", {"job_application_ids": [job_application.id]})
+
+def latest_overall_score(db, job_application_id):
+   return db.scalars(select(JobApplicationAIEvaluation.overall_score)
+                     .filter(JobApplicationAIEvaluation.job_application_id == job_application_id)
+                     .order_by(JobApplicationAIEvaluation.id.desc()).limit(1)).first()
+
+def resume_metadata(db, job_application):
+   # What recommendation searches filter on (see ai.RESUME_PAYLOAD_INDEXES)
+   return {"job_application_id": job_application.id,
+           "job_post_id": job_application.job_post_id,
+           "job_board_id": job_application.job_post.job_board_id,
+           "overall_score": latest_overall_score(db, job_application.id)}
+
+def ingest_resume_task(db, payload):
+   # Every application gets its own point, carrying its job post and board.
+   # The same file sent again costs nothing to embed: its text is taken from
+   # the first application and its vector from the embedding cache
+   job_application = db.get(JobApplication, payload["job_application_id"])
+   resume_raw_text = ensure_resume_text(db, job_application)
+   ingest_resume_batched(resume_raw_text, job_application.resume_url, job_application.id, worker_vector_store(),
+                         resume_metadata(db, job_application))
+   enqueue(db, "shortlist_resume", {"job_application_id": job_application.id})
+
+def shortlist_resume_task(db, payload):
+   job_application = db.get(JobApplication, payload["job_application_id"])
+   shortlist_resume(db, job_application, ensure_resume_text(db, job_application), worker_vector_store())
+
+def index_job_post_task(db, payload):
+   # Queued when a post is created, edited or closed
+   shortlist_job_post(db, db.get(JobPost, payload["job_post_id"]), worker_vector_store())
+
+def update_resume_metadata_task(db, payload):
+   # Queued with every new evaluation; the score in the vector store is what
+   # recommendations filter on
+   vector_store = worker_vector_store()
+   for job_application_id in payload["job_application_ids"]:
+      update_resume_metadata(vector_store, job_application_id,
+                             {"overall_score": latest_overall_score(db, job_application_id)})
+
+HANDLERS = {
+   "send_email": send_email_task,
+   "extract_resume": extract_resume_task,
+   "evaluate_resume": evaluate_resume_task,
+   "ingest_resume": ingest_resume_task,
+   "update_resume_metadata": update_resume_metadata_task,
+   "shortlist_resume": shortlist_resume_task,
+   "index_job_post": index_job_post_task,
+   "rescore_job_post": rescore_job_post_task,
+}
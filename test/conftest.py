@@ -1,12 +1,17 @@
 import os
 from models import Base
+import httpx
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from testcontainers.postgres import PostgresContainer
 from fastapi.testclient import TestClient
-from main import app, get_db, get_vector_store
+from main import app
+from db import async_database_url, get_async_db, get_async_session_factory
 from ai import inmemory_vector_store
+from config import settings
 
 @pytest.fixture(scope="session")
 def postgres_container():
@@ -22,36 +27,67 @@ def db_engine(postgres_container):
 
 @pytest.fixture(scope="function")
 def db_session(db_engine):
-    connection = db_engine.connect()
-    SessionLocal = sessionmaker(bind=connection)
+    # The API handlers use their own (async) connections, so test data has to
+    # be really committed to be visible to them; tables are emptied afterwards.
+    SessionLocal = sessionmaker(bind=db_engine)
     session = SessionLocal()
-    transaction = connection.begin()
-    
+
     try:
         yield session
     finally:
-        if transaction.is_active:
-                transaction.rollback()
         session.close()
-        connection.close()
+        table_names = ", ".join(table.name for table in Base.metadata.sorted_tables)
+        with db_engine.begin() as connection:
+            connection.execute(text(f"TRUNCATE {table_names} RESTART IDENTITY CASCADE"))
+
+@pytest.fixture(scope="function")
+def session_factory(db_engine):
+    return sessionmaker(bind=db_engine)
 
 @pytest.fixture(scope="function")
-def vector_store():
-    yield from inmemory_vector_store()
+def vector_store(request):
+    # Parametrize indirectly with "dense" or "hybrid" to pick the retrieval mode
+    yield from inmemory_vector_store(getattr(request, "param", None))
 
 @pytest.fixture(scope="function")
-def client(db_session, vector_store):
-    def override_get_db():
-        yield db_session
-
-    def override_vector_store():
-        yield vector_store
-    
-    app.dependency_overrides[get_db] = override_get_db
-    app.dependency_overrides[get_vector_store] = override_vector_store
-    
+def client(postgres_container, db_session, monkeypatch):
+    # NullPool: TestClient runs each test on its own event loop, and pooled
+    # async connections cannot be carried over from one loop to the next.
+    # In local Qdrant mode the app doesn't connect to a vector store on
+    # startup; tests that need one override get_resume_vector_store
+    monkeypatch.setattr(settings, "QDRANT_MODE", "local")
+    async_engine = create_async_engine(async_database_url(postgres_container.get_connection_url()), poolclass=NullPool)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_session_factory] = lambda: AsyncSessionLocal
+
     try:
         with TestClient(app) as test_client:
             yield test_client
     finally:
-        app.dependency_overrides.clear()
\ No newline at end of file
+        app.dependency_overrides.clear()
+
+@pytest.fixture(scope="function")
+def login_as_admin(client, monkeypatch):
+    # Call it to give `client` an admin session
+    def login():
+        monkeypatch.setattr(settings, "ADMIN_USERNAME", "admin")
+        monkeypatch.setattr(settings, "ADMIN_PASSWORD", "test")
+        response = client.post("/api/admin-login", data={"username": "admin", "password": "test"})
+        assert response.status_code == 200
+    return login
+
+@pytest.fixture(scope="function")
+def post_chunked(client):
+    # Posts a multipart form without a Content-Length, as a chunked upload
+    def post(url, data, files):
+        request = httpx.Request("POST", url, data=data, files=files)
+        body = request.read()
+        chunks = iter([body[i:i + 512] for i in range(0, len(body), 512)])
+        return client.post(url, content=chunks, headers={"content-type": request.headers["content-type"]})
+    return post
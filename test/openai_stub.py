@@ -0,0 +1,49 @@
+import asyncio
+import json
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Stand-in for the OpenAI chat completions API: returns the `failures`
+# status codes first, and records the most requests seen in flight at once
+class OpenAIStub:
+    def __init__(self, response=None, failures=(), latency=0.0):
+        self.response = response if response is not None else {"overall_score": 75}
+        self.failures = list(failures)
+        self.latency = latency
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.app = FastAPI()
+        self.app.post("/v1/chat/completions")(self.chat_completions)
+
+    async def chat_completions(self, request: Request):
+        body = await request.json()
+        self.requests.append(body)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if self.failures:
+            status_code = self.failures.pop(0)
+            headers = {"retry-after": "0"} if status_code == 429 else {}
+            return JSONResponse({"error": {"message": "stubbed failure", "type": "stub", "code": None}},
+                                status_code=status_code, headers=headers)
+        content = self.response if isinstance(self.response, str) else json.dumps(self.response)
+        return {
+            "id": f"chatcmpl-stub-{len(self.requests)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150},
+        }
+
+    def async_client(self):
+        import httpx
+        from openai import AsyncOpenAI
+        http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url="http://openai-stub")
+        return AsyncOpenAI(api_key="test", base_url="http://openai-stub/v1", http_client=http_client, max_retries=0)
@@ -0,0 +1,20 @@
+import pytest
+from bm25 import BM25SparseEmbeddings, token_index, tokenize
+
+def test_skill_names_keep_their_punctuation():
+    assert tokenize("Vue.js, C++ and C# developer. Node.js/TypeScript!") == \
+        ["vue.js", "c++", "c#", "developer", "node.js", "typescript"]
+
+def test_documents_get_saturated_term_frequencies():
+    embeddings = BM25SparseEmbeddings(avg_doc_length=4)
+    vector = embeddings.embed_document("python python python django")
+    weights = dict(zip(vector.indices, vector.values))
+    assert vector.indices == sorted(vector.indices)
+    assert weights[token_index("django")] == pytest.approx(1.0)
+    # Three times as often is worth more, but far less than three times as much
+    assert 1.0 < weights[token_index("python")] < 2.0
+
+def test_queries_weigh_each_term_once():
+    vector = BM25SparseEmbeddings().embed_query("the Linux kernel, linux")
+    assert sorted(vector.indices) == sorted([token_index("linux"), token_index("kernel")])
+    assert vector.values == [1.0, 1.0]
@@ -0,0 +1,81 @@
+import glob
+import threading
+import time
+import pytest
+import converter
+from config import settings
+from converter import (PdfExtractionError, extract_many_in_pool, extract_pages_from_pdf_bytes, extract_pages_in_pool,
+                       iter_pdf_pages, shutdown_pool)
+
+def read_resume(name="ProfileAndrewNg.pdf"):
+    with open(f"test/resumes/{name}", "rb") as f:
+        return f.read()
+
+def test_generator_yields_pages_and_stops_at_max_pages():
+    content = read_resume()
+    all_pages = extract_pages_from_pdf_bytes(content)
+    assert len(all_pages) > 1
+    assert list(iter_pdf_pages(content, max_pages=1)) == all_pages[:1]
+
+def test_extraction_stops_once_enough_text_is_collected():
+    content = read_resume()
+    pages = extract_pages_from_pdf_bytes(content, max_chars=1)
+    assert len(pages) == 1
+
+def test_oversized_pdf_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "PDF_MAX_BYTES", 10)
+    with pytest.raises(PdfExtractionError):
+        extract_pages_from_pdf_bytes(read_resume())
+
+def test_malformed_pdf_raises_extraction_error():
+    with pytest.raises(PdfExtractionError):
+        extract_pages_from_pdf_bytes(b"%PDF-1.4 this is not really a pdf")
+
+def test_any_pypdf_failure_raises_extraction_error(monkeypatch):
+    class BrokenReader:
+        def __init__(self, stream):
+            raise ValueError("invalid literal for int() with base 10: b'obj'")
+    monkeypatch.setattr(converter, "PdfReader", BrokenReader)
+    with pytest.raises(PdfExtractionError):
+        extract_pages_from_pdf_bytes(read_resume())
+
+def test_pool_extraction_matches_serial_extraction():
+    try:
+        for filename in sorted(glob.glob("test/resumes/*.pdf")):
+            with open(filename, "rb") as f:
+                content = f.read()
+            assert extract_pages_in_pool(content) == extract_pages_from_pdf_bytes(content)
+    finally:
+        shutdown_pool()
+
+def test_many_documents_are_extracted_side_by_side():
+    documents = [read_resume("ProfileAndrewNg.pdf"), b"%PDF-1.4 this is not really a pdf", read_resume("ProfileEvanYou.pdf")]
+    try:
+        results = extract_many_in_pool(documents)
+    finally:
+        shutdown_pool()
+    assert results[0] == extract_pages_from_pdf_bytes(documents[0])
+    assert isinstance(results[1], PdfExtractionError)
+    assert results[2] == extract_pages_from_pdf_bytes(documents[2])
+
+def test_a_timeout_does_not_fail_other_extractions_in_flight():
+    content = read_resume()
+    results = {}
+    def extract():
+        results["other"] = extract_pages_in_pool(content, timeout=60)
+    try:
+        thread = threading.Thread(target=extract)
+        thread.start()
+        while not converter._pool_users:
+            time.sleep(0.001)
+        stuck_pool = converter.get_pool()
+        # The pool's workers are still starting, so this one times out
+        with pytest.raises(PdfExtractionError):
+            extract_pages_in_pool(content, timeout=0.001)
+        assert converter.get_pool() is not stuck_pool
+        thread.join()
+        assert results["other"] == extract_pages_from_pdf_bytes(content)
+        # Terminated once the extraction still waiting on it was done
+        assert stuck_pool not in converter._pool_users
+    finally:
+        shutdown_pool()
@@ -0,0 +1,33 @@
+import db
+from config import settings
+from sqlalchemy import text
+
+def use_container_database(monkeypatch, postgres_container):
+    monkeypatch.setattr(settings, "DATABASE_URL", postgres_container.get_connection_url())
+    db.dispose_engine()
+
+def test_engine_is_created_once_per_process(monkeypatch, postgres_container):
+    use_container_database(monkeypatch, postgres_container)
+    try:
+        assert db.get_pool_stats()["sync"] == {"initialized": False}
+        assert db.get_engine() is db.get_engine()
+        assert db.get_session_factory() is db.get_session_factory()
+    finally:
+        db.dispose_engine()
+
+def test_pool_stats_count_checkouts_and_reuse_connections(monkeypatch, postgres_container):
+    use_container_database(monkeypatch, postgres_container)
+    try:
+        for _ in range(3):
+            session_gen = db.get_db()
+            session = next(session_gen)
+            session.execute(text("SELECT 1"))
+            session_gen.close()
+        stats = db.get_pool_stats()["sync"]
+        assert stats["checkouts"] == 3
+        assert stats["checkins"] == 3
+        assert stats["connects"] == 1
+        assert stats["checked_out"] == 0
+        assert stats["overflow"] == 0
+    finally:
+        db.dispose_engine()
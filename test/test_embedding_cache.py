@@ -0,0 +1,56 @@
+import pytest
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5, -0.25] for text in texts]
+
+def test_only_unseen_texts_are_embedded(tmp_path):
+    fake = FakeEmbeddings()
+    embeddings = CachedEmbeddings(fake, EmbeddingCache(str(tmp_path / "cache.sqlite3")), "text-embedding-3-large", 3)
+    first = embeddings.embed_documents(["resume a", "resume bb", "resume a"])
+    second = embeddings.embed_documents(["resume bb", "resume ccc"])
+    assert fake.calls == [["resume a", "resume bb"], ["resume ccc"]]
+    assert first == [[8.0, 0.5, -0.25], [9.0, 0.5, -0.25], [8.0, 0.5, -0.25]]
+    assert second[0] == first[1]
+    assert embeddings.embed_query("resume a") == first[0]
+    assert len(fake.calls) == 2
+
+def test_vectors_are_persisted_as_compact_blobs(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = EmbeddingCache(path, dtype="float16")
+    CachedEmbeddings(FakeEmbeddings(), cache, "m", 3).embed_documents(["resume"])
+    blob, = cache.connection.execute("SELECT vector FROM embedding_cache").fetchone()
+    assert len(blob) == 3 * 2
+    cache.close()
+
+    fake = FakeEmbeddings()
+    reopened = EmbeddingCache(path)
+    assert CachedEmbeddings(fake, reopened, "m", 3).embed_documents(["resume"]) == [[6.0, 0.5, -0.25]]
+    assert fake.calls == []
+    assert reopened.get_stats()["disk_hits"] == 1
+
+def test_key_includes_model_and_dimensions(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+    fake = FakeEmbeddings()
+    CachedEmbeddings(fake, cache, "m", 3).embed_documents(["resume"])
+    CachedEmbeddings(fake, cache, "m", 256).embed_documents(["resume"])
+    CachedEmbeddings(fake, cache, "other", 3).embed_documents(["resume"])
+    assert len(fake.calls) == 3
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_memory_entries=2)
+    embeddings = CachedEmbeddings(FakeEmbeddings(), cache, "m", 3)
+    embeddings.embed_documents(["a", "b"])
+    embeddings.embed_documents(["a"])
+    embeddings.embed_documents(["c"])
+    assert len(cache.memory) == 2
+    embeddings.embed_documents(["a", "b"])
+    stats = cache.get_stats()
+    assert stats["memory_hits"] == 2
+    assert stats["disk_hits"] == 1
+    assert stats["hit_rate"] == pytest.approx(3 / 6)
@@ -0,0 +1,66 @@
+import asyncio
+import time
+import openai
+import pytest
+import ai
+from evaluation_engine import EvaluationEngine, RateLimiter
+from openai_stub import OpenAIStub
+
+@pytest.fixture(autouse=True)
+def no_llm_cache(monkeypatch):
+    monkeypatch.setattr(ai.settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(ai, "_llm_cache", None)
+
+def test_evaluations_run_concurrently_up_to_the_limit():
+    stub = OpenAIStub(latency=0.05)
+    engine = EvaluationEngine(client=stub.async_client(), max_concurrency=3)
+    items = [(f"resume {i}", "job") for i in range(10)]
+    results = asyncio.run(engine.evaluate_many(items))
+    assert results == [{"overall_score": 75}] * 10
+    assert stub.max_in_flight == 3
+    assert engine.get_stats()["completed"] == 10
+    assert engine.get_stats()["queue_depth"] == 0
+
+def test_rate_limited_and_server_errors_are_retried():
+    stub = OpenAIStub(failures=[429, 503])
+    engine = EvaluationEngine(client=stub.async_client(), backoff_base_seconds=0.01)
+    result = asyncio.run(engine.evaluate("resume", "job"))
+    assert result == {"overall_score": 75}
+    assert len(stub.requests) == 3
+    assert engine.get_stats()["retries"] == 2
+    assert engine.get_stats()["rate_limited"] == 1
+
+def test_client_errors_are_not_retried():
+    stub = OpenAIStub(failures=[400])
+    engine = EvaluationEngine(client=stub.async_client(), backoff_base_seconds=0.01)
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(engine.evaluate("resume", "job"))
+    assert len(stub.requests) == 1
+    assert engine.get_stats()["failed"] == 1
+
+def test_gives_up_after_max_retries():
+    stub = OpenAIStub(failures=[429] * 5)
+    engine = EvaluationEngine(client=stub.async_client(), max_retries=2, backoff_base_seconds=0.01)
+    results = asyncio.run(engine.evaluate_many([("resume", "job")]))
+    assert isinstance(results[0], openai.RateLimitError)
+    assert len(stub.requests) == 3
+
+def test_rate_limiter_waits_for_the_request_budget():
+    async def acquire_all():
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=1_000_000)
+        started = time.monotonic()
+        for _ in range(602):
+            await limiter.acquire(1)
+        return time.monotonic() - started
+    # the first 600 are covered by the full bucket, the next two need ~0.1s each
+    assert 0.15 <= asyncio.run(acquire_all()) < 1
+
+def test_rate_limiter_waits_for_the_token_budget():
+    async def acquire_all():
+        limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=60_000)
+        started = time.monotonic()
+        await limiter.acquire(60_000)
+        await limiter.acquire(600)
+        return time.monotonic() - started
+    # the bucket refills at 1000 tokens/s
+    assert 0.5 <= asyncio.run(acquire_all()) < 1.5
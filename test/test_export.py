@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+from models import JobApplication, JobApplicationAIEvaluation, JobBoard, JobPost
+
+def create_applications(db_session):
+    job_board = JobBoard(slug="acme", logo_url="http://example.com")
+    db_session.add(job_board)
+    db_session.commit()
+    job_post = JobPost(title="AI Engineer", description="Need an AI Engineer", job_board_id=job_board.id)
+    db_session.add(job_post)
+    db_session.commit()
+    for i in range(3):
+        application = JobApplication(job_post_id=job_post.id, first_name=f"First{i}", last_name="Last",
+                                     email=f"user{i}@example.com", resume_url=f"resume{i}.pdf")
+        db_session.add(application)
+        db_session.flush()
+        if i < 2:
+            db_session.add(JobApplicationAIEvaluation(job_application_id=application.id, overall_score=50 + i,
+                                                      evaluation={"overall_score": 50 + i}))
+    db_session.commit()
+    return job_post
+
+def test_export_requires_admin(db_session, client):
+    job_post = create_applications(db_session)
+    response = client.get(f"/api/job-posts/{job_post.id}/applications/export")
+    assert response.status_code == 401
+
+def test_export_streams_ndjson(db_session, client, login_as_admin):
+    job_post = create_applications(db_session)
+    login_as_admin()
+    response = client.get(f"/api/job-posts/{job_post.id}/applications/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["first_name"] for row in rows] == ["First0", "First1", "First2"]
+    assert [row["overall_score"] for row in rows] == [50, 51, None]
+    assert rows[1]["evaluation"] == {"overall_score": 51}
+
+def test_export_streams_csv(db_session, client, login_as_admin):
+    job_post = create_applications(db_session)
+    login_as_admin()
+    response = client.get(f"/api/job-posts/{job_post.id}/applications/export", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["email"] for row in rows] == ["user0@example.com", "user1@example.com", "user2@example.com"]
+    assert json.loads(rows[0]["evaluation"]) == {"overall_score": 50}
+    assert rows[2]["overall_score"] == ""
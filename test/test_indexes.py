@@ -0,0 +1,71 @@
+from sqlalchemy import text
+from models import JobApplication, JobApplicationAIEvaluation, JobBoard, JobPost
+
+def seed(db_session):
+    job_board = JobBoard(slug="acme", logo_url="http://example.com")
+    db_session.add(job_board)
+    db_session.flush()
+    job_post = JobPost(title="AI Engineer", description="Need an AI Engineer", job_board_id=job_board.id)
+    db_session.add(job_post)
+    db_session.flush()
+    for i in range(20):
+        application = JobApplication(job_post_id=job_post.id, first_name="Test", last_name="User",
+                                     email=f"user{i}@example.com", resume_url=f"resume{i}.pdf")
+        db_session.add(application)
+        db_session.flush()
+        db_session.add(JobApplicationAIEvaluation(job_application_id=application.id, overall_score=i * 5,
+                                                  evaluation={"overall_score": i * 5, "strengths": ["python"]}))
+    db_session.commit()
+    return job_board, job_post
+
+def explain(db_session, sql, params):
+    # The tables are tiny, so make sequential scans (and the joins that rely on
+    # them) prohibitively expensive; a plan without the index then means the
+    # index is unusable for this query, not merely unattractive.
+    db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    db_session.execute(text("SET LOCAL enable_hashjoin = off"))
+    db_session.execute(text("SET LOCAL enable_mergejoin = off"))
+    plan = db_session.execute(text(f"EXPLAIN {sql}"), params).scalars().all()
+    db_session.rollback()
+    return "\n".join(plan)
+
+def test_job_post_listing_uses_job_board_index(db_session):
+    job_board, _ = seed(db_session)
+    plan = explain(db_session, "SELECT * FROM job_posts WHERE job_board_id = :id", {"id": job_board.id})
+    assert "ix_job_posts_job_board_id" in plan
+
+def test_slug_join_uses_job_board_index(db_session):
+    seed(db_session)
+    plan = explain(db_session,
+                   "SELECT job_posts.* FROM job_posts JOIN job_boards ON job_boards.id = job_posts.job_board_id "
+                   "WHERE job_boards.slug = :slug", {"slug": "acme"})
+    assert "job_boards_slug_key" in plan
+    assert "ix_job_posts_job_board_id" in plan
+
+def test_applications_for_post_use_job_post_index(db_session):
+    _, job_post = seed(db_session)
+    plan = explain(db_session, "SELECT * FROM job_applications WHERE job_post_id = :id", {"id": job_post.id})
+    assert "ix_job_applications_job_post_id" in plan
+
+def test_per_post_ranking_uses_evaluation_indexes(db_session):
+    _, job_post = seed(db_session)
+    plan = explain(db_session,
+                   "SELECT e.* FROM job_application_ai_evaluations e "
+                   "JOIN job_applications a ON a.id = e.job_application_id "
+                   "WHERE a.job_post_id = :id ORDER BY e.overall_score DESC", {"id": job_post.id})
+    assert "ix_job_applications_job_post_id" in plan
+    assert "ix_job_application_ai_evaluations_job_application_id" in plan
+
+def test_top_scores_use_overall_score_index(db_session):
+    seed(db_session)
+    plan = explain(db_session,
+                   "SELECT * FROM job_application_ai_evaluations WHERE overall_score >= :score "
+                   "ORDER BY overall_score DESC LIMIT 10", {"score": 50})
+    assert "ix_job_application_ai_evaluations_overall_score" in plan
+
+def test_evaluation_containment_uses_gin_index(db_session):
+    seed(db_session)
+    plan = explain(db_session,
+                   "SELECT * FROM job_application_ai_evaluations WHERE evaluation @> CAST(:doc AS jsonb)",
+                   {"doc": '{"strengths": ["python"]}'})
+    assert "ix_job_application_ai_evaluations_evaluation" in plan
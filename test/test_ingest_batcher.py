@@ -0,0 +1,63 @@
+import threading
+import pytest
+from ingest_batcher import IngestBatcher
+
+class FakeVectorStore:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def add_texts(self, texts, metadatas=None, ids=None, batch_size=64, **kwargs):
+        if self.fail:
+            raise RuntimeError("qdrant unavailable")
+        self.calls.append({"texts": texts, "ids": ids, "batch_size": batch_size, **kwargs})
+        return ids
+
+def test_concurrent_submissions_share_one_write():
+    vector_store = FakeVectorStore()
+    batcher = IngestBatcher(vector_store, max_batch_size=10, max_wait_seconds=0.5)
+    futures = []
+    threads = [threading.Thread(target=lambda i=i: futures.append(batcher.submit(f"resume {i}", {}, i))) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for future in futures:
+        future.result(timeout=5)
+    batcher.close()
+
+    assert len(vector_store.calls) == 1
+    assert sorted(vector_store.calls[0]["ids"]) == [0, 1, 2, 3, 4]
+    assert vector_store.calls[0]["batch_size"] == 5
+    assert vector_store.calls[0]["wait"] is False
+    stats = batcher.get_stats()
+    assert stats["batches"] == 1
+    assert stats["batch_size"]["count"] == 1
+    assert stats["latency_seconds"]["count"] == 5
+
+def test_batches_are_split_at_max_batch_size():
+    vector_store = FakeVectorStore()
+    batcher = IngestBatcher(vector_store, max_batch_size=2, max_wait_seconds=0.5)
+    futures = [batcher.submit(f"resume {i}", {}, i) for i in range(5)]
+    batcher.close()
+    assert all(future.done() for future in futures)
+    assert [len(call["ids"]) for call in vector_store.calls] == [2, 2, 1]
+
+def test_close_flushes_pending_documents():
+    vector_store = FakeVectorStore()
+    batcher = IngestBatcher(vector_store, max_batch_size=100, max_wait_seconds=60)
+    future = batcher.submit("resume", {}, 1)
+    batcher.close()
+    assert future.result(timeout=0) is None
+    assert vector_store.calls[0]["ids"] == [1]
+    with pytest.raises(RuntimeError):
+        batcher.submit("resume", {}, 2)
+
+def test_failed_write_fails_every_document_in_the_batch():
+    batcher = IngestBatcher(FakeVectorStore(fail=True), max_batch_size=2, max_wait_seconds=0.5)
+    futures = [batcher.submit(f"resume {i}", {}, i) for i in range(2)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+    batcher.close()
+    assert batcher.get_stats()["failed_batches"] == 1
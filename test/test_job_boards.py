@@ -1,5 +1,6 @@
 import file_storage
 from config import settings
+from models import JobBoard, JobPost
 
 def test_non_admin_should_not_able_to_create_job_baord(client):
   response = client.post("/api/job-boards")
@@ -12,7 +13,7 @@ def test_admin_should_be_able_to_create_job_board(client, monkeypatch):
     login_response = client.post("/api/admin-login", data=login_data)
     assert login_response.status_code == 200
 
-    def mock_upload_file(bucket_name, path, contents, content_type):
+    async def mock_upload_file(bucket_name, path, contents, content_type):
         return "test/logo.png"
     monkeypatch.setattr(file_storage, "upload_file", mock_upload_file)
 
@@ -25,3 +26,30 @@ def test_admin_should_be_able_to_create_job_board(client, monkeypatch):
     assert  new_job_board['slug'] == "acme"
     assert  new_job_board['logo_url'] == "test/logo.png"
 
+def test_oversized_logo_is_refused(client, monkeypatch, login_as_admin):
+    login_as_admin()
+    monkeypatch.setattr(settings, "UPLOAD_MAX_LOGO_BYTES", 1024)
+    async def mock_upload_file(bucket_name, path, contents, content_type):
+        return path
+    monkeypatch.setattr(file_storage, "upload_file", mock_upload_file)
+    response = client.post("/api/job-boards", files={"logo": ("logo.png", b"x" * 2048)}, data={"slug": "acme"})
+    assert response.status_code == 413
+
+def test_oversized_logo_request_is_refused(client, monkeypatch, login_as_admin, post_chunked):
+    login_as_admin()
+    monkeypatch.setattr(settings, "UPLOAD_MAX_REQUEST_BYTES", 1024)
+    files = {"logo": ("logo.png", b"x" * 2048)}
+    response = client.post("/api/job-boards", files=files, data={"slug": "acme"})
+    assert response.status_code == 413
+    assert post_chunked("/api/job-boards", {"slug": "acme"}, files).status_code == 413
+
+def test_job_boards_are_found_by_id_and_by_slug(db_session, client):
+    job_board = JobBoard(slug="acme", logo_url="http://example.com")
+    db_session.add(job_board)
+    db_session.commit()
+    db_session.add(JobPost(title="AI Engineer", description="Need an AI Engineer", job_board_id=job_board.id))
+    db_session.commit()
+    assert client.get(f"/api/job-boards/{job_board.id}").json()["slug"] == "acme"
+    response = client.get("/api/job-boards/acme")
+    assert response.status_code == 200
+    assert [post["title"] for post in response.json()] == ["AI Engineer"]
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+import job_queue
+import tasks
+import worker
+from config import settings
+from models import Job
+
+def test_enqueued_job_is_claimed_and_completed(db_session, session_factory, monkeypatch):
+    processed = []
+    monkeypatch.setitem(tasks.HANDLERS, "send_email", lambda db, payload: processed.append(payload))
+    job_queue.enqueue(db_session, "send_email", {"to": "a@example.com"})
+    db_session.commit()
+
+    worker.drain(session_factory)
+
+    job = db_session.query(Job).one()
+    assert processed == [{"to": "a@example.com"}]
+    assert job.status == job_queue.DONE
+    assert job.attempts == 1
+
+def test_failed_job_is_retried_with_backoff_then_dead_lettered(db_session, session_factory, monkeypatch):
+    def failing_handler(db, payload):
+        raise RuntimeError("smtp down")
+    monkeypatch.setitem(tasks.HANDLERS, "send_email", failing_handler)
+    job_queue.enqueue(db_session, "send_email", {}, max_attempts=2)
+    db_session.commit()
+
+    worker.drain(session_factory)
+    job = db_session.query(Job).one()
+    assert job.status == job_queue.QUEUED
+    assert job.attempts == 1
+    assert "smtp down" in job.last_error
+    assert job.run_at > datetime.now(timezone.utc)
+
+    # make the retry due now instead of waiting out the backoff
+    job.run_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+    worker.drain(session_factory)
+    db_session.refresh(job)
+    assert job.status == job_queue.DEAD
+    assert job.attempts == 2
+
+def test_concurrency_limit_per_job_type(db_session, session_factory, monkeypatch):
+    monkeypatch.setitem(settings.JOB_CONCURRENCY_LIMITS, "send_email", 1)
+    job_queue.enqueue(db_session, "send_email", {})
+    job_queue.enqueue(db_session, "send_email", {})
+    db_session.commit()
+
+    with session_factory() as first, session_factory() as second:
+        assert job_queue.claim(first, "send_email") is not None
+        assert job_queue.claim(second, "send_email") is None
+
+def test_expired_lease_is_reclaimed(db_session, session_factory):
+    job_queue.enqueue(db_session, "send_email", {})
+    db_session.commit()
+    with session_factory() as db:
+        job = job_queue.claim(db, "send_email")
+        job_id = job.id
+        job.locked_until = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.commit()
+
+    with session_factory() as db:
+        reclaimed = job_queue.claim(db, "send_email")
+        assert reclaimed.id == job_id
+        assert reclaimed.attempts == 2
+
+def test_batch_claim_is_capped_by_the_concurrency_limit(db_session, session_factory, monkeypatch):
+    monkeypatch.setitem(settings.JOB_CONCURRENCY_LIMITS, "ingest_resume", 3)
+    for i in range(5):
+        job_queue.enqueue(db_session, "ingest_resume", {"i": i})
+    db_session.commit()
+
+    with session_factory() as db:
+        jobs = job_queue.claim_batch(db, "ingest_resume", 4)
+        assert [job.payload["i"] for job in jobs] == [0, 1, 2]
+        assert job_queue.claim_batch(db, "ingest_resume", 4) == []
+
+def test_batched_jobs_run_side_by_side(db_session, session_factory, monkeypatch):
+    processed = []
+    monkeypatch.setitem(tasks.HANDLERS, "ingest_resume", lambda db, payload: processed.append(payload["i"]))
+    for i in range(3):
+        job_queue.enqueue(db_session, "ingest_resume", {"i": i})
+    db_session.commit()
+
+    assert worker.run_once(session_factory, ["ingest_resume"])
+    assert sorted(processed) == [0, 1, 2]
+    assert {job.status for job in db_session.query(Job)} == {job_queue.DONE}
+
+def test_worker_refuses_several_processes_on_the_embedded_vector_store(monkeypatch):
+    monkeypatch.setattr(settings, "QDRANT_MODE", "local")
+    monkeypatch.setattr("sys.argv", ["worker.py", "--processes", "2"])
+    with pytest.raises(SystemExit):
+        worker.main()
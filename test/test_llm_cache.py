@@ -0,0 +1,50 @@
+import time
+from llm_cache import LLMCache, make_key
+
+def test_key_depends_on_every_part():
+    base = make_key("evaluate_resume", "gpt-4o-mini", 0, "1", "resume", "job")
+    assert base == make_key("evaluate_resume", "gpt-4o-mini", 0, "1", "resume", "job")
+    assert base != make_key("evaluate_resume", "gpt-4o", 0, "1", "resume", "job")
+    assert base != make_key("evaluate_resume", "gpt-4o-mini", 0.7, "1", "resume", "job")
+    assert base != make_key("evaluate_resume", "gpt-4o-mini", 0, "2", "resume", "job")
+    assert base != make_key("evaluate_resume", "gpt-4o-mini", 0, "1", "resumej", "ob")
+
+def test_hits_are_served_from_memory_then_disk(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = LLMCache(path)
+    assert cache.get("k") is None
+    cache.set("k", "evaluate_resume", "1", {"overall_score": 80}, tokens=500)
+    assert cache.get("k") == {"overall_score": 80}
+    cache.close()
+
+    reopened = LLMCache(path)
+    assert reopened.get("k") == {"overall_score": 80}
+    assert reopened.get("k") == {"overall_score": 80}
+    stats = reopened.get_stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["tokens_saved"] == 1000
+    assert cache.get_stats()["misses"] == 1
+
+def test_entries_expire(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=0.01)
+    cache.set("k", "evaluate_resume", "1", {"overall_score": 80})
+    time.sleep(0.02)
+    assert cache.get("k") is None
+
+def test_memory_tier_is_bounded(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"), max_memory_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, "evaluate_resume", "1", key)
+    assert list(cache.memory) == ["b", "c"]
+    assert cache.get("a") == "a"
+
+def test_invalidate_drops_other_prompt_versions(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("old", "evaluate_resume", "1", "old")
+    cache.set("new", "evaluate_resume", "2", "new")
+    cache.set("review", "review_application", "1", "review")
+    cache.invalidate("evaluate_resume", keep_prompt_version="2")
+    assert cache.get("old") is None
+    assert cache.get("new") == "new"
+    assert cache.get("review") == "review"
@@ -0,0 +1,43 @@
+import asyncio
+import json
+import numpy as np
+import ai
+from config import settings
+from local_models import AsyncCannedOpenAI, CannedOpenAI, HashingEmbeddings
+
+def test_hashing_embeddings_are_deterministic_and_keyword_aware():
+    embeddings = HashingEmbeddings(256)
+    python, python_again, kernel = embeddings.embed_documents(
+        ["Python and FastAPI developer", "FastAPI developer writing Python", "Linux kernel maintainer"])
+    assert python == HashingEmbeddings(256).embed_query("Python and FastAPI developer")
+    assert abs(np.linalg.norm(python) - 1) < 1e-6
+    assert np.dot(python, python_again) > np.dot(python, kernel)
+
+def test_canned_clients_answer_like_openai():
+    messages = [{"role": "system", "content": "system"}, {"role": "user", "content": "resume and job description"}]
+    response = CannedOpenAI().chat.completions.create(model="gpt-4o-mini", messages=messages, temperature=0)
+    evaluation = json.loads(response.choices[0].message.content)
+    assert 0 <= evaluation["overall_score"] <= 100
+    assert response.usage.total_tokens > 0
+    async_response = asyncio.run(AsyncCannedOpenAI().chat.completions.create(model="gpt-4o-mini", messages=messages))
+    assert async_response.choices[0].message.content == response.choices[0].message.content
+
+def test_vector_store_runs_offline_with_hashing_embeddings(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_BACKEND", "hashing")
+    monkeypatch.setattr(ai, "_embeddings", None)
+    generator = ai.inmemory_vector_store()
+    vector_store = next(generator)
+    try:
+        ai.ingest_resume("Simon built Datasette with Django", "simon.pdf", 1, vector_store)
+        ai.ingest_resume("Linus maintains the Linux kernel", "linus.pdf", 2, vector_store)
+        assert ai.get_recommendation("Linux kernel", vector_store).metadata["url"] == "linus.pdf"
+    finally:
+        generator.close()
+
+def test_review_runs_offline_with_canned_chat(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_BACKEND", "canned")
+    monkeypatch.setattr(ai, "_review_chains", None)
+    monkeypatch.setattr(ai, "_llm_cache", None)
+    reviewed = asyncio.run(ai.areview_application("We need a rockstar developer"))
+    assert reviewed.revised_description == ai.CANNED_FINAL_DESCRIPTION
+    assert ai.get_llm_cache() is None
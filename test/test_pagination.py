@@ -0,0 +1,61 @@
+from models import JobApplication, JobApplicationAIEvaluation, JobBoard, JobPost
+
+def create_job_board_with_posts(db_session, count):
+    job_board = JobBoard(slug="acme", logo_url="http://example.com")
+    db_session.add(job_board)
+    db_session.commit()
+    for i in range(count):
+        db_session.add(JobPost(title=f"Job {i}", description="Description",
+                               job_board_id=job_board.id, is_open=i % 2 == 0))
+    db_session.commit()
+    return job_board
+
+def test_job_posts_are_paginated_with_a_cursor(db_session, client):
+    job_board = create_job_board_with_posts(db_session, 5)
+    titles = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        response = client.get(f"/api/job-boards/{job_board.id}/job-posts", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        titles += [job_post["title"] for job_post in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == 3
+    assert titles == [f"Job {i}" for i in range(5)]
+
+def test_job_posts_can_be_filtered_by_status(db_session, client):
+    job_board = create_job_board_with_posts(db_session, 5)
+    response = client.get(f"/api/job-boards/{job_board.id}/job-posts", params={"is_open": False})
+    assert [job_post["title"] for job_post in response.json()["items"]] == ["Job 1", "Job 3"]
+
+def test_invalid_cursor_is_rejected(db_session, client):
+    job_board = create_job_board_with_posts(db_session, 1)
+    response = client.get(f"/api/job-boards/{job_board.id}/job-posts", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def test_evaluations_can_be_filtered_by_post_and_score(db_session, client):
+    create_job_board_with_posts(db_session, 2)
+    job_posts = db_session.query(JobPost).order_by(JobPost.id).all()
+    for job_post in job_posts:
+        for score in (40, 80):
+            application = JobApplication(job_post_id=job_post.id, first_name="Test", last_name="User",
+                                         email="user@example.com", resume_url="resume.pdf")
+            db_session.add(application)
+            db_session.flush()
+            db_session.add(JobApplicationAIEvaluation(job_application_id=application.id, overall_score=score,
+                                                      evaluation={"overall_score": score}))
+    db_session.commit()
+
+    response = client.get("/api/job-application-ai-evaluations",
+                          params={"job_post_id": job_posts[0].id, "min_score": 50})
+    page = response.json()
+    assert [evaluation["overall_score"] for evaluation in page["items"]] == [80]
+    assert page["next_cursor"] is None
+
+    response = client.get("/api/job-application-ai-evaluations", params={"is_open": False})
+    assert len(response.json()["items"]) == 2
@@ -0,0 +1,46 @@
+from converter import extract_pages_from_pdf_bytes
+import preprocess
+from preprocess import clean_pages, count_tokens, fit_to_budget, normalize_whitespace
+
+def test_whitespace_is_normalized():
+    text = "Jane  Doe  \r\n\n\n\nSoftware   engi-\nneer\t\n"
+    assert normalize_whitespace(text) == "Jane Doe\n\nSoftware engineer"
+
+def test_repeated_headers_footers_and_page_numbers_are_dropped():
+    pages = ["Jane Doe - Resume\nSummary\nBuilds things\nPage 1 of 2",
+             "Jane Doe - Resume\nExperience\nAcme, 2019-2024\nPage 2 of 2"]
+    assert clean_pages(pages) == "Summary\nBuilds things\n\nExperience\nAcme, 2019-2024"
+
+def test_text_under_budget_is_unchanged():
+    text = "Skills\nPython, SQL\n\nEducation\nBSc"
+    assert fit_to_budget(text, 1000) == text
+
+def test_long_sections_are_shortened_and_short_ones_kept():
+    experience = "Experience\n" + "\n".join(f"Built service number {i} for the payments team" for i in range(200))
+    text = f"Jane Doe\njane@example.com\n\n{experience}\n\nEducation\nBSc Computer Science"
+    fitted = fit_to_budget(text, 300)
+    assert count_tokens(fitted) <= 300
+    assert fitted.startswith("Jane Doe\njane@example.com\n\nExperience\nBuilt service number 0")
+    assert fitted.endswith("[...]\n\nEducation\nBSc Computer Science")
+
+def test_single_huge_line_is_cut_to_budget():
+    fitted = fit_to_budget("word " * 5000, 100)
+    assert count_tokens(fitted) <= 100
+
+def test_real_resume_is_smaller_after_cleaning():
+    with open("test/resumes/ProfileAndrewNg.pdf", "rb") as f:
+        pages = extract_pages_from_pdf_bytes(f.read())
+    raw = "\n\n".join(pages)
+    assert count_tokens(clean_pages(pages)) <= count_tokens(raw)
+
+def test_tokens_are_estimated_when_the_encoding_cannot_be_loaded(monkeypatch):
+    def offline(name):
+        raise ConnectionError("openaipublic.blob.core.windows.net unreachable")
+    monkeypatch.setattr(preprocess.tiktoken, "get_encoding", offline)
+    preprocess.get_encoding.cache_clear()
+    try:
+        assert count_tokens("a" * 30) == 10
+        fitted = fit_to_budget("word " * 5000, 100)
+        assert fitted.endswith("[...]") and count_tokens(fitted) <= 100
+    finally:
+        preprocess.get_encoding.cache_clear()
@@ -0,0 +1,32 @@
+import math
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PointStruct
+from ai import RESUME_SPARSE_VECTOR, create_resume_collection
+from rebuild_collection import rebuild, shorten
+
+def test_shortened_vectors_are_unit_length():
+    vector = shorten([3.0, 4.0, 12.0], 2)
+    assert vector == pytest.approx([0.6, 0.8])
+
+def test_collection_is_rebuilt_with_the_new_layout():
+    client = QdrantClient(":memory:")
+    create_resume_collection(client, "resumes", 4, "none")
+    client.upsert("resumes", points=[PointStruct(id=i, vector=[1.0, float(i), 2.0, 3.0], payload={"page_content": f"resume {i}"})
+                                     for i in range(1, 6)])
+
+    assert rebuild(client, "resumes", "resumes_2_binary", 2, "binary", batch_size=2) == 5
+
+    records, _ = client.scroll("resumes_2_binary", limit=10, with_payload=True, with_vectors=True)
+    assert sorted(r.id for r in records) == [1, 2, 3, 4, 5]
+    for record in records:
+        assert len(record.vector[""]) == 2
+        assert math.hypot(*record.vector[""]) == pytest.approx(1.0)
+        assert len(record.vector[RESUME_SPARSE_VECTOR].indices) == 2
+        assert record.payload == {"page_content": f"resume {record.id}"}
+    assert client.count("resumes").count == 5
+
+    with pytest.raises(SystemExit):
+        rebuild(client, "resumes", "resumes_2_binary", 2, "binary")
+    with pytest.raises(SystemExit):
+        rebuild(client, "resumes", "resumes_8", 8, "none")
@@ -1,8 +1,14 @@
 import os
 import time
+import pytest
+import ai
 from ai import ingest_resume
-from main import ingest_resume_for_recommendataions
-from models import JobBoard, JobPost
+from config import settings
+from tasks import ingest_resume_for_recommendataions
+import tasks
+import worker
+import main
+from models import JobApplication, JobBoard, JobPost
 
 def test_should_embed_text_and_add_to_vector_db(vector_store):
     ingest_resume("Siddharta\nSiddharta is an AI trainer", "siddharta.pdf", 1, vector_store)
@@ -21,6 +27,7 @@ def test_background_task(vector_store):
     result = retriever.invoke("I am looking for an AI trainer")
     assert "Andrew" in result[0].page_content
 
+@pytest.mark.parametrize("vector_store", ["dense", "hybrid"], indirect=True)
 def test_retrieval_quality(vector_store):
     for id, filename in enumerate(os.listdir("test/resumes")):
         with open(f"test/resumes/{filename}", "rb") as f:
@@ -38,8 +45,12 @@ def test_retrieval_quality(vector_store):
     assert "Koudai" in result[0].page_content
     result = retriever.invoke("I am looking for a data journalist")
     assert "Simon" in result[0].page_content
+    result = retriever.invoke("Datasette")
+    assert "Simon" in result[0].page_content
+    result = retriever.invoke("Kotlin and Ktor")
+    assert "Koudai" in result[0].page_content
 
-def test_job_application_api(db_session, vector_store, client):
+def test_job_application_api(db_session, session_factory, vector_store, client, monkeypatch):
     job_board = JobBoard(slug="test", logo_url="http://example.com")
     db_session.add(job_board)
     db_session.commit()
@@ -60,11 +71,77 @@ def test_job_application_api(db_session, vector_store, client):
     with open(filename, "rb") as f:
         response = client.post("/api/job-applications", data=post_data, files={"resume": ("ProfileAndrewNg.pdf", f, "application/pdf")})
     assert response.status_code == 200
+    monkeypatch.setattr(tasks, "worker_vector_store", lambda: vector_store)
+    worker.drain(session_factory, ["extract_resume", "ingest_resume"])
     retriever = vector_store.as_retriever(search_kwargs={"k": 1})
     result = retriever.invoke("I am looking for an expert in AI")
     assert "Andrew" in result[0].page_content
     assert result[0].metadata["_id"] == job_post.id
 
+def test_vector_store_is_opened_once_per_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "QDRANT_MODE", "local")
+    monkeypatch.setattr(settings, "QDRANT_PATH", str(tmp_path / "qdrant_store"))
+    try:
+        vector_store = ai.get_vector_store()
+        assert ai.get_vector_store() is vector_store
+        assert vector_store.client.collection_exists(settings.RESUME_COLLECTION)
+    finally:
+        ai.close_vector_store()
+    # the file lock is released on close, so the store can be opened again
+    assert ai.get_vector_store() is not vector_store
+    ai.close_vector_store()
+
+def test_recommendations_are_ranked_filtered_and_paginated(db_session, vector_store, client, login_as_admin):
+    job_board = JobBoard(slug="acme", logo_url="http://example.com")
+    db_session.add(job_board)
+    db_session.commit()
+    ai_post = JobPost(title="AI Engineer", description="Machine learning researcher and AI educator", job_board_id=job_board.id)
+    web_post = JobPost(title="Frontend Engineer", description="JavaScript framework author", job_board_id=job_board.id)
+    db_session.add_all([ai_post, web_post])
+    db_session.commit()
+    candidates = [("Andrew", ai_post, "Andrew teaches machine learning and deep learning", 90),
+                  ("Simon", ai_post, "Simon builds tools for exploring data with LLMs", 70),
+                  ("Koudai", ai_post, "Koudai writes about sake brewing", 20),
+                  ("Evan", web_post, "Evan created the Vue.js JavaScript framework", 95)]
+    for first_name, job_post, text, score in candidates:
+        application = JobApplication(job_post_id=job_post.id, first_name=first_name, last_name="Test",
+                                     email=f"{first_name.lower()}@example.com", resume_url=f"{first_name}.pdf")
+        db_session.add(application)
+        db_session.commit()
+        ingest_resume(text, application.resume_url, application.id, vector_store,
+                      {"job_post_id": job_post.id, "job_board_id": job_board.id, "overall_score": score})
+
+    main.app.dependency_overrides[main.get_resume_vector_store] = lambda: vector_store
+    url = f"/api/job-posts/{ai_post.id}/recommendations"
+    assert client.get(url).status_code == 401
+    login_as_admin()
+
+    first_page = client.get(url, params={"limit": 2}).json()
+    assert [item["first_name"] for item in first_page["items"]] == ["Andrew", "Simon"]
+    assert first_page["items"][0]["similarity"] >= first_page["items"][1]["similarity"]
+    assert first_page["items"][0]["overall_score"] == 90
+    second_page = client.get(url, params={"limit": 2, "cursor": first_page["next_cursor"]}).json()
+    assert [item["first_name"] for item in second_page["items"]] == ["Koudai"]
+    assert second_page["next_cursor"] is None
+
+    high_scores = client.get(url, params={"min_score": 80}).json()
+    assert [item["first_name"] for item in high_scores["items"]] == ["Andrew"]
+    board = client.get(url, params={"scope": "board"}).json()
+    assert {item["first_name"] for item in board["items"]} == {"Andrew", "Simon", "Koudai", "Evan"}
+
+def test_recommendations_do_not_open_the_embedded_store(db_session, client, login_as_admin):
+    job_board = JobBoard(slug="acme", logo_url="http://example.com")
+    db_session.add(job_board)
+    db_session.commit()
+    job_post = JobPost(title="AI Engineer", description="Need an AI Engineer", job_board_id=job_board.id)
+    db_session.add(job_post)
+    db_session.commit()
+    login_as_admin()
+    # The client runs the app with QDRANT_MODE=local, whose store belongs to the worker
+    response = client.get(f"/api/job-posts/{job_post.id}/recommendations")
+    assert response.status_code == 503
+    assert ai._vector_store is None
+
 """
 text = "hello world"
 url = "helloworld.pdf"
@@ -0,0 +1,63 @@
+import json
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from qdrant_client import QdrantClient
+import ai
+import reindex
+from ai import create_resume_collection
+from models import JobApplication, JobBoard, JobPost
+
+class FailingOnce(DeterministicFakeEmbedding):
+    calls: int = 0
+    fail_on_call: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("embeddings API is down")
+        return super().embed_documents(texts)
+
+def test_index_is_rebuilt_resumed_and_swapped(db_session, session_factory, tmp_path, monkeypatch):
+    job_board = JobBoard(slug="acme", logo_url="http://example.com")
+    db_session.add(job_board)
+    db_session.commit()
+    job_post = JobPost(title="AI Engineer", description="Need an AI Engineer", job_board_id=job_board.id)
+    db_session.add(job_post)
+    db_session.commit()
+    applications = [JobApplication(job_post_id=job_post.id, first_name=name, last_name="Test",
+                                   email=f"{name.lower()}@example.com", resume_url=url, resume_text=text)
+                    for name, url, text in [("Andrew", "andrew.pdf", "Andrew teaches machine learning"),
+                                            ("Linus", "test/resumes/ProfileLinusTorvalds.pdf", None),
+                                            ("Broken", "missing.pdf", None)]]
+    db_session.add_all(applications)
+    db_session.commit()
+
+    client = QdrantClient(":memory:")
+    create_resume_collection(client, "resumes", 8, "none")
+    checkpoint = tmp_path / "checkpoint.json"
+    embeddings = FailingOnce(size=8, fail_on_call=2)
+    monkeypatch.setattr(ai, "make_embeddings", lambda dimensions: embeddings)
+
+    with pytest.raises(RuntimeError):
+        reindex.reindex(session_factory, client, "resumes", str(checkpoint), target="resumes_v2",
+                        dimensions=8, batch_size=1)
+    state = json.loads(checkpoint.read_text())
+    assert state["last_job_application_id"] == applications[0].id
+    assert client.count("resumes_v2").count == 1
+
+    with pytest.raises(SystemExit):
+        reindex.reindex(session_factory, client, "resumes", str(checkpoint), target="resumes_v3")
+    with pytest.raises(SystemExit):
+        reindex.reindex(session_factory, client, "resumes", str(checkpoint), batch_size=2)
+    result = reindex.reindex(session_factory, client, "resumes", str(checkpoint), batch_size=2, drop_collection=True)
+
+    assert result["indexed"] == 2
+    assert result["failed"] == [applications[2].id]
+    assert not checkpoint.exists()
+    assert client.count("resumes").count == 2
+    assert [a.collection_name for a in client.get_aliases().aliases] == ["resumes_v2"]
+    db_session.expire_all()
+    linus = db_session.get(JobApplication, applications[1].id)
+    assert "Linus" in linus.resume_text
+    records = client.retrieve("resumes", ids=[linus.id], with_payload=True)
+    assert records[0].payload["metadata"]["job_board_id"] == job_board.id
@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+import ai
+from db import async_database_url
+from evaluation_engine import EvaluationEngine
+from models import JobApplication, JobApplicationAIEvaluation, JobBoard, JobPost, RescoreRun
+from openai_stub import OpenAIStub
+from rescore import DONE, RUNNING, new_rescore_run, rescore
+
+@pytest.fixture(autouse=True)
+def no_llm_cache(monkeypatch):
+    monkeypatch.setattr(ai.settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(ai, "_llm_cache", None)
+
+def create_job_post_with_applications(db_session, count):
+    job_board = JobBoard(slug="acme", logo_url="http://example.com")
+    db_session.add(job_board)
+    db_session.commit()
+    job_post = JobPost(title="AI Engineer", description="Need an AI Engineer", job_board_id=job_board.id)
+    db_session.add(job_post)
+    db_session.commit()
+    applications = []
+    for i in range(count):
+        application = JobApplication(job_post_id=job_post.id, first_name="Test", last_name="User",
+                                     email=f"user{i}@example.com", resume_url=f"resume{i}.pdf",
+                                     resume_text=f"Resume {i}" if i != 1 else None)
+        db_session.add(application)
+        applications.append(application)
+    db_session.commit()
+    return job_post, applications
+
+def run_rescore(postgres_container, rescore_run_id, stub, max_seconds=None):
+    async def main():
+        engine = create_async_engine(async_database_url(postgres_container.get_connection_url()), poolclass=NullPool)
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            return await rescore(session_factory, rescore_run_id,
+                                 engine=EvaluationEngine(client=stub.async_client()), batch_size=2,
+                                 max_seconds=max_seconds)
+        finally:
+            await engine.dispose()
+    return asyncio.run(main())
+
+def test_rescore_evaluates_every_application_with_stored_text(db_session, postgres_container):
+    job_post, applications = create_job_post_with_applications(db_session, 5)
+    run = new_rescore_run(db_session, job_post.id)
+    db_session.commit()
+
+    stub = OpenAIStub(response={"overall_score": 64})
+    finished = run_rescore(postgres_container, run.id, stub)
+
+    assert finished.status == DONE
+    assert finished.processed == 4
+    assert finished.skipped == 1
+    assert finished.last_job_application_id == applications[-1].id
+    assert len(stub.requests) == 4
+    evaluations = db_session.query(JobApplicationAIEvaluation).all()
+    assert sorted(e.job_application_id for e in evaluations) == sorted(a.id for a in applications if a.resume_text)
+    assert {e.overall_score for e in evaluations} == {64}
+
+def test_rescore_resumes_from_checkpoint(db_session, postgres_container):
+    job_post, applications = create_job_post_with_applications(db_session, 5)
+    run = new_rescore_run(db_session, job_post.id)
+    run.last_job_application_id = applications[2].id
+    db_session.commit()
+
+    stub = OpenAIStub()
+    finished = run_rescore(postgres_container, run.id, stub)
+
+    assert finished.processed == 2
+    assert len(stub.requests) == 2
+    # The run was updated through another session; reload it from the database
+    db_session.expire_all()
+    assert db_session.query(RescoreRun).one().status == DONE
+
+def test_rescore_stops_after_a_batch_once_out_of_time(db_session, postgres_container):
+    job_post, applications = create_job_post_with_applications(db_session, 5)
+    run = new_rescore_run(db_session, job_post.id)
+    db_session.commit()
+
+    paused = run_rescore(postgres_container, run.id, OpenAIStub(), max_seconds=0)
+    assert paused.status == RUNNING
+    assert paused.last_job_application_id == applications[1].id
+
+    finished = run_rescore(postgres_container, run.id, OpenAIStub())
+    assert finished.status == DONE
+    assert finished.processed == 4
+    assert db_session.query(JobApplicationAIEvaluation).count() == 4
+
+def test_rescore_endpoint_requires_admin(db_session, client):
+    job_post, _ = create_job_post_with_applications(db_session, 1)
+    response = client.post(f"/api/job-posts/{job_post.id}/rescore")
+    assert response.status_code == 401
+
+def test_rescore_run_status_requires_admin(db_session, client):
+    job_post, _ = create_job_post_with_applications(db_session, 1)
+    run = new_rescore_run(db_session, job_post.id)
+    db_session.commit()
+    response = client.get(f"/api/rescore-runs/{run.id}")
+    assert response.status_code == 401
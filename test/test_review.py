@@ -0,0 +1,36 @@
+import json
+import main
+from ai import ReviewedApplication
+
+async def fake_review(job_description):
+    yield "summary", "Too vague"
+    yield "token", "We are hiring "
+    yield "token", "an AI Engineer."
+    yield "done", ReviewedApplication(revised_description="We are hiring an AI Engineer.", overall_summary="Too vague")
+
+def parse_events(body):
+    events = []
+    for message in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_review_stream_sends_summary_tokens_and_result(client, monkeypatch):
+    monkeypatch.setattr(main, "astream_review_application", fake_review)
+    response = client.post("/api/review-job-description/stream", data={"description": "Need an AI Engineer"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert events[0] == ("summary", {"overall_summary": "Too vague"})
+    assert "".join(data["text"] for event, data in events if event == "token") == "We are hiring an AI Engineer."
+    assert events[-1] == ("done", {"revised_description": "We are hiring an AI Engineer.", "overall_summary": "Too vague"})
+
+async def failing_review(job_description):
+    yield "summary", "Too vague"
+    raise RuntimeError("upstream error")
+
+def test_review_stream_reports_errors(client, monkeypatch):
+    monkeypatch.setattr(main, "astream_review_application", failing_review)
+    response = client.post("/api/review-job-description/stream", data={"description": "Need an AI Engineer"})
+    events = parse_events(response.text)
+    assert [event for event, data in events] == ["summary", "error"]
@@ -0,0 +1,73 @@
+import job_queue
+import tasks
+import worker
+from config import settings
+from models import JobApplication, JobBoard, JobPost, JobPostShortlist
+
+def create_post(db_session, job_board, title, description):
+    job_post = JobPost(title=title, description=description, job_board_id=job_board.id)
+    db_session.add(job_post)
+    db_session.commit()
+    job_queue.enqueue(db_session, "index_job_post", {"job_post_id": job_post.id})
+    db_session.commit()
+    return job_post
+
+def apply(db_session, job_post, first_name, resume_text):
+    application = JobApplication(job_post_id=job_post.id, first_name=first_name, last_name="Test",
+                                 email=f"{first_name.lower()}@example.com", resume_url=f"{first_name}.pdf",
+                                 resume_text=resume_text)
+    db_session.add(application)
+    db_session.commit()
+    job_queue.enqueue(db_session, "ingest_resume", {"job_application_id": application.id})
+    db_session.commit()
+    return application
+
+def shortlisted(db_session, job_post):
+    db_session.expire_all()
+    rows = db_session.query(JobPostShortlist).filter(JobPostShortlist.job_post_id == job_post.id) \
+        .order_by(JobPostShortlist.similarity.desc()).all()
+    return [row.job_application.first_name for row in rows]
+
+def test_shortlists_are_kept_up_to_date(db_session, session_factory, vector_store, client, monkeypatch, login_as_admin):
+    monkeypatch.setattr(tasks, "worker_vector_store", lambda: vector_store)
+    monkeypatch.setattr(settings, "SHORTLIST_MIN_SIMILARITY", 0.0)
+    monkeypatch.setattr(settings, "SHORTLIST_SIZE", 2)
+    acme = JobBoard(slug="acme", logo_url="http://example.com")
+    other = JobBoard(slug="other", logo_url="http://example.com")
+    db_session.add_all([acme, other])
+    db_session.commit()
+    ai_post = create_post(db_session, acme, "AI Engineer", "Machine learning researcher and AI educator")
+    kernel_post = create_post(db_session, acme, "Kernel Engineer", "Linux kernel and operating systems developer")
+    other_post = create_post(db_session, other, "AI Engineer", "Machine learning researcher and AI educator")
+    worker.drain(session_factory, ["index_job_post"])
+    assert shortlisted(db_session, ai_post) == []
+
+    # New resumes are matched against the open posts of their own board
+    apply(db_session, ai_post, "Andrew", "Andrew teaches machine learning and deep learning")
+    apply(db_session, ai_post, "Linus", "Linus created the Linux kernel and git")
+    apply(db_session, kernel_post, "Koudai", "Koudai writes about sake brewing")
+    worker.drain(session_factory, ["ingest_resume", "shortlist_resume"])
+    ai_shortlist = shortlisted(db_session, ai_post)
+    assert len(ai_shortlist) == 2 and ai_shortlist[0] == "Andrew"
+    assert shortlisted(db_session, kernel_post)[0] == "Linus"
+    assert shortlisted(db_session, other_post) == []
+
+    url = f"/api/job-posts/{kernel_post.id}"
+    assert client.get(f"{url}/shortlist").status_code == 401
+    login_as_admin()
+    response = client.put(url, data={"title": "Sake Brewer", "description": "Sake brewing enthusiast"})
+    assert response.status_code == 200
+    worker.drain(session_factory, ["index_job_post"])
+
+    page = client.get(f"{url}/shortlist", params={"limit": 1}).json()
+    assert [item["first_name"] for item in page["items"]] == ["Koudai"]
+    next_page = client.get(f"{url}/shortlist", params={"limit": 1, "cursor": page["next_cursor"]}).json()
+    assert len(next_page["items"]) == 1
+    assert next_page["next_cursor"] is None
+
+    # Closed posts are not matched any more, and keep the shortlist they had
+    assert client.post(f"/api/job-posts/{ai_post.id}/close").status_code == 200
+    worker.drain(session_factory, ["index_job_post"])
+    apply(db_session, ai_post, "Simon", "Simon builds tools for exploring data with machine learning")
+    worker.drain(session_factory, ["ingest_resume", "shortlist_resume"])
+    assert shortlisted(db_session, ai_post) == ai_shortlist
@@ -0,0 +1,108 @@
+import file_storage
+import job_queue
+import tasks
+import worker
+from config import settings
+from models import Job, JobApplication, JobApplicationAIEvaluation, JobBoard, JobPost
+
+def create_application(db_session, resume_url="test/resumes/ProfileAndrewNg.pdf"):
+    job_board = JobBoard(slug="acme", logo_url="http://example.com")
+    db_session.add(job_board)
+    db_session.commit()
+    job_post = JobPost(title="AI Engineer", description="Need an AI Engineer", job_board_id=job_board.id)
+    db_session.add(job_post)
+    db_session.commit()
+    job_application = JobApplication(job_post_id=job_post.id, first_name="Andrew", last_name="Ng",
+                                     email="andrew@example.com", resume_url=resume_url)
+    db_session.add(job_application)
+    db_session.commit()
+    return job_application
+
+def test_resume_is_extracted_once_and_reused(db_session, session_factory, vector_store, monkeypatch):
+    job_application = create_application(db_session)
+    job_queue.enqueue(db_session, "extract_resume", {"job_application_id": job_application.id})
+    db_session.commit()
+
+    worker.drain(session_factory, ["extract_resume"])
+    db_session.refresh(job_application)
+    assert "Andrew" in job_application.resume_text
+    assert job_application.resume_page_count > 0
+    queued = sorted(job.job_type for job in db_session.query(Job).filter(Job.status == job_queue.QUEUED))
+    assert queued == ["evaluate_resume", "ingest_resume"]
+
+    def no_download(file_url):
+        raise AssertionError("the resume should not be downloaded again")
+    monkeypatch.setattr(file_storage, "download_file", no_download)
+    monkeypatch.setattr(tasks, "worker_vector_store", lambda: vector_store)
+    worker.drain(session_factory, ["ingest_resume"])
+    assert db_session.query(Job).filter(Job.job_type == "ingest_resume").one().status == job_queue.DONE
+
+def test_same_resume_and_description_is_evaluated_once(db_session, session_factory, monkeypatch):
+    first = create_application(db_session)
+    second = JobApplication(job_post_id=first.job_post_id, first_name="Andrew", last_name="Ng",
+                            email="andrew@example.com", resume_url=first.resume_url)
+    first.resume_sha256 = second.resume_sha256 = "a" * 64
+    db_session.add(second)
+    db_session.commit()
+
+    calls = []
+    def fake_evaluation(resume_text, job_description):
+        calls.append(resume_text)
+        return {"overall_score": 77}
+    monkeypatch.setattr(tasks, "evaluate_resume_with_ai", fake_evaluation)
+    monkeypatch.setattr(tasks, "worker_vector_store", lambda: None)
+    for job_application in (first, second):
+        job_queue.enqueue(db_session, "extract_resume", {"job_application_id": job_application.id})
+    db_session.commit()
+    monkeypatch.setattr(tasks, "ingest_resume_batched", lambda *args: None)
+    worker.drain(session_factory, ["extract_resume"])
+    worker.drain(session_factory, ["evaluate_resume", "ingest_resume"])
+
+    assert len(calls) == 1
+    scores = [e.overall_score for e in db_session.query(JobApplicationAIEvaluation)]
+    assert scores == [77, 77]
+
+def test_identical_resume_is_uploaded_once(db_session, client, monkeypatch):
+    job_application = create_application(db_session)
+    uploads = []
+    async def mock_upload_file(bucket_name, path, contents, content_type):
+        uploads.append(path)
+        return f"/uploads/{bucket_name}/{path}"
+    monkeypatch.setattr(file_storage, "upload_file", mock_upload_file)
+    for _ in range(2):
+        with open("test/resumes/ProfileAndrewNg.pdf", "rb") as f:
+            response = client.post("/api/job-applications",
+                                   data={"first_name": "Andrew", "last_name": "Ngg", "email": "andrew@example.com",
+                                         "job_post_id": job_application.job_post_id},
+                                   files={"resume": ("ProfileAndrewNg.pdf", f, "application/pdf")})
+        assert response.status_code == 200
+    assert len(uploads) == 1
+    assert uploads[0].endswith(".pdf") and len(uploads[0]) == 64 + len(".pdf")
+
+def test_resume_upload_is_capped_and_must_be_a_pdf(db_session, client, monkeypatch):
+    job_application = create_application(db_session)
+    async def mock_upload_file(bucket_name, path, contents, content_type):
+        return path
+    monkeypatch.setattr(file_storage, "upload_file", mock_upload_file)
+    monkeypatch.setattr(settings, "UPLOAD_MAX_RESUME_BYTES", 1024)
+    data = {"first_name": "Andrew", "last_name": "Ngg", "email": "andrew@example.com",
+            "job_post_id": job_application.job_post_id}
+    with open("test/resumes/ProfileAndrewNg.pdf", "rb") as f:
+        response = client.post("/api/job-applications", data=data,
+                               files={"resume": ("ProfileAndrewNg.pdf", f, "application/pdf")})
+    assert response.status_code == 413
+    response = client.post("/api/job-applications", data=data,
+                           files={"resume": ("resume.pdf", b"<html>not a pdf</html>", "application/pdf")})
+    assert response.status_code == 415
+
+def test_oversized_application_request_is_refused(db_session, client, monkeypatch, post_chunked):
+    job_application = create_application(db_session)
+    monkeypatch.setattr(settings, "UPLOAD_MAX_REQUEST_BYTES", 1024)
+    data = {"first_name": "Andrew", "last_name": "Ngg", "email": "andrew@example.com",
+            "job_post_id": job_application.job_post_id}
+    with open("test/resumes/ProfileAndrewNg.pdf", "rb") as f:
+        files = {"resume": ("ProfileAndrewNg.pdf", f.read(), "application/pdf")}
+    response = client.post("/api/job-applications", data=data, files=files)
+    assert response.status_code == 413
+    # Form parsing must not turn the limit into a 400
+    assert post_chunked("/api/job-applications", data, files).status_code == 413
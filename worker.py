@@ -0,0 +1,108 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+import ai
+import converter
+import db as database
+import job_queue
+from models import Job
+from tasks import HANDLERS
+
+logger = logging.getLogger("worker")
+
+def process(db, job):
+   try:
+      HANDLERS[job.job_type](db, job.payload)
+   except Exception:
+      db.rollback()
+      logger.exception("job %s (%s) failed on attempt %s", job.id, job.job_type, job.attempts)
+      job_queue.fail(db, job, traceback.format_exc())
+   else:
+      job_queue.complete(db, job)
+
+def process_by_id(session_factory, job_id):
+   with session_factory() as db:
+      process(db, db.get(Job, job_id))
+
+def run_once(session_factory, job_types=None):
+   # Visit the job types in random order so a type that always has work
+   # queued cannot starve the others
+   job_types = list(job_types or HANDLERS)
+   for job_type in random.sample(job_types, len(job_types)):
+      with session_factory() as db:
+         jobs = job_queue.claim_batch(db, job_type, job_queue.batch_size(job_type))
+         if len(jobs) == 1:
+            process(db, jobs[0])
+            return True
+         job_ids = [job.id for job in jobs]
+      if job_ids:
+         # Jobs claimed together run side by side, each in its own session,
+         # so their embedding calls can share a batch (see ingest_batcher.py)
+         with ThreadPoolExecutor(len(job_ids)) as executor:
+            list(executor.map(lambda job_id: process_by_id(session_factory, job_id), job_ids))
+         return True
+   return False
+
+def drain(session_factory, job_types=None):
+   while run_once(session_factory, job_types):
+      pass
+
+def work(stop, job_types=None):
+   session_factory = database.get_session_factory()
+   while not stop.is_set():
+      if not run_once(session_factory, job_types):
+         stop.wait(settings.JOB_POLL_INTERVAL_SECONDS)
+   converter.shutdown_pool()
+   ai.close_vector_store()
+   database.dispose_engine()
+
+def worker_process(stop, job_types):
+   # The parent turns Ctrl-C / SIGTERM into `stop`, so a job in progress is
+   # allowed to finish instead of being interrupted half way
+   signal.signal(signal.SIGINT, signal.SIG_IGN)
+   signal.signal(signal.SIGTERM, signal.SIG_IGN)
+   logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+   work(stop, job_types)
+
+def main():
+   parser = argparse.ArgumentParser(description="Runs background jobs from the jobs table")
+   parser.add_argument("--processes", type=int,
+                       help="worker processes (default: one per CPU, or one with QDRANT_MODE=local)")
+   parser.add_argument("--job-types", help="comma separated job types to run (default: all)")
+   args = parser.parse_args()
+   job_types = args.job_types.split(",") if args.job_types else None
+   unknown = set(job_types or []) - set(HANDLERS)
+   if unknown:
+      parser.error(f"unknown job types: {', '.join(sorted(unknown))}")
+   # The embedded vector store is locked by the first process to open it, so
+   # the vector jobs would fail in all the others
+   local_store = settings.QDRANT_MODE == "local"
+   process_count = args.processes or (1 if local_store else os.cpu_count() or 1)
+   if local_store and process_count > 1:
+      parser.error("QDRANT_MODE=local can only be used by one process: use --processes 1 or a Qdrant server")
+
+   logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+   context = multiprocessing.get_context("spawn")
+   stop = context.Event()
+   processes = [context.Process(target=worker_process, args=(stop, job_types), name=f"worker-{i}")
+                for i in range(process_count)]
+   for p in processes:
+      p.start()
+   logger.info("started %s worker processes", len(processes))
+
+   def shutdown(signum, frame):
+      logger.info("stopping after current jobs")
+      stop.set()
+   signal.signal(signal.SIGINT, shutdown)
+   signal.signal(signal.SIGTERM, shutdown)
+   for p in processes:
+      p.join()
+
+if __name__ == "__main__":
+   main()